@@ -0,0 +1,139 @@
+# Copyright 2022 Krono-Safe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure how the analyses of `rsfstat` scale with the size of the scheduling
+plan: the wall time and the peak memory (traced by `tracemalloc`) of loading
+the RSF databases, of `compute_cpu_loads()` and of `compute_parallelism_ratio()`
+on synthetic plans (see `rt_rsf.generate`) of increasing numbers of frames"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+SOURCES_DIR = Path(__file__).resolve().parents[1] / 'rsfstat'
+sys.path.insert(0, str(SOURCES_DIR))
+
+import rsfstat # pylint: disable=wrong-import-position
+from rt_rsf import generate # pylint: disable=wrong-import-position
+
+DEFAULT_SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+
+
+def generate_plan(workdir: Path, nb_frames: int, args: argparse.Namespace
+                  ) -> Tuple[List[Path], float]:
+    """Write (or reuse, if already in `workdir`) the RSF databases of a
+    synthetic plan of about `nb_frames` frames in total, shaped by `args`, and
+    return their paths along with the time taken to generate them (0 if
+    reused)"""
+    nb_intervals = max(2, nb_frames // (args.cores * args.frames_per_interval))
+    directory = workdir / (f'{args.cores}c-{nb_intervals}i-'
+                           f'{args.frames_per_interval}f-{args.tasks}t-'
+                           f'{args.load}l-{args.seed}s')
+    paths = [directory / f'core_{core}_rt_rsf.ks'
+             for core in range(args.cores)]
+    if all(path.exists() for path in paths):
+        return paths, 0.
+
+    start = time.perf_counter()
+    paths = generate.write_rsfdbs(directory, args.cores, nb_intervals,
+                                  args.frames_per_interval, args.tasks,
+                                  args.load, seed=args.seed)
+    return paths, time.perf_counter() - start
+
+
+def measure(step: Callable[[], object], runs: int) -> Tuple[float, int]:
+    """Return the median wall time in seconds of `runs` calls to `step`, and
+    the peak memory in bytes allocated during an additional traced call"""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        step()
+        durations.append(time.perf_counter() - start)
+
+    # tracing slows down allocations: it is not done while timing
+    tracemalloc.start()
+    try:
+        step()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(durations), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', '-s', type=lambda arg: int(float(arg)),
+                        nargs='+', default=DEFAULT_SIZES, help="""Total
+                        numbers of frames of the plans, e.g. 1e6 (default:
+                        1e3 to 1e7).""")
+    parser.add_argument('--cores', '-c', type=int, default=4, help="""Number
+                        of cores of the plans (default: %(default)s).""")
+    parser.add_argument('--frames-per-interval', type=int, default=20,
+                        help="""Number of frames in each interval (default:
+                        %(default)s).""")
+    parser.add_argument('--tasks', type=int, default=8, help="""Number of
+                        Tasks on each core (default: %(default)s).""")
+    parser.add_argument('--load', type=float, default=.5, help="""CPU load of
+                        each core (default: %(default)s).""")
+    parser.add_argument('--seed', type=int, default=0, help="""Seed of the
+                        random generator (default: %(default)s).""")
+    parser.add_argument('--runs', '-n', type=int, default=3, help="""Number
+                        of timed runs of each step, the median of which is
+                        reported (default: %(default)s).""")
+    parser.add_argument('--workdir', type=Path, default=Path(
+                        tempfile.gettempdir()) / 'rsfstat-benchmarks',
+                        help="""Directory where the synthetic plans are
+                        written, and reused from by later runs (default:
+                        %(default)s).""")
+    args = parser.parse_args()
+
+    print(f'{"frames":>10} {"step":<26} {"time (ms)":>12} {"peak (MiB)":>12}')
+    for nb_frames in args.sizes:
+        paths, generation_time = generate_plan(args.workdir, nb_frames, args)
+        if generation_time:
+            print(f'{nb_frames:>10} {"(generation)":<26}'
+                  f' {generation_time * 1000.:>12.1f}')
+
+        rsfs = rsfstat.load_rsfdbs(paths)
+
+        def cold(analysis: Callable) -> Callable:
+            # drop the arrays derived and cached by previous runs, so that each
+            # run measures an analysis of freshly loaded RSFs
+            def step():
+                for rsf in rsfs:
+                    rsf._cache.clear() # pylint: disable=protected-access
+                return analysis(rsfs)
+            return step
+
+        steps = {
+            'load_rsfdbs': lambda: rsfstat.load_rsfdbs(paths),
+            'compute_cpu_loads': cold(rsfstat.compute_cpu_loads),
+            'compute_parallelism_ratio':
+                cold(rsfstat.compute_parallelism_ratio),
+        }
+        for name, step in steps.items():
+            duration, peak = measure(step, args.runs)
+            print(f'{nb_frames:>10} {name:<26} {duration * 1000.:>12.1f}'
+                  f' {peak / 2**20:>12.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
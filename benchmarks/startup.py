@@ -0,0 +1,95 @@
+# Copyright 2022 Krono-Safe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the cold-start latency of the `rsfstat` entry point: the import time
+of the `rsfstat` module reported by `python -X importtime`, and the wall time of
+a whole `rsfstat --version` run, each in a fresh interpreter"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+
+SOURCES_DIR = Path(__file__).resolve().parents[1] / 'rsfstat'
+
+# same as the `rsfstat` console script, without the overhead of the
+# setuptools/pkg_resources wrapper, which depends on the installation
+ENTRY_POINT = ('import sys; sys.argv = ["rsfstat", "--version"];'
+               ' import rsfstat; rsfstat.main()')
+
+
+def import_times(module: str = 'rsfstat') -> dict:
+    """Import `module` in a fresh interpreter with `-X importtime`, and return
+    the cumulative import time in microseconds of every module imported"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SOURCES_DIR, stderr=subprocess.PIPE, check=True,
+        universal_newlines=True)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def entry_point_time() -> float:
+    """Wall time in seconds of a whole `rsfstat --version` run"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', ENTRY_POINT], cwd=SOURCES_DIR,
+                   stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', '-n', type=int, default=10, help="""Number
+                        of runs, the median of which is reported (default:
+                        %(default)s).""")
+    parser.add_argument('--top', type=int, default=10, help="""Number of the
+                        slowest top-level imports to report (default:
+                        %(default)s).""")
+    parser.add_argument('--max-ms', type=float, help="""Fail if the median
+                        import time of rsfstat exceeds this value, in
+                        milliseconds.""")
+    args = parser.parse_args()
+
+    # warm up the bytecode cache, so that compilation is not measured
+    import_times()
+
+    runs = [import_times() for _ in range(args.runs)]
+    import_ms = statistics.median(run['rsfstat'] for run in runs) / 1000.
+    wall_ms = statistics.median(entry_point_time()
+                                for _ in range(args.runs)) * 1000.
+
+    print(f'rsfstat import time: {import_ms:.1f} ms (median of {args.runs})')
+    print(f'rsfstat --version:   {wall_ms:.1f} ms (median of {args.runs})')
+    print('\nslowest imports (cumulative, last run):')
+    for name, cumulative in sorted(runs[-1].items(), key=lambda item: -item[1]
+                                   )[1:args.top + 1]:
+        print(f'  {name:.<48} {cumulative / 1000.:.1f} ms')
+
+    if args.max_ms is not None and import_ms > args.max_ms:
+        print(f'\nimport time above {args.max_ms} ms', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,22 +15,61 @@
 """Compute statistics on a set of static scheduling plans (RSFs) for an ASTERIOS
 Application"""
 
+from __future__ import annotations
+
 import argparse
+import bisect
+import hashlib
+import heapq
+import importlib
 import itertools
+import json
 import math
+import os
+import re
+import sys
+import time
 
 from collections import defaultdict
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Iterable, NamedTuple, Sequence, Dict
+from typing import (Callable, Iterable, Iterator, NamedTuple, Sequence, Dict,
+                    List, Optional, Tuple, TYPE_CHECKING, Union)
 
-import colorama
+from rt_rsf.FrameType import FrameType
 
-from rt_rsf import pythonize as rsfloader
-from rt_rsf.Interval import Interval
-from rt_rsf.Frame import Frame
 
-from rt_rsf.RSF import RSF
-from rt_rsf.FrameType import FrameType
+class _LazyModule:
+    """Stand-in for the module `name`, imported on first use of one of its
+    attributes, which then replaces the stand-in as the global `alias`"""
+
+    def __init__(self, alias: str, name: str):
+        self._alias = alias
+        self._name = name
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+# numpy, colorama and the flatbuffers accessors are only imported when needed,
+# so that the command line starts quickly, e.g. when the stats are cached:
+# numpy and the columnar models are used throughout the analyses, and are
+# imported on first use by their stand-ins
+if TYPE_CHECKING:
+    from fractions import Fraction
+
+    import numpy as np
+
+    from rt_rsf import columnar
+    from rt_rsf.Interval import Interval
+    from rt_rsf.Frame import Frame
+    from rt_rsf.RSF import RSF
+    from rt_rsf.stream import RSFStream
+else:
+    np = _LazyModule('np', 'numpy')
+    columnar = _LazyModule('columnar', 'rt_rsf.columnar')
 
 __version__ = '1.0.0'
 
@@ -45,6 +84,187 @@ Index = int
 CoreId = int
 TaskName = str
 
+################################################################################
+# PROFILING
+################################################################################
+
+class Profile:
+    """Wall and CPU time spent in the phases of the analyses, memory they use,
+    and counters of their hot paths, recorded while the profile is enabled, see
+    `enable_profiling()`.
+
+    Phases are timed with `phase()` and may be nested, the time of a nested
+    phase being also counted in the enclosing one. If `cprofile`, the function
+    calls of the outermost phases are also profiled with `cProfile`, see
+    `dump_stats()`. The CPU time is the one of the current process: the work
+    done by a pool of processes (see `load_rsfdbs()`) only shows in the wall
+    time.
+
+    The resident set size of the process (where available, i.e. on Linux) is
+    sampled when each phase starts and ends: the RSS at its end, and its
+    growth during the phase, are recorded. If `trace_memory`, the memory
+    allocated during each phase is also traced with `tracemalloc`, which slows
+    everything down: the peak is the one above the memory allocated when the
+    phase started (before Python 3.9, it is the peak since the tracing
+    started), and the net allocation is the memory still allocated at its end.
+    """
+
+    def __init__(self, cprofile: bool = False, trace_memory: bool = False):
+        # name -> timings and memory, see `to_json()`
+        self.phases = {} # type: Dict[str, dict]
+        self.counters = defaultdict(int) # type: Dict[str, int]
+        self.cprofile = None
+        if cprofile:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+        self.trace_memory = trace_memory
+        # memory allocated when each running phase started, and its peak
+        self._traced = [] # type: List[List[int]]
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Context manager timing the phase `name`"""
+        # phases are listed in the order they start, enclosing ones first
+        phase = self.phases.setdefault(name, {
+            'wall': 0., 'cpu': 0., 'calls': 0, 'rss': None,
+            'rss_growth': None, 'traced_peak': None, 'traced_net': None})
+        if self._depth == 0 and self.cprofile is not None:
+            self.cprofile.enable()
+        self._depth += 1
+        if self.trace_memory:
+            self._trace_phase_start()
+        rss = _current_rss()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            phase['wall'] += time.perf_counter() - wall
+            phase['cpu'] += time.process_time() - cpu
+            phase['calls'] += 1
+            phase['rss'] = _current_rss()
+            if phase['rss'] is not None:
+                phase['rss_growth'] = (phase['rss'] - rss
+                                       + (phase['rss_growth'] or 0))
+            if self.trace_memory:
+                peak, net = self._trace_phase_end()
+                phase['traced_peak'] = max(peak, phase['traced_peak'] or 0)
+                phase['traced_net'] = net + (phase['traced_net'] or 0)
+            self._depth -= 1
+            if self._depth == 0 and self.cprofile is not None:
+                self.cprofile.disable()
+
+    def _trace_phase_start(self) -> None:
+        import tracemalloc
+
+        # the peak is reset for the new phase: the running ones keep theirs
+        current, peak = tracemalloc.get_traced_memory()
+        for traced in self._traced:
+            traced[1] = max(traced[1], peak)
+        if hasattr(tracemalloc, 'reset_peak'): # Python 3.9+
+            tracemalloc.reset_peak()
+        self._traced.append([current, current])
+
+    def _trace_phase_end(self) -> Tuple[int, int]:
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        for traced in self._traced:
+            traced[1] = max(traced[1], peak)
+        start, peak = self._traced.pop()
+        return peak - start, current - start
+
+    def count(self, counter: str, increment: int = 1) -> None:
+        """Increment the counter `counter` by `increment`"""
+        self.counters[counter] += increment
+
+    def counted(self, counter: str, iterable: Iterable) -> Iterator:
+        """Iterate over `iterable`, counting its items in `counter`"""
+        for item in iterable:
+            self.counters[counter] += 1
+            yield item
+
+    def dump_stats(self, path: Path) -> None:
+        """Write the `cProfile` stats of the phases to `path`, to be read with
+        `pstats` or any tool supporting its format"""
+        if self.cprofile is None:
+            raise ValueError('function calls were not profiled')
+        self.cprofile.dump_stats(str(path))
+
+    def to_json(self) -> dict:
+        """Phases, with their wall and CPU time in seconds, number of calls,
+        RSS at their end, RSS growth and traced memory in bytes (`None` if not
+        measured), and counters"""
+        return {
+            'phases': {name: dict(phase)
+                       for name, phase in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+
+    def report(self) -> str:
+        """Human-readable report of the phases and counters"""
+        def mib(nbytes: Optional[int]) -> str:
+            return '-' if nbytes is None else f'{nbytes / 2**20:.1f}'
+
+        lines = [f'{"PHASE":<32} {"wall (ms)":>10} {"cpu (ms)":>10}'
+                 f' {"calls":>6} {"RSS (MiB)":>10} {"+RSS (MiB)":>11}'
+                 f' {"peak (MiB)":>11} {"net (MiB)":>10}']
+        for name, phase in self.phases.items():
+            lines.append(f'{name:<32} {phase["wall"] * 1000.:>10.1f}'
+                         f' {phase["cpu"] * 1000.:>10.1f}'
+                         f' {phase["calls"]:>6} {mib(phase["rss"]):>10}'
+                         f' {mib(phase["rss_growth"]):>11}'
+                         f' {mib(phase["traced_peak"]):>11}'
+                         f' {mib(phase["traced_net"]):>10}')
+        lines.append(f'\n{"COUNTER":<32} {"value":>10}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{name:<32} {value:>10}')
+        return '\n'.join(lines)
+
+
+def _current_rss() -> Optional[int]:
+    """Current resident set size of the process in bytes, if available"""
+    try:
+        with open('/proc/self/statm', encoding='ascii') as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError): # not Linux
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+_profile = None # type: Optional[Profile]
+"""Profile being recorded, if any: hot paths check it before counting"""
+
+def enable_profiling(profile: Optional[Profile] = None) -> Profile:
+    """Record the phases and counters of the analyses in `profile` (a new one
+    if not given) until `disable_profiling()`, and return it. Memory is traced
+    from now on if the profile traces it."""
+    global _profile # pylint: disable=global-statement
+    _profile = profile or Profile()
+    if _profile.trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+    return _profile
+
+
+def disable_profiling() -> Optional[Profile]:
+    """Stop recording the profile enabled by `enable_profiling()`, and return
+    it"""
+    global _profile # pylint: disable=global-statement
+    profile, _profile = _profile, None
+    if profile is not None and profile.trace_memory:
+        import tracemalloc
+        tracemalloc.stop()
+    return profile
+
+
+def _phase(name: str):
+    """Context manager timing the phase `name` of the enabled profile, if any"""
+    if _profile is None:
+        return nullcontext()
+    return _profile.phase(name)
+
+
 ################################################################################
 
 class CpuLoads(NamedTuple):
@@ -59,17 +279,167 @@ class CpuLoads(NamedTuple):
     """
 
     overall: Ratio
-    """Global CPU load"""
+    """Global CPU load, i.e. the average CPU load of the cores over the
+    hyperperiod of their loops (see `_overall_load()`)"""
+
 
+CPU_LOADS_ENGINES = ('vectorized', 'iterative')
 
-def compute_cpu_loads(rsfs: Iterable[RSF]) -> CpuLoads:
+def compute_cpu_loads(rsfs: Iterable[RSF], engine='vectorized') -> CpuLoads:
     """For a given set of RSFs `rsfs`, compute various CPU load data: see the
     documentation of `CpuLoads`.
+
+    `engine` is one of `CPU_LOADS_ENGINES`: the default "vectorized" engine
+    works on the columnar representation of the RSFs (see `rt_rsf.columnar`),
+    and is the one of `compute_phase_cpu_loads()`, while the "iterative" engine
+    walks over every frame of any RSF model, and is kept as a reference (it
+    assumes that all the quota timers have the same frequency).
+    """
+    if engine == 'iterative':
+        return _compute_cpu_loads_iterative(rsfs)
+    if engine != 'vectorized':
+        raise ValueError(f'unknown CPU loads engine: {engine}')
+    # the loops alone, which unlike the transient states need not be split at
+    # the steady state start
+    rsfs = [columnar.as_columnar(rsf) for rsf in rsfs]
+    timebase = compute_timebase(rsfs)
+    return _merge_phase_cpu_loads({
+        rsf.core: _rsf_phase_cpu_loads(rsf, None, timebase.scales[rsf.core])
+        for rsf in rsfs
+    }).steady
+
+
+class PhaseCpuLoads(NamedTuple):
+    """CPU loads of the steady state and of the transient state of a set of
+    RSFs"""
+
+    steady: CpuLoads
+    """CPU loads computed on the loop of each RSF, see `compute_cpu_loads()`"""
+
+    transient: Optional[CpuLoads]
+    """CPU loads computed from the begining of the RSFs up to the date when
+    the last RSF starts its loop (see `compute_steady_state_start()`), or
+    `None` if all the RSFs start with their loop"""
+
+
+def compute_phase_cpu_loads(rsfs: Iterable[RSF],
+                            timebase: Optional[Timebase] = None
+                            ) -> PhaseCpuLoads:
+    """For a given set of RSFs `rsfs`, compute the CPU loads of their steady
+    state and of their transient state (see `PhaseCpuLoads`), in a single pass
+    over the frames of each RSF. The global CPU loads weight the cores by the
+    duration of their quota timer ticks in `timebase`, computed with
+    `compute_timebase()` if not given, and are computed over the hyperperiod of
+    the RSFs if their loops have different lengths.
     """
-    # TODO: also compute peak and lowest?
-    # TODO: compute CPU load during init?
-    overall_load_qtt = 0
-    overall_length_qtt = 0
+    rsfs = [columnar.as_columnar(rsf) for rsf in rsfs]
+    steady_start = compute_steady_state_start(rsfs)
+    timebase = timebase or compute_timebase(rsfs)
+    return _merge_phase_cpu_loads({
+        rsf.core: _rsf_phase_cpu_loads(rsf, steady_start,
+                                       timebase.scales[rsf.core])
+        for rsf in rsfs
+    })
+
+
+# CPU load, CPU load of each Task, and exec time and length of the phase in
+# units of the timebase, of an RSF in each phase
+RSFPhaseCpuLoads = Dict[str, Tuple[Ratio, Dict[TaskName, Ratio],
+                                   Tuple[int, int]]]
+
+def _rsf_phase_cpu_loads(rsf: columnar.ColumnarRSF,
+                         steady_start: Optional[SourceTicks],
+                         scale: int) -> RSFPhaseCpuLoads:
+    """CPU loads of the RSF `rsf` alone, in the steady state starting at
+    `steady_start`, and in the transient state before it if any, for
+    `compute_phase_cpu_loads()`. Only the loop is computed if `steady_start` is
+    `None`, in which case no interval of the RSF needs to start at the steady
+    state start."""
+    # the frames of an RSF are split in three consecutive segments: before its
+    # loop, from its loop to the steady state start, and after it; the steady
+    # state is made of the last two, and the transient state of the first two
+    phases = {'steady': [1, 2]}
+    if steady_start is None:
+        steady_interval = rsf.loop_interval
+    else:
+        steady_interval = rsf.interval_starting_at(steady_start)
+        if steady_start > 0:
+            phases['transient'] = [0, 1]
+
+    offsets = rsf.interval_frame_offsets
+    bounds = [0, offsets[rsf.loop_interval], offsets[steady_interval],
+              rsf.nb_frames]
+    segments = np.repeat(np.arange(3, dtype=np.int64), np.diff(bounds))
+    interval_starts = rsf.interval_starts_qtt()
+    phase_length_qtt = {
+        'steady': int(interval_starts[-1]
+                      - interval_starts[rsf.loop_interval]),
+        'transient': int(interval_starts[steady_interval]),
+    }
+
+    # sum the exec time of each Task in each segment (weights are summed in
+    # float64, which is exact below 2**53 ticks)
+    exec_frames = rsf.frame_type == FrameType.EXEC
+    exec_slots = (rsf.frame_task[exec_frames] * 3
+                  + segments[exec_frames])
+    nb_slots = len(rsf.task_names) * 3
+    task_segment_qtt = np.bincount(
+        exec_slots, weights=rsf.frame_length_qt[exec_frames],
+        minlength=nb_slots).reshape(-1, 3)
+    task_segment_nb_frames = np.bincount(
+        exec_slots, minlength=nb_slots).reshape(-1, 3)
+
+    loads = {}
+    for phase, phase_segments in phases.items():
+        # keep only the Tasks which have at least one exec frame in the phase
+        task_load_qtt = task_segment_qtt[:, phase_segments].sum(axis=1)
+        task_nb_frames = task_segment_nb_frames[:, phase_segments].sum(axis=1)
+        rsf_length_qtt = phase_length_qtt[phase]
+        task_loads = {
+            rsf.task_names[task_id]:
+                int(task_load_qtt[task_id]) / rsf_length_qtt
+            for task_id in np.flatnonzero(task_nb_frames)
+        }
+        rsf_load_qtt = int(task_load_qtt.sum())
+        loads[phase] = (rsf_load_qtt / rsf_length_qtt, task_loads,
+                        (rsf_load_qtt * scale, rsf_length_qtt * scale))
+    return loads
+
+
+def _merge_phase_cpu_loads(rsf_phase_loads: Dict[CoreId, RSFPhaseCpuLoads]
+                           ) -> PhaseCpuLoads:
+    """Gather the CPU loads of each RSF (see `_rsf_phase_cpu_loads()`) in the
+    CPU loads of the whole set of RSFs"""
+    phases = next(iter(rsf_phase_loads.values())).keys()
+    loads = {
+        phase: CpuLoads(
+            by_core={core_id: loads[phase][0]
+                     for core_id, loads in rsf_phase_loads.items()},
+            by_task={core_id: loads[phase][1]
+                     for core_id, loads in rsf_phase_loads.items()},
+            overall=_overall_load([loads[phase][2]
+                                   for loads in rsf_phase_loads.values()])
+        )
+        for phase in phases
+    }
+    return PhaseCpuLoads(steady=loads['steady'],
+                         transient=loads.get('transient'))
+
+
+def _overall_load(loads_qtt: List[Tuple[int, int]]) -> Ratio:
+    """Global CPU load of RSFs from their exec time and the length of their
+    phase (in a common timebase): each RSF repeats its phase as many times as
+    needed to fill the hyperperiod, i.e. once if all the phases have the same
+    length"""
+    hyperperiod = _lcm(length for _, length in loads_qtt)
+    return (sum(load * (hyperperiod // length) for load, length in loads_qtt)
+            / (hyperperiod * len(loads_qtt)))
+
+
+def _compute_cpu_loads_iterative(rsfs: Iterable[RSF]) -> CpuLoads:
+    """Reference implementation of `compute_cpu_loads()`, walking every frame of
+    the loop of each RSF"""
+    loads_qtt = [] # load and length of the loop of each RSF
     rsf_loads = {} # load by RSF
     task_loads = {} # load by core(RSF) by task name
 
@@ -80,11 +450,6 @@ def compute_cpu_loads(rsfs: Iterable[RSF]) -> CpuLoads:
         task_loads[core_id] = defaultdict(lambda: 0)
 
         for interval in rsf.intervals[rsf.loop_interval:]:
-            # just a sanity check
-            assert interval.length_qtt == sum(frame.length_qt
-                                              for frame in interval.frames), \
-                "found an inconsistent interval length"
-
             # run over all exec frames, update the global load for this RSF, and
             # for each Task
             exec_frames = (f for f in interval.frames
@@ -112,22 +477,200 @@ def compute_cpu_loads(rsfs: Iterable[RSF]) -> CpuLoads:
             rsf_loads[core_id]
         )
 
-        # update the overall load and length used to compute the global CPU load
-        overall_load_qtt += rsf_load_qtt
-        overall_length_qtt += rsf_length_qtt
+        # keep the load and length used to compute the global CPU load
+        loads_qtt.append((rsf_load_qtt, rsf_length_qtt))
 
     return CpuLoads(
         by_core=rsf_loads,
         by_task=task_loads,
-        overall=(overall_load_qtt / overall_length_qtt)
+        overall=_overall_load(loads_qtt)
     )
 
 
 def compute_steady_state_start(rsfs: Iterable[RSF]) -> SourceTicks:
     """Compute the date after which all RSFs have entered their loop"""
-    return max(sum(interval.length_st
-                   for interval in rsf.intervals[0:rsf.loop_interval])
-               for rsf in rsfs)
+    return max(int(columnar.as_columnar(rsf).interval_starts_st()[
+        rsf.loop_interval]) for rsf in rsfs)
+
+
+class Timebase(NamedTuple):
+    """Common timebase of a set of RSFs, whose quota timers may have different
+    frequencies: a quota timer tick of any core lasts a whole number of units
+    of the timebase"""
+
+    unit: Optional[Fraction]
+    """Duration of a unit in seconds, or `None` if the frequencies of the quota
+    timers are unknown, and then assumed to be equal"""
+
+    scales: Dict[CoreId, int]
+    """Number of units in a quota timer tick, indexed by core id"""
+
+    def is_trivial(self) -> bool:
+        """Whether a unit is a quota timer tick of every core"""
+        return all(scale == 1 for scale in self.scales.values())
+
+    def to_json(self) -> dict:
+        """Convert this timebase to a JSON-serializable dict"""
+        return {
+            'unit': None if self.unit is None else str(self.unit),
+            'scales': {str(core): scale for core, scale in self.scales.items()},
+        }
+
+    @classmethod
+    def from_json(cls, timebase: dict) -> 'Timebase':
+        """Convert back a dict returned by `to_json()`"""
+        from fractions import Fraction
+
+        return cls(
+            unit=None if timebase['unit'] is None else Fraction(
+                timebase['unit']),
+            scales={int(core): scale
+                    for core, scale in timebase['scales'].items()},
+        )
+
+
+def compute_quota_timer_frequency(rsf: RSF) -> Optional[Fraction]:
+    """Derive the frequency in Hz of the quota timer of `rsf` from the lengths
+    of its intervals in nanoseconds and in quota timer ticks (see
+    `_quota_timer_frequency_bounds()`), or return `None` if the lengths in
+    nanoseconds are unknown"""
+    bounds = _rsf_frequency_bounds(rsf)
+    return None if bounds is None else _roundest_frequency(*bounds)
+
+
+FrequencyBounds = Tuple['Fraction', 'Fraction']
+
+def _rsf_frequency_bounds(rsf: RSF) -> Optional[FrequencyBounds]:
+    """`_quota_timer_frequency_bounds()` of the RSF `rsf`"""
+    rsf = columnar.as_columnar(rsf)
+    if not rsf.interval_length_ns.all():
+        return None
+    return _quota_timer_frequency_bounds(int(rsf.interval_length_qtt.sum()),
+                                         int(rsf.interval_length_ns.sum()),
+                                         len(rsf.interval_length_ns))
+
+
+def _quota_timer_frequency_bounds(length_qtt: int, length_ns: int,
+                                  nb_intervals: int
+                                  ) -> Optional[FrequencyBounds]:
+    """Lowest and highest frequencies in Hz of a quota timer whose
+    `nb_intervals` intervals last `length_qtt` ticks and `length_ns`
+    nanoseconds in total, or `None` if they cannot be derived: the length of
+    each interval in nanoseconds being rounded, the total is off by less than a
+    nanosecond per interval"""
+    from fractions import Fraction
+
+    if length_qtt <= 0 or length_ns <= nb_intervals:
+        return None
+    return (Fraction(length_qtt * 10**9, length_ns + nb_intervals),
+            Fraction(length_qtt * 10**9, length_ns - nb_intervals))
+
+
+def _roundest_frequency(lowest: Fraction, highest: Fraction
+                        ) -> Optional[Fraction]:
+    """Roundest whole number of Hz between `lowest` and `highest` (e.g.
+    300 MHz for intervals of 1000 ticks lasting 3333 ns), or `None` if there
+    is no such number"""
+    from fractions import Fraction
+
+    for exponent in range(len(str(math.floor(highest))) - 1, -1, -1):
+        step = 10**exponent
+        frequency = math.ceil(lowest / step) * step
+        if frequency <= highest:
+            return Fraction(frequency)
+    return None
+
+
+def _derive_frequencies(bounds: Dict[CoreId, Optional[FrequencyBounds]]
+                        ) -> Dict[CoreId, Optional[Fraction]]:
+    """Frequencies of the quota timers within their `bounds` (see
+    `_quota_timer_frequency_bounds()`), indexed by core id. The cores whose
+    bounds overlap are grouped, and all get the roundest frequency within the
+    intersection of their bounds: timers running at the same frequency, even
+    a non-round one, thus get the same frequency whatever the lengths of their
+    intervals. A frequency is `None` if its bounds are, or if there is no
+    whole number of Hz within the bounds of its group."""
+    frequencies = {core: None for core, core_bounds in bounds.items()
+                   if core_bounds is None}
+    groups = [] # cores and intersection of their bounds
+    for core, (lowest, highest) in sorted(
+            ((core, core_bounds) for core, core_bounds in bounds.items()
+             if core_bounds is not None), key=lambda item: item[1]):
+        if groups and lowest <= groups[-1][2]:
+            cores, _, group_highest = groups[-1]
+            cores.append(core)
+            groups[-1] = cores, lowest, min(highest, group_highest)
+        else:
+            groups.append(([core], lowest, highest))
+    for cores, lowest, highest in groups:
+        frequency = _roundest_frequency(lowest, highest)
+        frequencies.update((core, frequency) for core in cores)
+    return frequencies
+
+
+def compute_timebase(rsfs: Iterable[RSF],
+                     frequencies: Optional[Dict[CoreId, Fraction]] = None
+                     ) -> Timebase:
+    """Compute the coarsest exact common timebase of the RSFs `rsfs` (see
+    `Timebase`), from the `frequencies` in Hz of their quota timers, indexed by
+    core id. Frequencies which are not given are derived as with
+    `compute_quota_timer_frequency()`, the same one being chosen for the cores
+    whose frequencies may be equal (see `_derive_frequencies()`); if one cannot
+    be derived, all the quota timers are assumed to have the same frequency.
+
+    The duration of a tick of each core being a fraction p/q of a second, the
+    unit is gcd(p)/lcm(q) seconds: all the scales are integers.
+    """
+    from fractions import Fraction
+
+    rsfs = list(rsfs)
+    frequencies = dict(frequencies or {})
+    frequencies.update(_derive_frequencies({
+        rsf.core: _rsf_frequency_bounds(rsf)
+        for rsf in rsfs if rsf.core not in frequencies
+    }))
+    if any(frequencies[rsf.core] is None for rsf in rsfs):
+        return Timebase(unit=None, scales={rsf.core: 1 for rsf in rsfs})
+
+    tick_durations = {rsf.core: 1 / Fraction(frequencies[rsf.core])
+                      for rsf in rsfs}
+    numerators_gcd = 0
+    for duration in tick_durations.values():
+        numerators_gcd = math.gcd(numerators_gcd, duration.numerator)
+    unit = Fraction(numerators_gcd,
+                    _lcm(duration.denominator
+                         for duration in tick_durations.values()))
+    return Timebase(
+        unit=unit,
+        scales={core: int(duration / unit)
+                for core, duration in tick_durations.items()},
+    )
+
+
+def _lcm(values: Iterable[int]) -> int:
+    """Least common multiple of `values`, 1 if empty"""
+    lcm = 1
+    for value in values:
+        lcm = lcm * value // math.gcd(lcm, value)
+    return lcm
+
+
+_INT64_MAX = 2**63 - 1
+
+
+def _scale_ticks(ticks: np.ndarray, scale: int) -> np.ndarray:
+    """Convert the durations `ticks` from quota timer ticks to units of a
+    timebase of which a tick lasts `scale` units. Durations stay 64-bit
+    integers: a `ValueError` is raised if their sum does not fit in them, i.e.
+    if the frequencies of the quota timers have no reasonable common
+    timebase."""
+    if scale == 1:
+        return ticks
+    if int(ticks.sum()) * scale > _INT64_MAX:
+        raise ValueError(f'the quota timer ticks of {scale} units of the'
+                         f' timebase overflow 64-bit integers: give the'
+                         f' frequencies of the quota timers with --frequency')
+    return ticks * scale
 
 
 class RSFWalker:
@@ -138,8 +681,9 @@ class RSFWalker:
 
     Params:
         rsfdb: RSF database
-        start: start date in quota timer ticks to initialize the iterator. It
-            *must* match the begining of an interval, or an error is raised.
+        start: start date in source ticks to initialize the iterator. It
+            *must* match the begining of an interval of the loop, or an error
+            is raised. Use `seek()` to move to any date afterwards.
 
     Attributes:
         current_interval_idx: index of the current interval. Do not set
@@ -155,43 +699,65 @@ class RSFWalker:
             have browsed once a complete loop of the RSF. Do not set manually,
             use `advance()`, `move_to_next_interval()` or
             `move_to_next_frame()`.
+        columns: columnar representation of `rsfdb` (see `rt_rsf.columnar`),
+            holding the run-length index used by `next_running_switch()` and
+            `advance()` to jump over whole runs of frames. If a subclass
+            overrides `is_frame_exec()`, the runs are those of its own
+            predicate, evaluated once on every frame of `rsfdb`.
     """
 
-    def __init__(self, rsfdb: RSF, start: QuotaTimerTicks):
+    def __init__(self, rsfdb: RSF, start: SourceTicks):
         self.rsfdb = rsfdb # type: RSF
 
-        def compute_start_interval_idx(start_date: QuotaTimerTicks) -> Index:
-            """Compute the index of the interval starting at date
-            `start_date`
-            """
-            cur_date = 0
-            start_interval_idx = None
-
-            for interval_idx, interval in enumerate(self.rsfdb.intervals):
-                if cur_date == start_date:
-                    start_interval_idx = interval_idx
-                    break
-                cur_date += interval.length_st
-
-            assert start_interval_idx is not None, \
-                (f"could not find an interval starting at date {start_date}")
-            return start_interval_idx
-
-        self.current_interval_idx = (
-            compute_start_interval_idx(start)
-        ) # type: Index
-
+        # columnar representation of rsfdb, holding the run-length index of
+        # the RSF, shared by all the walkers on the same RSF
+        self.columns = columnar.as_columnar(rsfdb) # type: columnar.ColumnarRSF
+        if type(self).is_frame_exec is RSFWalker.is_frame_exec:
+            self._run_end_distances = self.columns.run_end_distances()
+        else:
+            self._run_end_distances = self.columns.run_end_distances(
+                np.array([self.is_frame_exec(frame)
+                          for interval in rsfdb.intervals
+                          for frame in interval.frames], dtype=bool))
+
+        self.current_interval_idx = 0 # type: Index
         self.current_frame_idx = 0 # type: Index
+        self.date_in_current_frame = 0 # type: QuotaTimerTicks
+        self.remaining_intervals_to_finish = 0 # type: int
 
-        assert self.current_interval_idx >= self.rsfdb.loop_interval
+        start_interval_idx = self.columns.interval_starting_at(start)
+        assert start_interval_idx >= self.rsfdb.loop_interval
+        self.seek(int(self.columns.interval_starts_qtt()[start_interval_idx]))
 
-        self.date_in_current_frame = 0 # type: QuotaTimerTicks
 
+    def seek(self, date: QuotaTimerTicks) -> None:
+        """Move to the date `date` (in quota timer ticks since the begining of
+        the RSF, which may be anywhere within an interval) in O(log(n)), and
+        restart counting the intervals to walk before `finished()` returns
+        `True`: if `date` is in the middle of an interval, it will as soon as
+        the begining of that interval is reached again.
+
+        Dates beyond the end of the RSF are wrapped over its loop, dates before
+        the begining of its loop are invalid.
+        """
+        columns = self.columns
+        interval_starts = columns.interval_starts_qtt()
+        loop_start = int(interval_starts[columns.loop_interval])
+        loop_len = int(interval_starts[-1]) - loop_start
+        assert date >= loop_start, \
+            f"cannot seek to date {date}, before the loop of the RSF"
+        date = loop_start + (date - loop_start) % loop_len
+
+        position = int(np.searchsorted(columns.frame_ends(), date,
+                                       side='right'))
+        self.current_interval_idx = int(np.searchsorted(
+            columns.interval_frame_offsets, position, side='right')) - 1
+        self.current_frame_idx = position - int(
+            columns.interval_frame_offsets[self.current_interval_idx])
+        self.date_in_current_frame = (
+            date - int(columns.frame_starts()[position]))
         self.remaining_intervals_to_finish = (
-            len(self.rsfdb.intervals) - self.rsfdb.loop_interval
-            if self.current_interval_idx >= self.rsfdb.loop_interval else
-            len(self.rsfdb.intervals) - self.current_interval_idx
-        ) # type: int
+            len(columns.interval_length_qtt) - columns.loop_interval)
 
 
     def current_interval(self) -> Interval:
@@ -254,7 +820,8 @@ class RSFWalker:
         the first interval yielded by the generator matches the one returned by
         `current_interval()`.
         """
-        first_interval_idx = first_interval_idx or self.current_interval_idx
+        if first_interval_idx is None:
+            first_interval_idx = self.current_interval_idx
         return itertools.chain(
             self.rsfdb.intervals[first_interval_idx:],
             itertools.cycle(self.rsfdb.intervals[self.rsfdb.loop_interval:])
@@ -267,7 +834,7 @@ class RSFWalker:
         `current_frame()`.
         """
         next_interval_idx = self.compute_next_interval_idx()
-        return itertools.chain(
+        frames = itertools.chain(
             self.rsfdb.intervals[self.current_interval_idx].frames[
                 self.current_frame_idx:],
             itertools.chain.from_iterable(
@@ -275,6 +842,15 @@ class RSFWalker:
                 for interval in self.intervals_generator(next_interval_idx)
             )
         )
+        if _profile is not None:
+            frames = _profile.counted('frames_generator() frames', frames)
+        return frames
+
+
+    def current_frame_position(self) -> Index:
+        """Index of the current frame among all the frames of the RSF"""
+        return (int(self.columns.interval_frame_offsets[
+            self.current_interval_idx]) + self.current_frame_idx)
 
 
     def next_running_switch(self) -> QuotaTimerTicks:
@@ -282,21 +858,22 @@ class RSFWalker:
         where the value returned by `is_running()` will change. In other words,
         if the current frame is executable, it returns the time to the next
         first frame that is *not* executable, and vice-versa.
+
+        If all the frames of the loop are of the same kind, the running state
+        never changes: the end of the loop is returned instead.
         """
-        # find the next time in qtt the running() will switch
-        return sum(
-            frame.length_qt
-            for frame in itertools.takewhile(
-                lambda f: self.is_frame_exec(f) == self.is_running(),
-                self.frames_generator()
-            )
-        ) - self.date_in_current_frame
+        if _profile is not None:
+            _profile.count('next_running_switch() calls')
+        return (int(self._run_end_distances[self.current_frame_position()])
+                - self.date_in_current_frame)
 
 
     def advance(self, advance_qtt: QuotaTimerTicks) -> None:
         """Advance the current date of `advance_qtt` quota timer ticks, possibly
         changing the current frame, and the current interval.
         """
+        if _profile is not None:
+            _profile.count('advance() calls')
         remaining_in_frame = (self.current_frame().length_qt
                               - self.date_in_current_frame)
         if remaining_in_frame > advance_qtt:
@@ -305,15 +882,32 @@ class RSFWalker:
             self.date_in_current_frame += advance_qtt
             return
 
-        advance_qtt -= remaining_in_frame
-        self.move_to_next_frame()
-        while advance_qtt > 0:
-            if advance_qtt < self.current_frame().length_qt:
-                self.date_in_current_frame = advance_qtt
-                break
-
-            advance_qtt -= self.current_frame().length_qt
-            self.move_to_next_frame()
+        # otherwise, jump directly to the frame containing the target date,
+        # wrapping over the loop as many times as needed
+        columns = self.columns
+        frame_ends = columns.frame_ends()
+        interval_starts = columns.interval_starts_qtt()
+        loop_start = int(interval_starts[columns.loop_interval])
+        loop_len = int(interval_starts[-1]) - loop_start
+        target = (int(frame_ends[self.current_frame_position()])
+                  + advance_qtt - remaining_in_frame)
+        nb_loops, target = divmod(target - loop_start, loop_len)
+        target += loop_start
+
+        position = int(np.searchsorted(frame_ends, target, side='right'))
+        interval_idx = int(np.searchsorted(columns.interval_frame_offsets,
+                                           position, side='right')) - 1
+        nb_loop_intervals = (len(columns.interval_length_qtt)
+                             - columns.loop_interval)
+        self.remaining_intervals_to_finish -= (
+            nb_loops * nb_loop_intervals
+            + interval_idx - self.current_interval_idx
+        )
+        self.current_interval_idx = interval_idx
+        self.current_frame_idx = (
+            position - int(columns.interval_frame_offsets[interval_idx]))
+        self.date_in_current_frame = (
+            target - int(columns.frame_starts()[position]))
 
 
     def finished(self) -> bool:
@@ -325,31 +919,481 @@ class RSFWalker:
 
 
 
-def compute_parallelism_ratio(rsfs: Sequence[RSF]) -> Ratio:
-    """Compute an un-normalized parallelism ratio on all the RSFs listed in
-    `rsfs`. The ratio is computed such that:
+class RunningSwitches(NamedTuple):
+    """Dates at which an RSF switches between running a Task and not running
+    any, over one loop of the RSF (or over its transient state, see
+    `compute_transient_running_switches()`)"""
 
-        - it is linear in time;
-        - it equals 0 iff at any given time in steady state, at most one Task is
-          scheduled among all the RSFs;
-        - it equals 1 iff at any given time in steady state, all the RSFs
-          schedule a Task (thus implying that the global CPU load is 100%).
+    running_at_start: bool
+    """Whether a Task is scheduled at the begining of the loop"""
 
-    Because of that last property, the value returned by this function should be
-    normalized with the global CPU load to be more meaningful.
+    dates: np.ndarray
+    """Sorted dates of the switches, in quota timer ticks relative to the
+    begining of the loop: the running state toggles at each of these dates"""
+
+    length: QuotaTimerTicks
+    """Length of the loop"""
+
+
+def compute_running_switches(rsf: RSF, start: SourceTicks,
+                             scale: int = 1) -> RunningSwitches:
+    """Compute the running switches (see `RunningSwitches`) of one loop of
+    `rsf`, starting from the date `start`. `start` *must* match the begining of
+    an interval of the loop, or an error is raised. Dates and lengths are in
+    units of a timebase of which a quota timer tick lasts `scale` units (see
+    `Timebase`).
     """
-    if len(rsfs) < 2:
-        return 0.
+    rsf = columnar.as_columnar(rsf)
+    start_interval_idx = rsf.interval_starting_at(start)
+    assert start_interval_idx >= rsf.loop_interval
+
+    # frames of one loop, starting with the first frame of the start interval
+    offsets = rsf.interval_frame_offsets
+    rotation = np.r_[offsets[start_interval_idx]:offsets[-1],
+                     offsets[rsf.loop_interval]:offsets[start_interval_idx]]
+    return _frames_running_switches(rsf, rotation, scale)
+
+
+def compute_transient_running_switches(rsf: RSF, end: SourceTicks,
+                                       scale: int = 1) -> RunningSwitches:
+    """Compute the running switches (see `RunningSwitches`) of `rsf` from its
+    begining up to the date `end`, typically the steady state start of a set of
+    RSFs (see `compute_steady_state_start()`). `end` *must* match the begining
+    of an interval, or an error is raised. See `compute_running_switches()` for
+    `scale`.
+    """
+    rsf = columnar.as_columnar(rsf)
+    end_frame = rsf.interval_frame_offsets[rsf.interval_starting_at(end)]
+    return _frames_running_switches(rsf, np.arange(end_frame), scale)
+
+
+def _frames_running_switches(rsf: columnar.ColumnarRSF, frames: np.ndarray,
+                             scale: int) -> RunningSwitches:
+    """Compute the running switches of the sequence of frames of `rsf` at the
+    positions `frames`"""
+    lengths = _scale_ticks(rsf.frame_length_qt[frames], scale)
+    running = rsf.frame_type[frames] == FrameType.EXEC
+
+    frame_starts = np.cumsum(lengths) - lengths
+    toggles = np.flatnonzero(running[1:] != running[:-1]) + 1
+    return RunningSwitches(
+        running_at_start=bool(running[0]) if len(running) else False,
+        dates=frame_starts[toggles],
+        length=int(lengths.sum()),
+    )
+
+
+def _running_deltas(switches: RunningSwitches) -> np.ndarray:
+    """Variation (+1 or -1) of the number of running RSFs caused by each switch
+    of `switches`, plus a leading +1 at date 0 if it starts running"""
+    first_toggle = -1 if switches.running_at_start else 1
+    toggles = np.full(len(switches.dates), first_toggle, dtype=np.int64)
+    toggles[1::2] = -first_toggle
+    return np.r_[int(switches.running_at_start), toggles]
+
+
+def _merge_running_switches(all_switches: Sequence[RunningSwitches]
+                            ) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge the running switches of several RSFs over spans of the same length
+    in a single sorted timeline, and return the number of running RSFs on each
+    segment of the timeline, along with the duration of the segments"""
+    length_qtt = all_switches[0].length
+    assert all(switches.length == length_qtt for switches in all_switches), \
+        "all RSFs must have loops of the same length"
+
+    dates = np.concatenate([np.r_[0, switches.dates]
+                            for switches in all_switches])
+    deltas = np.concatenate([_running_deltas(switches)
+                             for switches in all_switches])
+    order = np.argsort(dates, kind='stable')
+    dates = dates[order]
+    running_rsfs = np.cumsum(deltas[order])
+    if _profile is not None:
+        _profile.count('sweep iterations', len(dates))
+    durations = np.diff(np.r_[dates, length_qtt])
+    return running_rsfs, durations
+
+
+class ConcurrencyLevels(NamedTuple):
+    """Time during which exactly k RSFs run a Task, for k from 0 to the number
+    of RSFs, over one loop of a set of RSFs (or over their hyperperiod if their
+    loops have different lengths)"""
+
+    durations: Tuple[QuotaTimerTicks, ...]
+    """Total time during which exactly k RSFs run a Task, indexed by k"""
+
+    longest: Optional[Tuple[QuotaTimerTicks, ...]]
+    """Longest contiguous stretch of time during which exactly k RSFs run a
+    Task, indexed by k. Stretches wrap from the end of the loop back to its
+    begining. `None` over a hyperperiod, see `compute_concurrency_levels()`."""
+
+    length: QuotaTimerTicks
+    """Length of the loop or hyperperiod (see `compute_concurrency_levels()`
+    for the unit)"""
+
+    def parallelism_ratio(self) -> Ratio:
+        """Un-normalized parallelism ratio, see `compute_parallelism_ratio()`
+        """
+        nb_rsfs = len(self.durations) - 1
+        if nb_rsfs < 2:
+            return 0.
+        workload_qtt = sum(max(0, running_rsfs - 1) * duration
+                           for running_rsfs, duration
+                           in enumerate(self.durations))
+        return workload_qtt / (self.length * (nb_rsfs - 1))
+
+    def to_json(self) -> dict:
+        """Convert these levels to a JSON-serializable dict"""
+        return self._asdict()
+
+    @classmethod
+    def from_json(cls, levels: dict) -> 'ConcurrencyLevels':
+        """Convert back a dict returned by `to_json()`"""
+        return cls(
+            durations=tuple(levels['durations']),
+            longest=(None if levels['longest'] is None
+                     else tuple(levels['longest'])),
+            length=levels['length'],
+        )
 
+
+def _sweep_concurrency_levels(all_switches: Sequence[RunningSwitches],
+                              cyclic: bool = True) -> ConcurrencyLevels:
+    """Compute the concurrency levels over the merged running switches
+    `all_switches`; stretches wrap from the end back to the begining of the
+    timeline if `cyclic`"""
+    running_rsfs, durations = _merge_running_switches(all_switches)
+    nb_levels = len(all_switches) + 1
+
+    # simultaneous switches leave empty segments, which must not split the
+    # stretches of a given level
+    non_empty = durations > 0
+    running_rsfs = running_rsfs[non_empty]
+    durations = durations[non_empty]
+
+    # total time by level, summed as integers (durations may exceed 2**53, see
+    # `_scale_ticks()`)
+    level_durations = np.zeros(nb_levels, dtype=durations.dtype)
+    longest = np.zeros(nb_levels, dtype=durations.dtype)
+    if len(durations):
+        order = np.argsort(running_rsfs, kind='stable')
+        levels, level_starts = np.unique(running_rsfs[order],
+                                         return_index=True)
+        level_durations[levels] = np.add.reduceat(durations[order],
+                                                  level_starts)
+
+        # merge the consecutive segments of the same level into stretches
+        stretch_starts = np.flatnonzero(
+            np.r_[True, running_rsfs[1:] != running_rsfs[:-1]])
+        stretch_levels = running_rsfs[stretch_starts]
+        stretch_durations = np.add.reduceat(durations, stretch_starts)
+        if cyclic and len(stretch_starts) > 1 \
+                and stretch_levels[0] == stretch_levels[-1]:
+            stretch_durations[0] += stretch_durations[-1]
+            stretch_levels = stretch_levels[:-1]
+            stretch_durations = stretch_durations[:-1]
+        np.maximum.at(longest, stretch_levels, stretch_durations)
+
+    return ConcurrencyLevels(
+        durations=tuple(int(duration) for duration in level_durations),
+        longest=tuple(int(duration) for duration in longest),
+        length=all_switches[0].length,
+    )
+
+
+def _folded_running_counts(switches: RunningSwitches, modulus: int,
+                           span: int, dtype) -> Tuple[np.ndarray, np.ndarray]:
+    """Fold the loop of `switches` modulo `modulus`, which divides its length,
+    and return the number of dates of the loop congruent to r modulo `modulus`
+    at which a Task runs, for r from 0 to `span` (a multiple of `modulus`), as
+    a piecewise constant function: the dates at which it changes, starting with
+    0, and its value from each of these dates"""
+    bounds = np.r_[0, switches.dates, switches.length].astype(dtype)
+    running = (np.arange(len(bounds) - 1) % 2
+               == int(not switches.running_at_start))
+    starts = bounds[:-1][running]
+    lengths = bounds[1:][running] - starts
+
+    # a running segment covers each residue once per whole modulus in its
+    # length, and the rest of it covers an arc of residues, split in two if it
+    # wraps past the modulus
+    constant = int((lengths // modulus).sum())
+    arc_starts = starts % modulus
+    arc_ends = arc_starts + lengths % modulus
+    wraps = arc_ends > modulus
+    dates = np.concatenate([arc_starts, np.minimum(arc_ends, modulus),
+                            np.zeros(int(wraps.sum()), dtype=dtype),
+                            arc_ends[wraps] - modulus])
+    deltas = np.r_[np.ones(len(arc_starts), dtype=np.int64),
+                   -np.ones(len(arc_starts), dtype=np.int64),
+                   np.ones(int(wraps.sum()), dtype=np.int64),
+                   -np.ones(int(wraps.sum()), dtype=np.int64)]
+
+    # the folded loop repeats every `modulus` residues up to `span`
+    tiles = np.arange(span // modulus, dtype=np.int64).astype(dtype) * modulus
+    dates = (tiles[:, None] + dates[None, :]).ravel()
+    deltas = np.tile(deltas, len(tiles))
+    order = np.argsort(dates, kind='stable')
+    return (np.r_[np.zeros(1, dtype=dtype), dates[order]],
+            constant + np.r_[0, np.cumsum(deltas[order])].astype(dtype))
+
+
+def _fold_concurrency_levels(all_switches: Sequence[RunningSwitches]
+                             ) -> ConcurrencyLevels:
+    """Compute the concurrency levels over the hyperperiod of the running
+    switches `all_switches`, whose loops have different lengths, without
+    unrolling them.
+
+    Let M be the lcm of the gcds of the loop lengths L_i taken by pairs: at a
+    date t = r + M.s of the hyperperiod H, with 0 <= r < M, the running state
+    of RSF i depends on r and on s mod n_i = L_i / gcd(L_i, M). The n_i are
+    pairwise coprime, and H = M.prod(n_i), so that by the Chinese remainder
+    theorem, as s spans [0, H / M), the tuples (s mod n_i) span all the
+    combinations once. Given r, the RSFs are thus independent: if c_i(r) of the
+    n_i dates of RSF i congruent to r run a Task, the number of dates of the
+    hyperperiod congruent to r at which exactly k RSFs run a Task is the
+    coefficient of x^k in prod(n_i - c_i(r) + c_i(r).x). The c_i are piecewise
+    constant, with O(S.M / L_i) pieces for S switches.
+    """
+    lengths = [switches.length for switches in all_switches]
+    hyperperiod = _lcm(lengths)
+    modulus = _lcm(math.gcd(length_a, length_b) for length_a, length_b
+                   in itertools.combinations(lengths, 2))
+    nb_loops = [length // math.gcd(length, modulus) for length in lengths]
+    assert all(math.gcd(nb_a, nb_b) == 1
+               for nb_a, nb_b in itertools.combinations(nb_loops, 2))
+
+    # integers stay 64-bit as long as the hyperperiod fits in them, and become
+    # Python integers (in arrays of objects) otherwise, so that they remain
+    # exact
+    dtype = np.int64 if hyperperiod <= _INT64_MAX else object
+    all_counts = [
+        _folded_running_counts(switches, length // nb, modulus, dtype)
+        for switches, length, nb in zip(all_switches, lengths, nb_loops)
+    ]
+
+    # running counts of each RSF on each segment of the merged residues
+    dates = np.unique(np.concatenate([np.zeros(1, dtype=dtype), *(
+        count_dates[count_dates < modulus] for count_dates, _ in all_counts)]))
+    durations = np.diff(np.r_[dates, np.array([modulus], dtype=dtype)])
+    if _profile is not None:
+        _profile.count('fold segments', len(dates))
+    coefficients = np.zeros((len(dates), len(all_switches) + 1), dtype=dtype)
+    coefficients[:, 0] = 1
+    for (count_dates, counts), nb in zip(all_counts, nb_loops):
+        running = counts[np.searchsorted(count_dates, dates, side='right') - 1]
+        running = running.astype(dtype)[:, None]
+        shifted = coefficients * running
+        coefficients *= nb - running
+        coefficients[:, 1:] += shifted[:, :-1]
+
+    level_durations = (coefficients * durations[:, None]).sum(axis=0)
+    return ConcurrencyLevels(
+        durations=tuple(int(duration) for duration in level_durations),
+        longest=None,
+        length=hyperperiod,
+    )
+
+
+def compute_concurrency_levels(rsfs: Sequence[RSF],
+                               timebase: Optional[Timebase] = None
+                               ) -> ConcurrencyLevels:
+    """Compute the concurrency levels (see `ConcurrencyLevels`) of the loop of
+    the RSFs `rsfs`, from the date when the last RSF starts its loop, with a
+    single sweep over their merged running switches. The parallelism ratio is
+    derived from them, see `ConcurrencyLevels.parallelism_ratio()`.
+
+    If the loops of the RSFs have different lengths, the levels are computed
+    over their hyperperiod (the lcm of the lengths) by folding the running
+    switches of each RSF, see `_fold_concurrency_levels()`, rather than by
+    unrolling them; the longest stretches are then not computed.
+
+    Durations are in units of `timebase`, computed with `compute_timebase()`
+    if not given.
+    """
+    rsfs = [columnar.as_columnar(rsf) for rsf in rsfs]
+    steady_start = compute_steady_state_start(rsfs)
+    timebase = timebase or compute_timebase(rsfs)
+    return _loop_concurrency_levels([
+        compute_running_switches(rsf, steady_start, timebase.scales[rsf.core])
+        for rsf in rsfs
+    ])
+
+
+def _loop_concurrency_levels(all_switches: Sequence[RunningSwitches]
+                             ) -> ConcurrencyLevels:
+    """Compute the concurrency levels over the running switches of one loop of
+    each RSF, or over their hyperperiod if their loops have different
+    lengths"""
+    if len({switches.length for switches in all_switches}) > 1:
+        return _fold_concurrency_levels(all_switches)
+    return _sweep_concurrency_levels(all_switches)
+
+
+def _compute_parallelism_ratio_sweep(rsfs: Sequence[RSF],
+                                     timebase: Optional[Timebase]) -> Ratio:
+    """Sweep-line implementation of `compute_parallelism_ratio()`: the running
+    switches of all the RSFs are merged in a single sorted timeline, on which
+    the number of running RSFs is a cumulative sum (see
+    `compute_concurrency_levels()`).
+    """
+    return compute_concurrency_levels(rsfs, timebase).parallelism_ratio()
+
+
+class TaskOverlaps(NamedTuple):
+    """Sparse matrix of the time during which two Tasks mapped on different
+    cores run simultaneously, over one loop of a set of RSFs"""
+
+    tasks: Tuple[Tuple[CoreId, TaskName], ...]
+    """Tasks overlapping at least one other Task, identified by their core id
+    and name, sorted"""
+
+    overlaps: Dict[Tuple[Index, Index], QuotaTimerTicks]
+    """Non-zero overlap times, indexed by pairs of indices in `tasks`, the
+    first one being the lowest"""
+
+    length: QuotaTimerTicks
+    """Length of the loop (see `compute_task_overlaps()` for the unit)"""
+
+    def overlap(self, task_a: Tuple[CoreId, TaskName],
+                task_b: Tuple[CoreId, TaskName]) -> QuotaTimerTicks:
+        """Time during which the Tasks `task_a` and `task_b` (core id and
+        name) run simultaneously"""
+        try:
+            pair = sorted((self.tasks.index(task_a), self.tasks.index(task_b)))
+        except ValueError: # overlaps no other Task
+            return 0
+        return self.overlaps.get(tuple(pair), 0)
+
+    def to_json(self) -> dict:
+        """Convert these overlaps to a JSON-serializable dict"""
+        return {
+            'tasks': [list(task) for task in self.tasks],
+            'overlaps': [[*pair, overlap]
+                         for pair, overlap in sorted(self.overlaps.items())],
+            'length': self.length,
+        }
+
+    @classmethod
+    def from_json(cls, overlaps: dict) -> 'TaskOverlaps':
+        """Convert back a dict returned by `to_json()`"""
+        return cls(
+            tasks=tuple((core, task) for core, task in overlaps['tasks']),
+            overlaps={(task_a, task_b): overlap
+                      for task_a, task_b, overlap in overlaps['overlaps']},
+            length=overlaps['length'],
+        )
+
+
+def compute_task_overlaps(rsfs: Sequence[RSF],
+                          timebase: Optional[Timebase] = None) -> TaskOverlaps:
+    """Compute the time during which each pair of Tasks mapped on different
+    cores run simultaneously over one loop of the RSFs `rsfs` (see
+    `TaskOverlaps`), from the date when the last RSF starts its loop.
+
+    The exec segments of each RSF (consecutive exec frames of the same Task)
+    are merged in a single sorted timeline, on which the running Task of each
+    RSF is looked up once; the overlaps of each pair of RSFs are then summed by
+    pair of Tasks with a single sort, in O(S.N^2) for S segments and N RSFs,
+    whatever the number of Tasks. A `ValueError` is raised if the loops of the
+    RSFs have different lengths.
+
+    Durations are in units of `timebase`, computed with `compute_timebase()`
+    if not given.
+    """
+    rsfs = [columnar.as_columnar(rsf) for rsf in rsfs]
+    steady_start = compute_steady_state_start(rsfs)
+    timebase = timebase or compute_timebase(rsfs)
+
+    # exec segments of one loop of each RSF, from the steady state start: the
+    # running Task is identified by its index in `tasks`, -1 meaning none
+    tasks = []
+    all_segment_starts = []
+    all_segment_tasks = []
+    loop_len_qtt = None
+    for rsf in rsfs:
+        start_interval_idx = rsf.interval_starting_at(steady_start)
+        offsets = rsf.interval_frame_offsets
+        rotation = np.r_[offsets[start_interval_idx]:offsets[-1],
+                         offsets[rsf.loop_interval]:offsets[start_interval_idx]]
+        lengths = _scale_ticks(rsf.frame_length_qt[rotation],
+                               timebase.scales[rsf.core])
+        frame_tasks = np.where(rsf.frame_type[rotation] == FrameType.EXEC,
+                               rsf.frame_task[rotation] + len(tasks), -1)
+        tasks.extend((rsf.core, name) for name in rsf.task_names)
+
+        if loop_len_qtt is None:
+            loop_len_qtt = int(lengths.sum())
+        if int(lengths.sum()) != loop_len_qtt:
+            raise ValueError('task overlaps require all the RSFs to have loops'
+                             ' of the same length')
+
+        new_segments = np.r_[True, frame_tasks[1:] != frame_tasks[:-1]]
+        all_segment_starts.append((np.cumsum(lengths) - lengths)[new_segments])
+        all_segment_tasks.append(frame_tasks[new_segments])
+
+    # running Task of each RSF on each segment of the merged timeline
+    dates = np.unique(np.concatenate(all_segment_starts))
+    durations = np.diff(np.r_[dates, loop_len_qtt])
+    running_tasks = [
+        segment_tasks[np.searchsorted(segment_starts, dates, side='right') - 1]
+        for segment_starts, segment_tasks
+        in zip(all_segment_starts, all_segment_tasks)
+    ]
+
+    # overlap time by pair of Tasks, the pair (a, b) being encoded as
+    # a * len(tasks) + b in 64 bits, as the Task ids may be 32-bit integers,
+    # summed as integers (see `_sweep_concurrency_levels()`)
+    pair_keys = [np.zeros(0, dtype=np.int64)]
+    pair_durations = [durations[:0]]
+    for tasks_a, tasks_b in itertools.combinations(running_tasks, 2):
+        both = (tasks_a >= 0) & (tasks_b >= 0)
+        pair_keys.append(tasks_a[both].astype(np.int64) * len(tasks)
+                         + tasks_b[both])
+        pair_durations.append(durations[both])
+    pair_keys = np.concatenate(pair_keys)
+    order = np.argsort(pair_keys, kind='stable')
+    keys, key_starts = np.unique(pair_keys[order], return_index=True)
+    overlap_qtt = (np.add.reduceat(np.concatenate(pair_durations)[order],
+                                   key_starts)
+                   if len(keys) else [])
+
+    # keep only the Tasks overlapping others, sorted
+    overlaps = {}
+    for key, overlap in zip(keys.tolist(), list(overlap_qtt)):
+        if overlap:
+            pair = sorted((tasks[key // len(tasks)], tasks[key % len(tasks)]))
+            overlaps[tuple(pair)] = int(overlap)
+    overlapping = sorted({task for pair in overlaps for task in pair})
+    task_idx = {task: idx for idx, task in enumerate(overlapping)}
+    return TaskOverlaps(
+        tasks=tuple(overlapping),
+        overlaps={(task_idx[task_a], task_idx[task_b]): overlap
+                  for (task_a, task_b), overlap in overlaps.items()},
+        length=loop_len_qtt,
+    )
+
+
+def _compute_parallelism_ratio_walker(rsfs: Sequence[RSF]) -> Ratio:
+    """Reference implementation of `compute_parallelism_ratio()`, advancing an
+    `RSFWalker` on each RSF in lockstep, from a running switch to the next"""
     steady_start = compute_steady_state_start(rsfs)
     walkers = [RSFWalker(rsf, steady_start) for rsf in rsfs]
     nb_cores = len(rsfs)
+    loop_len_qtt = sum(interval.length_qtt for interval in
+                       rsfs[0].intervals[rsfs[0].loop_interval:])
 
+    elapsed_qtt = 0
     total_len_qtt = 0
     workload_qtt = 0
 
     while True:
-        next_switch = min(walker.next_running_switch() for walker in walkers)
+        # do not walk past the end of the loop, even if no RSF switches there
+        next_switch = min(
+            min(walker.next_running_switch() for walker in walkers),
+            loop_len_qtt - elapsed_qtt
+        )
+        elapsed_qtt += next_switch
         number_of_running_rsfs = len(
             [walker for walker in walkers if walker.is_running()])
         coeff = max(0, number_of_running_rsfs - 1)
@@ -365,48 +1409,1968 @@ def compute_parallelism_ratio(rsfs: Sequence[RSF]) -> Ratio:
     return workload_qtt / total_len_qtt
 
 
+PARALLELISM_RATIO_ENGINES = ('sweep', 'walker')
+
+def compute_parallelism_ratio(rsfs: Sequence[RSF], engine='sweep',
+                              timebase: Optional[Timebase] = None) -> Ratio:
+    """Compute an un-normalized parallelism ratio on all the RSFs listed in
+    `rsfs`. The ratio is computed such that:
+
+        - it is linear in time;
+        - it equals 0 iff at any given time in steady state, at most one Task is
+          scheduled among all the RSFs;
+        - it equals 1 iff at any given time in steady state, all the RSFs
+          schedule a Task (thus implying that the global CPU load is 100%).
+
+    Because of that last property, the value returned by this function should be
+    normalized with the global CPU load to be more meaningful.
+
+    `engine` is one of `PARALLELISM_RATIO_ENGINES`: the default "sweep" engine
+    merges the running switches of all the RSFs (see
+    `compute_running_switches()`), in O(S.log(S)) for S switches, while the
+    "walker" engine advances an `RSFWalker` per RSF, and is kept as a
+    reference.
+
+    The "sweep" engine merges the RSFs on the common `timebase` of their quota
+    timers, computed with `compute_timebase()` if not given, and over their
+    hyperperiod if their loops have different lengths (see
+    `compute_concurrency_levels()`), while the "walker" engine assumes that
+    they all have the same frequency and loops of the same length.
+    """
+    if len(rsfs) < 2:
+        return 0.
+
+    if engine == 'sweep':
+        return _compute_parallelism_ratio_sweep(rsfs, timebase)
+    if engine == 'walker':
+        return _compute_parallelism_ratio_walker(rsfs)
+    raise ValueError(f'unknown parallelism ratio engine: {engine}')
+
+
+def compute_transient_parallelism_ratio(rsfs: Sequence[RSF],
+                                        timebase: Optional[Timebase] = None
+                                        ) -> Ratio:
+    """Compute the un-normalized parallelism ratio (see
+    `compute_parallelism_ratio()`) of the transient state of the RSFs `rsfs`,
+    i.e. from their begining up to the date when the last RSF starts its loop
+    (see `compute_steady_state_start()`). The ratio is 0 if there is no such
+    transient state.
+
+    The transient states of all the RSFs must last the same time in units of
+    `timebase` (computed with `compute_timebase()` if not given), or a
+    `ValueError` is raised: unlike loops, they do not repeat over a
+    hyperperiod.
+    """
+    rsfs = [columnar.as_columnar(rsf) for rsf in rsfs]
+    steady_start = compute_steady_state_start(rsfs)
+    if len(rsfs) < 2 or steady_start == 0:
+        return 0.
+    timebase = timebase or compute_timebase(rsfs)
+    return _transient_parallelism_ratio([
+        compute_transient_running_switches(rsf, steady_start,
+                                           timebase.scales[rsf.core])
+        for rsf in rsfs
+    ])
+
+
+def _transient_parallelism_ratio(all_switches: Sequence[RunningSwitches]
+                                 ) -> Ratio:
+    """Compute the parallelism ratio over the running switches of the
+    transient state of each RSF"""
+    if len({switches.length for switches in all_switches}) > 1:
+        raise ValueError('the transient states of the RSFs have different'
+                         ' lengths: are the quota timer frequencies right?')
+    return _sweep_concurrency_levels(all_switches,
+                                     cyclic=False).parallelism_ratio()
+
+
+WINDOW_UNITS = ('qtt', 'intervals')
+
+class WindowedLoads(NamedTuple):
+    """Peak and lowest CPU loads over a window sliding along the loop of a set
+    of RSFs, wrapping from the end of the loop back to its begining"""
+
+    width: int
+    """Width of the window, in `unit`"""
+
+    unit: str
+    """One of `WINDOW_UNITS`: quota timer ticks, or number of intervals"""
+
+    peak_by_core: Dict[CoreId, Ratio]
+    """Highest CPU load of a window, indexed by core id"""
+
+    lowest_by_core: Dict[CoreId, Ratio]
+    """Lowest CPU load of a window, indexed by core id"""
+
+    peak: Optional[Ratio]
+    """Highest global CPU load of a window on all cores, or `None` when the
+    width is a number of intervals (intervals are not aligned across cores), or
+    when the loops of the cores have different lengths"""
+
+    lowest: Optional[Ratio]
+    """Lowest global CPU load of a window on all cores, see `peak`"""
+
+    def to_json(self) -> dict:
+        """Convert these loads to a JSON-serializable dict"""
+        return {
+            'width': self.width,
+            'unit': self.unit,
+            'peak_by_core': {str(core): load
+                             for core, load in self.peak_by_core.items()},
+            'lowest_by_core': {str(core): load
+                               for core, load in self.lowest_by_core.items()},
+            'peak': self.peak,
+            'lowest': self.lowest,
+        }
+
+    @classmethod
+    def from_json(cls, loads: dict) -> 'WindowedLoads':
+        """Convert back a dict returned by `to_json()`"""
+        return cls(
+            width=loads['width'],
+            unit=loads['unit'],
+            peak_by_core={int(core): load
+                          for core, load in loads['peak_by_core'].items()},
+            lowest_by_core={int(core): load
+                             for core, load in loads['lowest_by_core'].items()},
+            peak=loads['peak'],
+            lowest=loads['lowest'],
+        )
+
+
+def _exec_time_function(switches: RunningSwitches):
+    """Return a function computing, for an array of dates `x` (in quota timer
+    ticks since the begining of the loop, possibly beyond its end), the time
+    spent running a Task between the begining of the loop and `x`, from the
+    prefix sums of the running time at each switch of `switches`"""
+    bounds = np.r_[0, switches.dates, switches.length]
+    running = (np.arange(len(bounds) - 1) % 2
+               == int(not switches.running_at_start))
+    prefix = np.r_[0, np.cumsum(running * np.diff(bounds))]
+
+    def exec_time(dates: np.ndarray) -> np.ndarray:
+        nb_loops, dates = np.divmod(dates, switches.length)
+        run = np.searchsorted(bounds, dates, side='right') - 1
+        return (nb_loops * prefix[-1] + prefix[run]
+                + running[run] * (dates - bounds[run]))
+
+    return exec_time
+
+
+# number of windows evaluated at once in low memory mode
+_WINDOWS_CHUNK_SIZE = 2**16
+
+def _windowed_loads_qtt(rsfs: Sequence[RSF], width: QuotaTimerTicks,
+                        timebase: Timebase, low_memory: bool = False
+                        ) -> WindowedLoads:
+    """`compute_windowed_loads()` for a width in quota timer ticks"""
+    steady_start = compute_steady_state_start(rsfs)
+    all_switches = [
+        compute_running_switches(rsf, steady_start, timebase.scales[rsf.core])
+        for rsf in rsfs
+    ]
+    # the global extrema are only computed over a common loop
+    same_length = len({switches.length for switches in all_switches}) == 1
+
+    # the exec time within a window is piecewise linear in the date of the
+    # window, so that its extrema are reached when either end of the window is
+    # at a running switch
+    def candidates(switches: RunningSwitches) -> np.ndarray:
+        dates = np.r_[0, switches.dates]
+        return np.r_[dates, (dates - width) % switches.length]
+
+    peak_by_core = {}
+    lowest_by_core = {}
+    exec_times = []
+    for rsf, switches in zip(rsfs, all_switches):
+        exec_time = _exec_time_function(switches)
+        starts = candidates(switches)
+        window_exec = exec_time(starts + width) - exec_time(starts)
+        peak_by_core[rsf.core] = int(window_exec.max()) / width
+        lowest_by_core[rsf.core] = int(window_exec.min()) / width
+        exec_times.append(exec_time)
+    if not same_length:
+        return WindowedLoads(width=width, unit='qtt',
+                             peak_by_core=peak_by_core,
+                             lowest_by_core=lowest_by_core,
+                             peak=None, lowest=None)
+
+    # in low memory mode, the global windows are evaluated by chunks, without
+    # removing the duplicate starts (which requires sorting them)
+    global_starts = np.concatenate(
+        [candidates(switches) for switches in all_switches])
+    if not low_memory:
+        global_starts = np.unique(global_starts)
+    chunk_size = _WINDOWS_CHUNK_SIZE if low_memory else len(global_starts)
+    peaks = []
+    lowests = []
+    for chunk_start in range(0, len(global_starts), chunk_size):
+        starts = global_starts[chunk_start:chunk_start + chunk_size]
+        global_exec = np.zeros(len(starts), dtype=np.int64)
+        for exec_time in exec_times:
+            global_exec += exec_time(starts + width) - exec_time(starts)
+        peaks.append(int(global_exec.max()))
+        lowests.append(int(global_exec.min()))
+
+    return WindowedLoads(
+        width=width,
+        unit='qtt',
+        peak_by_core=peak_by_core,
+        lowest_by_core=lowest_by_core,
+        peak=max(peaks) / (width * len(rsfs)),
+        lowest=min(lowests) / (width * len(rsfs)),
+    )
+
+
+def _windowed_loads_intervals(rsfs: Iterable[RSF], width: int
+                              ) -> WindowedLoads:
+    """`compute_windowed_loads()` for a width in number of intervals"""
+    peak_by_core = {}
+    lowest_by_core = {}
+    for rsf in map(columnar.as_columnar, rsfs):
+        exec_lengths = np.where(rsf.frame_type == FrameType.EXEC,
+                                rsf.frame_length_qt, 0)
+        interval_exec = rsf.interval_sums(exec_lengths)[rsf.loop_interval:]
+        interval_len = rsf.interval_length_qtt[rsf.loop_interval:]
+
+        # prefix sums over two loops, so that windows can wrap; windows wider
+        # than the loop span it entirely a number of times
+        nb_loops, width_rem = divmod(width, len(interval_len))
+        loads = []
+        for values in (interval_exec, interval_len):
+            prefix = np.r_[0, np.cumsum(np.tile(values, 2))]
+            starts = np.arange(len(values))
+            loads.append(nb_loops * prefix[len(values)]
+                         + prefix[starts + width_rem] - prefix[starts])
+        window_exec, window_len = loads
+        window_loads = window_exec / np.maximum(window_len, 1)
+        peak_by_core[rsf.core] = float(window_loads.max())
+        lowest_by_core[rsf.core] = float(window_loads.min())
+
+    return WindowedLoads(
+        width=width,
+        unit='intervals',
+        peak_by_core=peak_by_core,
+        lowest_by_core=lowest_by_core,
+        peak=None,
+        lowest=None,
+    )
+
+
+def compute_windowed_loads(rsfs: Sequence[RSF], width: int,
+                           unit: str = 'qtt',
+                           timebase: Optional[Timebase] = None,
+                           low_memory: bool = False) -> WindowedLoads:
+    """Compute the peak and lowest CPU loads over a window of `width` sliding
+    along the loop of the RSFs `rsfs` (see `WindowedLoads`), `unit` being one of
+    `WINDOW_UNITS`.
+
+    A window in quota timer ticks slides continuously, from the date when the
+    last RSF starts its loop: its exec time is computed in O(log(S)) from the
+    prefix sums of the exec time at each of the S running switches of an RSF
+    (see `compute_running_switches()`), and only the windows starting or ending
+    at a switch need to be considered. A window in number of intervals slides
+    from an interval to the next, in O(1) each with prefix sums over the
+    intervals.
+
+    If the quota timers have different frequencies, a width "in quota timer
+    ticks" is actually in units of `timebase` (computed with
+    `compute_timebase()` if not given).
+
+    If `low_memory`, the windows in quota timer ticks are evaluated by chunks,
+    which bounds the memory they use at the expense of some speed.
+    """
+    if width <= 0:
+        raise ValueError(f'invalid window width: {width}')
+    rsfs = [columnar.as_columnar(rsf) for rsf in rsfs]
+    if unit == 'qtt':
+        return _windowed_loads_qtt(rsfs, width,
+                                   timebase or compute_timebase(rsfs),
+                                   low_memory)
+    if unit == 'intervals':
+        return _windowed_loads_intervals(rsfs, width)
+    raise ValueError(f'unknown window unit: {unit}')
+
+
+################################################################################
+# STREAMING ANALYSES
+################################################################################
+
+# The analyses below read the RSF databases sequentially with `RSFStream`, so
+# that the memory they use does not depend on the size of the databases, at
+# the expense of speed: see `compute_stats()` for the streaming mode.
+
+def open_rsfdbs(paths: Sequence[Path]) -> List[RSFStream]:
+    """Open the RSF databases at `paths` for sequential reads (see
+    `rt_rsf.stream`), in the same order"""
+    from rt_rsf.stream import RSFStream
+
+    streams = []
+    try:
+        for path in paths:
+            streams.append(RSFStream(path))
+    except:
+        for stream in streams:
+            stream.close()
+        raise
+    return streams
+
+
+def _stream_interval_starting_at(stream: RSFStream, date_st: SourceTicks
+                                 ) -> Index:
+    """Index of the (first) interval of `stream` starting at date `date_st`, in
+    source ticks, or a `ValueError` if no interval starts at that date"""
+    start_st = 0
+    for interval_idx, (length_st, _, _) in enumerate(
+            stream.interval_lengths()):
+        if start_st == date_st:
+            return interval_idx
+        if start_st > date_st:
+            break
+        start_st += length_st
+    raise ValueError(f"could not find an interval starting at date {date_st}")
+
+
+def compute_stream_steady_state_start(streams: Iterable[RSFStream]
+                                      ) -> SourceTicks:
+    """`compute_steady_state_start()` of the RSF databases `streams`"""
+    return max(sum(length_st for length_st, _, _
+                   in stream.interval_lengths(0, stream.loop_interval))
+               for stream in streams)
+
+
+def compute_stream_timebase(streams: Sequence[RSFStream],
+                            frequencies: Optional[Dict[CoreId, Fraction]]
+                            = None) -> Timebase:
+    """`compute_timebase()` of the RSF databases `streams`"""
+    frequencies = dict(frequencies or {})
+    bounds = {}
+    for stream in streams:
+        if stream.core not in frequencies:
+            # same as `_rsf_frequency_bounds()`
+            length_qtt = length_ns = nb_intervals = 0
+            for _, interval_qtt, interval_ns in stream.interval_lengths():
+                if interval_ns <= 0:
+                    bounds[stream.core] = None
+                    break
+                length_qtt += interval_qtt
+                length_ns += interval_ns
+                nb_intervals += 1
+            else:
+                bounds[stream.core] = _quota_timer_frequency_bounds(
+                    length_qtt, length_ns, nb_intervals)
+    frequencies.update(_derive_frequencies(bounds))
+    if any(frequencies[stream.core] is None for stream in streams):
+        return Timebase(unit=None,
+                        scales={stream.core: 1 for stream in streams})
+    return compute_timebase(streams, frequencies)
+
+
+def compute_stream_phase_cpu_loads(streams: Sequence[RSFStream],
+                                   timebase: Timebase) -> PhaseCpuLoads:
+    """`compute_phase_cpu_loads()` of the RSF databases `streams`, in a single
+    sequential pass over the frames of each database"""
+    steady_start = compute_stream_steady_state_start(streams)
+
+    # same segments as in `compute_phase_cpu_loads()`
+    phases = {'steady': [1, 2]}
+    if steady_start > 0:
+        phases['transient'] = [0, 1]
+    phase_qtt = {phase: [] for phase in phases}
+    rsf_loads = {phase: {} for phase in phases}
+    task_loads = {phase: {} for phase in phases}
+
+    for stream in streams:
+        core_id = stream.core
+        steady_interval = _stream_interval_starting_at(stream, steady_start)
+        interval_segments = (0, stream.loop_interval, steady_interval)
+        interval_length_qtt = [0] * 3
+        for interval_idx, (_, length_qtt, _) in enumerate(
+                stream.interval_lengths()):
+            segment = bisect.bisect_right(interval_segments, interval_idx) - 1
+            interval_length_qtt[segment] += length_qtt
+
+        # exec time and number of exec frames of each Task in each segment
+        task_segment_qtt = defaultdict(lambda: [0] * 3)
+        task_segment_nb_frames = defaultdict(lambda: [0] * 3)
+        nb_frames = 0
+        for interval_idx, frame_type, length_qt, task in stream.frames():
+            segment = bisect.bisect_right(interval_segments, interval_idx) - 1
+            nb_frames += 1
+            if frame_type == FrameType.EXEC:
+                task_segment_qtt[task][segment] += length_qt
+                task_segment_nb_frames[task][segment] += 1
+        if _profile is not None:
+            _profile.count('frames streamed', nb_frames)
+
+        phase_length_qtt = {
+            'steady': sum(interval_length_qtt[1:]),
+            'transient': sum(interval_length_qtt[:2]),
+        }
+        for phase, phase_segments in phases.items():
+            rsf_length_qtt = phase_length_qtt[phase]
+            task_load_qtt = {
+                task: sum(segment_qtt[segment] for segment in phase_segments)
+                for task, segment_qtt in task_segment_qtt.items()
+                if any(task_segment_nb_frames[task][segment]
+                       for segment in phase_segments)
+            }
+            task_loads[phase][core_id] = {
+                task: load_qtt / rsf_length_qtt
+                for task, load_qtt in task_load_qtt.items()
+            }
+            rsf_load_qtt = sum(task_load_qtt.values())
+            rsf_loads[phase][core_id] = rsf_load_qtt / rsf_length_qtt
+            scale = timebase.scales[core_id]
+            phase_qtt[phase].append((rsf_load_qtt * scale,
+                                     rsf_length_qtt * scale))
+
+    loads = {
+        phase: CpuLoads(
+            by_core=rsf_loads[phase],
+            by_task=task_loads[phase],
+            overall=_overall_load(phase_qtt[phase]),
+        )
+        for phase in phases
+    }
+    return PhaseCpuLoads(steady=loads['steady'],
+                         transient=loads.get('transient'))
+
+
+def _stream_running_events(stream: RSFStream,
+                           interval_ranges: Iterable[Tuple[Index, Index]],
+                           scale: int) -> Iterator[Tuple[int, int]]:
+    """Iterate over the dates (in units of a timebase of which a quota timer
+    tick lasts `scale` units) at which `stream` starts or stops running a Task
+    over the frames of the `interval_ranges` (start, stop) in sequence, along
+    with the variation of the number of running RSFs (+1 or -1)"""
+    date = 0
+    running = False
+    nb_frames = 0
+    for start, stop in interval_ranges:
+        for _, frame_type, length_qt, _ in stream.frames(start, stop,
+                                                         tasks=False):
+            frame_running = frame_type == FrameType.EXEC
+            if frame_running != running:
+                yield date, 1 if frame_running else -1
+                running = frame_running
+            date += length_qt * scale
+            nb_frames += 1
+    if _profile is not None:
+        _profile.count('frames streamed', nb_frames)
+
+
+def _stream_concurrency_levels(all_events: Sequence[Iterator[Tuple[int, int]]],
+                               length: int, cyclic: bool
+                               ) -> ConcurrencyLevels:
+    """`_sweep_concurrency_levels()` over the running events of several RSFs
+    over spans of `length` units (see `_stream_running_events()`), merged on
+    the fly"""
+    nb_levels = len(all_events) + 1
+    durations = [0] * nb_levels
+    longest = [0] * nb_levels
+    first_stretch = None # (level, duration) of the first stretch
+    stretch_level = None # level of the current stretch, and its duration
+    stretch = 0
+    date = 0
+    running_rsfs = 0
+    nb_events = 0
+    for event_date, delta in itertools.chain(heapq.merge(*all_events),
+                                             [(length, 0)]):
+        nb_events += 1
+        # simultaneous events leave empty segments, which must not split the
+        # stretches of a given level
+        if event_date > date:
+            duration = event_date - date
+            durations[running_rsfs] += duration
+            if running_rsfs == stretch_level:
+                stretch += duration
+            else:
+                if stretch_level is not None:
+                    longest[stretch_level] = max(longest[stretch_level],
+                                                 stretch)
+                    if first_stretch is None:
+                        first_stretch = (stretch_level, stretch)
+                stretch_level, stretch = running_rsfs, duration
+            date = event_date
+        running_rsfs += delta
+    if _profile is not None:
+        _profile.count('sweep iterations', nb_events)
+
+    if stretch_level is not None:
+        if cyclic and first_stretch is not None \
+                and first_stretch[0] == stretch_level:
+            stretch += first_stretch[1]
+        longest[stretch_level] = max(longest[stretch_level], stretch)
+    return ConcurrencyLevels(durations=tuple(durations),
+                             longest=tuple(longest), length=length)
+
+
+def compute_stream_concurrency_levels(streams: Sequence[RSFStream],
+                                      timebase: Timebase) -> ConcurrencyLevels:
+    """`compute_concurrency_levels()` of the RSF databases `streams`, merging
+    their running switches as they are read. Their loops must have the same
+    length in units of `timebase`, or a `ValueError` is raised: the running
+    switches are not folded over a hyperperiod."""
+    steady_start = compute_stream_steady_state_start(streams)
+    all_events = []
+    lengths = set()
+    for stream in streams:
+        scale = timebase.scales[stream.core]
+        steady_interval = _stream_interval_starting_at(stream, steady_start)
+        # one loop, from the steady state start
+        all_events.append(_stream_running_events(stream, [
+            (steady_interval, stream.nb_intervals),
+            (stream.loop_interval, steady_interval)], scale))
+        lengths.add(sum(length_qtt for _, length_qtt, _ in
+                        stream.interval_lengths(stream.loop_interval))
+                    * scale)
+    if len(lengths) > 1:
+        raise ValueError('the loops of the RSFs have different lengths: their'
+                         ' hyperperiod cannot be streamed')
+    return _stream_concurrency_levels(all_events, lengths.pop(), cyclic=True)
+
+
+def compute_stream_transient_parallelism_ratio(streams: Sequence[RSFStream],
+                                               timebase: Timebase) -> Ratio:
+    """`compute_transient_parallelism_ratio()` of the RSF databases
+    `streams`"""
+    steady_start = compute_stream_steady_state_start(streams)
+    if len(streams) < 2 or steady_start == 0:
+        return 0.
+    all_events = []
+    lengths = set()
+    for stream in streams:
+        scale = timebase.scales[stream.core]
+        steady_interval = _stream_interval_starting_at(stream, steady_start)
+        all_events.append(_stream_running_events(
+            stream, [(0, steady_interval)], scale))
+        lengths.add(sum(length_qtt for _, length_qtt, _ in
+                        stream.interval_lengths(0, steady_interval)) * scale)
+    if len(lengths) > 1:
+        raise ValueError('the transient states of the RSFs have different'
+                         ' lengths: are the quota timer frequencies right?')
+    return _stream_concurrency_levels(all_events, lengths.pop(),
+                                      cyclic=False).parallelism_ratio()
+
+
+################################################################################
+# VALIDATION
+################################################################################
+
+# The analyses assume that the RSF databases are consistent, and do not check
+# it themselves: the checks below are run over whole databases beforehand,
+# either `'fast'`, only on the fields kept in the models, or `'strict'`, also
+# on the fields of the frames read back from the databases. See
+# `compute_stats()` for when they are run.
+
+VALIDATION_LEVELS = ('off', 'fast', 'strict')
+
+def _check_rsf(rsf: columnar.ColumnarRSF) -> List[str]:
+    """Fast checks of the RSF `rsf`, returning a message for each failure"""
+    failures = []
+    nb_intervals = len(rsf.interval_length_qtt)
+    if not 0 <= rsf.loop_interval < nb_intervals:
+        failures.append(f'loop interval {rsf.loop_interval} out of the'
+                        f' {nb_intervals} intervals')
+    inconsistent = np.flatnonzero(rsf.interval_sums(rsf.frame_length_qt)
+                                  != rsf.interval_length_qtt)
+    if len(inconsistent):
+        failures.append(f'{len(inconsistent)} intervals (first:'
+                        f' {inconsistent[0]}) do not last as long as their'
+                        f' frames')
+    return failures
+
+
+def _check_frame_fields(rsf: columnar.ColumnarRSF, path: Path) -> List[str]:
+    """Strict checks of the fields of the frames of the RSF database at
+    `path`, whose model is `rsf`, returning a message for each failure"""
+    fields = columnar.read_frame_fields(path, (
+        'index_in_interval', 'index_in_rsf', 'distance_to_next_frame_start',
+        'distance_to_next_task_frame'))
+    if len(fields['index_in_rsf']) != rsf.nb_frames:
+        return [f'{len(fields["index_in_rsf"])} frames instead of'
+                f' {rsf.nb_frames}']
+    failures = []
+
+    # indices only restart with each interval
+    interval_starts = np.zeros(rsf.nb_frames, dtype=bool)
+    interval_starts[rsf.interval_frame_offsets[:-1][
+        np.diff(rsf.interval_frame_offsets) > 0]] = True
+    index_in_interval = fields['index_in_interval'].astype(np.int64)
+    if np.any(np.diff(index_in_interval)[~interval_starts[1:]] <= 0):
+        failures.append('index_in_interval is not increasing in each'
+                        ' interval')
+    if np.any(np.diff(fields['index_in_rsf'].astype(np.int64)) < 0):
+        failures.append('index_in_rsf is not monotonic')
+
+    # the distance to the next frame is its length, in source ticks or quota
+    # timer ticks, i.e. in a ratio shared by all the frames (up to rounding)
+    distances = fields['distance_to_next_frame_start'].astype(np.float64)
+    lengths = rsf.frame_length_qt.astype(np.float64)
+    ratio = distances.sum() / lengths.sum() if lengths.sum() else 0.
+    if not np.allclose(distances, lengths * ratio, rtol=1e-9, atol=1.):
+        failures.append('distance_to_next_frame_start is not proportional to'
+                        ' length_qt')
+    if not np.array_equal(fields['distance_to_next_task_frame'],
+                          rsf.next_task_frame_distances()):
+        failures.append('distance_to_next_task_frame does not lead to the'
+                        ' next interval of the Task')
+    return failures
+
+
+def _check_loop_lengths(rsfs: Iterable[columnar.ColumnarRSF]) -> List[str]:
+    """Strict check that the loops of all the RSFs `rsfs` last as long, in
+    source ticks (the analyses would use their hyperperiod otherwise)"""
+    loop_lengths_st = {}
+    for rsf in rsfs:
+        starts = rsf.interval_starts_st()
+        loop_lengths_st[rsf.core] = int(starts[-1] - starts[rsf.loop_interval])
+    if len(set(loop_lengths_st.values())) <= 1:
+        return []
+    return ['loops of different lengths: ' + ', '.join(
+        f'{length} st (core {core})'
+        for core, length in sorted(loop_lengths_st.items()))]
+
+
+def _raise_failures(failures: Dict[CoreId, List[str]],
+                    plan_failures: List[str]) -> None:
+    messages = [f'core {core}: {failure}'
+                for core, core_failures in sorted(failures.items())
+                for failure in core_failures] + plan_failures
+    if messages:
+        raise ValueError('invalid RSF databases: ' + '; '.join(messages))
+
+
+def validate_rsfs(rsfs: Sequence[RSF], paths: Optional[Sequence[Path]] = None,
+                  level: str = 'fast') -> None:
+    """Check that the RSFs `rsfs` are consistent, or raise a `ValueError`
+    listing every inconsistency found. At the `'fast'` level, the loop interval
+    of each RSF must be one of its intervals, and each interval must last as
+    long as its frames. At the `'strict'` level, the RSF databases at `paths`
+    which the RSFs were loaded from are also read back to check that the
+    indices of their frames are monotonic, and that their distances to the
+    next frame and to the next interval of their Task match the frames; the
+    loops of the RSFs must then all last as long.
+    """
+    if level not in VALIDATION_LEVELS:
+        raise ValueError(f'invalid validation level: {level}')
+    if level == 'off':
+        return
+    if level == 'strict' and paths is None:
+        raise ValueError('the paths of the RSF databases are needed by the'
+                         ' strict validation')
+
+    rsfs = [columnar.as_columnar(rsf) for rsf in rsfs]
+    failures = {rsf.core: _check_rsf(rsf) for rsf in rsfs}
+    plan_failures = []
+    if level == 'strict':
+        for rsf, path in zip(rsfs, paths):
+            if not failures[rsf.core]:
+                failures[rsf.core] = _check_frame_fields(rsf, path)
+        if not any(failures.values()):
+            plan_failures = _check_loop_lengths(rsfs)
+    _raise_failures(failures, plan_failures)
+
+
+def validate_streams(streams: Sequence[RSFStream], level: str = 'fast'
+                     ) -> None:
+    """`validate_rsfs()` of the RSF databases `streams`, in a sequential pass
+    over the frames of each database. Only the `'fast'` level is supported."""
+    if level not in VALIDATION_LEVELS:
+        raise ValueError(f'invalid validation level: {level}')
+    if level == 'off':
+        return
+    if level == 'strict':
+        raise ValueError('the strict validation cannot be done in streaming'
+                         ' mode')
+
+    failures = {}
+    for stream in streams:
+        failures[stream.core] = []
+        if not 0 <= stream.loop_interval < stream.nb_intervals:
+            failures[stream.core].append(
+                f'loop interval {stream.loop_interval} out of the'
+                f' {stream.nb_intervals} intervals')
+        interval_qtt = [length_qtt for _, length_qtt, _
+                        in stream.interval_lengths()]
+        for interval_idx, _, length_qt, _ in stream.frames(tasks=False):
+            interval_qtt[interval_idx] -= length_qt
+        inconsistent = [interval_idx for interval_idx, qtt
+                        in enumerate(interval_qtt) if qtt]
+        if inconsistent:
+            failures[stream.core].append(
+                f'{len(inconsistent)} intervals (first: {inconsistent[0]})'
+                f' do not last as long as their frames')
+    _raise_failures(failures, [])
+
+
+################################################################################
+# CACHE
+################################################################################
+
+class Cache:
+    """Persistent on-disk cache of decoded RSF databases and of the stats
+    computed on them.
+
+    Entries are content-addressed: an RSF database is identified by the SHA-256
+    digest of its content, of the version of rsfstat and of `SCHEMA_VERSION`
+    (see `digest()`), and stats by the digests of all the databases they were
+    computed on. The cache is bounded to `max_size` bytes: the least recently
+    used entries are evicted first.
+
+    The cache is best effort: entries which cannot be read, written or evicted
+    (e.g. in a read-only directory) are treated as missing, with a warning on
+    the standard error.
+
+    Params:
+        directory: cache directory, `$XDG_CACHE_HOME/rsfstat` (or
+            `~/.cache/rsfstat`) by default
+        max_size: maximum size of the cache, in bytes
+    """
+
+    DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+    SCHEMA_VERSION = 4
+    """Version of the cached models and of the algorithms of the cached stats,
+    to be bumped whenever they change"""
+
+    def __init__(self, directory: Path = None,
+                 max_size: int = DEFAULT_MAX_SIZE):
+        self.directory = directory or self.default_directory()
+        self.max_size = max_size
+        self._digests = {} # path -> (stat key, digest)
+        self._warned = False
+        # size of the entries, scanned by the first eviction, then updated by
+        # each write: the directory is only scanned again when it is too big
+        self._size = None # type: Optional[int]
+
+    @staticmethod
+    def default_directory() -> Path:
+        xdg_cache_home = os.environ.get('XDG_CACHE_HOME')
+        return (Path(xdg_cache_home) if xdg_cache_home
+                else Path.home() / '.cache') / 'rsfstat'
+
+    def digest(self, path: Path) -> str:
+        """Compute the key of the RSF database at `path`. Digests are memoized
+        as long as the size and modification date of the file do not change.
+        """
+        stat = path.stat()
+        stat_key = (stat.st_size, stat.st_mtime_ns)
+        memoized = self._digests.get(path)
+        if memoized is not None and memoized[0] == stat_key:
+            return memoized[1]
+
+        sha = hashlib.sha256(f'{__version__} {self.SCHEMA_VERSION}'.encode())
+        with open(path, 'rb') as stream:
+            for chunk in iter(lambda: stream.read(1 << 20), b''):
+                sha.update(chunk)
+        self._digests[path] = (stat_key, sha.hexdigest())
+        return sha.hexdigest()
+
+    def _entry_path(self, kind: str, key: str, suffix: str) -> Path:
+        return self.directory / kind / f'{key}{suffix}'
+
+    def _warn(self, error: Exception) -> None:
+        """Report an error of the cache on the standard error, once"""
+        if not self._warned:
+            print(f'warning: ignoring the errors of the cache in'
+                  f' {self.directory}: {error}', file=sys.stderr)
+            self._warned = True
+
+    def _read(self, path: Path):
+        """Open the entry at `path` for reading and mark it as recently used,
+        or return `None` if it does not exist or cannot be read"""
+        try:
+            stream = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        except OSError as error:
+            self._warn(error)
+            return None
+        try:
+            os.utime(path)
+        except OSError as error: # e.g. read-only cache: still usable
+            self._warn(error)
+        return stream
+
+    def _write(self, path: Path, write) -> None:
+        """Atomically (re)write the entry at `path` with the function `write`
+        taking a binary stream, then enforce the size limit of the cache"""
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as stream:
+                write(stream)
+            size = tmp_path.stat().st_size
+            try:
+                size -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+        except OSError as error:
+            self._warn(error)
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+        if self._size is None or self._size + size > self.max_size:
+            self.evict()
+        else:
+            self._size += size
+
+    def load_model(self, digest: str) -> Optional[RSF]:
+        """Return the columnar RSF cached for `digest`, if any"""
+        stream = self._read(self._entry_path('models', digest, '.npz'))
+        if stream is None:
+            return None
+        with stream:
+            try:
+                return columnar.load(stream)
+            except (KeyError, ValueError, OSError) as error:
+                # corrupted entry: decode the database again
+                self._warn(error)
+                return None
+
+    def store_model(self, digest: str, rsf: RSF) -> None:
+        self._write(self._entry_path('models', digest, '.npz'),
+                    lambda stream: columnar.save(rsf, stream))
+
+    @staticmethod
+    def _stats_key(digests: Iterable[str], options: str) -> str:
+        return hashlib.sha256(
+            ' '.join([*sorted(digests), options]).encode()).hexdigest()
+
+    def load_stats(self, digests: Iterable[str],
+                   options: str = '') -> Optional[dict]:
+        """Return the stats cached for the set of RSF databases identified by
+        `digests`, and computed with `options` (any string identifying the
+        options of the computation), if any"""
+        stream = self._read(self._entry_path(
+            'stats', self._stats_key(digests, options), '.json'))
+        if stream is None:
+            return None
+        with stream:
+            try:
+                return json.load(stream)
+            except (ValueError, OSError) as error:
+                # corrupted entry: compute the stats again
+                self._warn(error)
+                return None
+
+    def store_stats(self, digests: Iterable[str], stats: dict,
+                    options: str = '') -> None:
+        """Cache `stats` (a JSON-serializable dict) for the set of RSF
+        databases identified by `digests`, see `load_stats()`"""
+        self._write(
+            self._entry_path('stats', self._stats_key(digests, options),
+                             '.json'),
+            lambda stream: stream.write(json.dumps(stats).encode()))
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in
+        `max_size` bytes. The entries being written (by any process) are
+        ignored."""
+        entries = []
+        try:
+            for entry in self.directory.glob('*/*'):
+                if entry.suffix == '.tmp':
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError: # evicted concurrently
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        except OSError as error:
+            self._warn(error)
+            return
+
+        total_size = sum(size for _, size, _ in entries)
+        self._size = total_size
+        for _, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as error: # e.g. still open on Windows
+                self._warn(error)
+                continue
+            total_size -= size
+            self._size = total_size
+
+
+def cpu_loads_to_json(loads: CpuLoads) -> dict:
+    """Convert `loads` to a JSON-serializable dict"""
+    return {
+        'by_core': {str(core): load for core, load in loads.by_core.items()},
+        'by_task': {str(core): task_loads
+                    for core, task_loads in loads.by_task.items()},
+        'overall': loads.overall,
+    }
+
+
+def cpu_loads_from_json(loads: dict) -> CpuLoads:
+    """Convert back a dict returned by `cpu_loads_to_json()`"""
+    return CpuLoads(
+        by_core={int(core): load for core, load in loads['by_core'].items()},
+        by_task={int(core): task_loads
+                 for core, task_loads in loads['by_task'].items()},
+        overall=loads['overall'],
+    )
+
+################################################################################
+
+def load_rsfdbs(paths: Sequence[Path], jobs: int = 1,
+                cache: Optional[Cache] = None) -> List[RSF]:
+    """Load the RSF databases at `paths` in their columnar representation
+    (see `rt_rsf.columnar`), in the same order. If `jobs` is greater than 1, the
+    databases are decoded concurrently by a pool of `jobs` processes; 0 means
+    one process per CPU. If a `cache` is given, databases are read from it when
+    possible, and stored in it otherwise.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    for path in paths:
+        # sanity check
+        if not path.exists():
+            raise FileNotFoundError(str(path))
+
+    rsfdbs = [None] * len(paths)
+    if cache is not None:
+        with _phase('model cache lookup'):
+            digests = [cache.digest(path) for path in paths]
+            rsfdbs = [cache.load_model(digest) for digest in digests]
+    missing = [idx for idx, rsfdb in enumerate(rsfdbs) if rsfdb is None]
+
+    # the databases are memory-mapped: reading them is part of the decoding
+    jobs = jobs or os.cpu_count() or 1
+    with _phase('decode'):
+        if jobs == 1 or len(missing) < 2:
+            loaded = [_load_rsfdb(paths[idx]) for idx in missing]
+        else:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(missing))) \
+                    as executor:
+                loaded = list(executor.map(_load_rsfdb,
+                                           [paths[idx] for idx in missing]))
+
+    if _profile is not None:
+        _profile.count('RSF databases decoded', len(loaded))
+        _profile.count('frames decoded',
+                       sum(rsfdb.nb_frames for rsfdb in loaded))
+    for idx, rsfdb in zip(missing, loaded):
+        rsfdbs[idx] = rsfdb
+    if cache is not None:
+        with _phase('model cache store'):
+            for idx in missing:
+                cache.store_model(digests[idx], rsfdbs[idx])
+    return rsfdbs
+
+
+def _load_rsfdb(path: Path) -> RSF:
+    """Load a single RSF database (must be picklable for `load_rsfdbs()`)"""
+    return columnar.load_from_file(path, use_mmap=True)
+
+
+################################################################################
+# APPLICATION STATS
+################################################################################
+
+RSFDBS_SUBDIR = Path('app_gendir', 'psylink', 'db', 'rsfs')
+"""Directory containing the RSF databases, relative to a generation
+directory"""
+
+RSFDB_NAME = re.compile(r'core_(\d+)_rt_rsf\.ks')
+
+
+def find_rsfdbs(gendir: Path) -> List[Path]:
+    """List the RSF databases of the Application generated in `gendir`, sorted
+    by core id"""
+    rsfdbs_dir = gendir / RSFDBS_SUBDIR
+    try:
+        entries = list(os.scandir(rsfdbs_dir))
+    except (FileNotFoundError, NotADirectoryError):
+        raise FileNotFoundError(
+            f'{rsfdbs_dir}: no RSF databases directory') from None
+
+    rsfdbs = []
+    for entry in entries:
+        match = RSFDB_NAME.fullmatch(entry.name)
+        if match is not None and entry.is_file():
+            rsfdbs.append((int(match.group(1)), rsfdbs_dir / entry.name))
+    return [path for _, path in sorted(rsfdbs)]
+
+
+SCAN_THREADS = 8
+"""Number of threads scanning directories concurrently in `scan_gendirs()`"""
+
+def _scan_dir(directory: Path) -> Tuple[Optional[List[Path]], List[Path]]:
+    """Scan a single directory for `scan_gendirs()`: return the RSF databases
+    found if `directory` is a generation directory (`None` otherwise), and the
+    sub-directories to scan next.
+    """
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name == RSFDBS_SUBDIR.parts[0] and entry.is_dir():
+                # generation directory: only look at its RSF databases, and
+                # do not search for other generation directories within it
+                try:
+                    return find_rsfdbs(directory), []
+                except FileNotFoundError:
+                    return None, []
+            if not entry.name.startswith('.') \
+                    and entry.is_dir(follow_symlinks=False):
+                subdirs.append(directory / entry.name)
+    return None, subdirs
+
+
+def scan_gendirs(roots: Iterable[Path],
+                 threads: int = SCAN_THREADS
+                 ) -> Iterator[Tuple[Path, List[Path]]]:
+    """Search for generation directories under each of the directories
+    `roots` (included), and yield `(gendir, rsfdbs)` pairs as soon as they are
+    found, `rsfdbs` being the RSF databases of `gendir` sorted by core id.
+
+    Directories are scanned concurrently by `threads` threads with
+    `os.scandir()`, which is well suited to slow network file systems. Hidden
+    directories, symbolic links, and the content of generation directories are
+    pruned.
+    """
+    from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                    wait)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        scanned = {}  # type: Dict[Future, Path]
+
+        def scan(directory: Path) -> Future:
+            future = executor.submit(_scan_dir, directory)
+            scanned[future] = directory
+            return future
+
+        pending = {scan(Path(root)) for root in roots}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                gendir = scanned.pop(future)
+                try:
+                    rsfdbs, subdirs = future.result()
+                except OSError: # e.g. permission denied: skip it
+                    continue
+                pending.update(scan(subdir) for subdir in subdirs)
+                if rsfdbs:
+                    yield gendir, rsfdbs
+
+
+class Stats(NamedTuple):
+    """Stats computed on the set of RSFs of an Application"""
+
+    cpu_loads: CpuLoads
+    """See `compute_cpu_loads()`"""
+
+    parallelism_ratio: Ratio
+    """Un-normalized parallelism ratio, see `compute_parallelism_ratio()`"""
+
+    windowed_loads: Tuple[WindowedLoads, ...] = ()
+    """See `compute_windowed_loads()`, for each window requested"""
+
+    transient_cpu_loads: Optional[CpuLoads] = None
+    """See `PhaseCpuLoads.transient`"""
+
+    transient_parallelism_ratio: Ratio = 0.
+    """Un-normalized parallelism ratio of the transient state, see
+    `compute_transient_parallelism_ratio()`"""
+
+    concurrency_levels: Optional[ConcurrencyLevels] = None
+    """See `compute_concurrency_levels()`"""
+
+    timebase: Optional[Timebase] = None
+    """Timebase of the durations, see `compute_timebase()`"""
+
+    task_overlaps: Optional[TaskOverlaps] = None
+    """See `compute_task_overlaps()`, if requested"""
+
+    def normalized_parallelism_ratio(self) -> Ratio:
+        """Parallelism ratio normalized with the global CPU load"""
+        if not self.cpu_loads.overall:
+            return 0.
+        return self.parallelism_ratio / self.cpu_loads.overall
+
+    def normalized_transient_parallelism_ratio(self) -> Ratio:
+        """Parallelism ratio of the transient state normalized with its global
+        CPU load"""
+        if self.transient_cpu_loads is None \
+                or not self.transient_cpu_loads.overall:
+            return 0.
+        return (self.transient_parallelism_ratio
+                / self.transient_cpu_loads.overall)
+
+    def to_json(self) -> dict:
+        """Convert these stats to a JSON-serializable dict"""
+        return {
+            'cpu_loads': cpu_loads_to_json(self.cpu_loads),
+            'parallelism_ratio': self.parallelism_ratio,
+            'windowed_loads': [loads.to_json()
+                               for loads in self.windowed_loads],
+            'transient_cpu_loads': (
+                None if self.transient_cpu_loads is None
+                else cpu_loads_to_json(self.transient_cpu_loads)),
+            'transient_parallelism_ratio': self.transient_parallelism_ratio,
+            'concurrency_levels': (
+                None if self.concurrency_levels is None
+                else self.concurrency_levels.to_json()),
+            'task_overlaps': (
+                None if self.task_overlaps is None
+                else self.task_overlaps.to_json()),
+            'timebase': (
+                None if self.timebase is None else self.timebase.to_json()),
+        }
+
+    @classmethod
+    def from_json(cls, stats: dict) -> 'Stats':
+        """Convert back a dict returned by `to_json()`"""
+        return cls(
+            cpu_loads=cpu_loads_from_json(stats['cpu_loads']),
+            parallelism_ratio=stats['parallelism_ratio'],
+            windowed_loads=tuple(map(WindowedLoads.from_json,
+                                     stats.get('windowed_loads', ()))),
+            transient_cpu_loads=(
+                None if stats.get('transient_cpu_loads') is None
+                else cpu_loads_from_json(stats['transient_cpu_loads'])),
+            transient_parallelism_ratio=stats.get(
+                'transient_parallelism_ratio', 0.),
+            concurrency_levels=(
+                None if stats.get('concurrency_levels') is None
+                else ConcurrencyLevels.from_json(stats['concurrency_levels'])),
+            task_overlaps=(
+                None if stats.get('task_overlaps') is None
+                else TaskOverlaps.from_json(stats['task_overlaps'])),
+            timebase=(
+                None if stats.get('timebase') is None
+                else Timebase.from_json(stats['timebase'])),
+        )
+
+
+Window = Tuple[int, str]
+"""Width and unit of a window, see `compute_windowed_loads()`"""
+
+# memory used by a process running rsfstat, before loading anything
+_PROCESS_NBYTES = 40 * 2**20
+# peak memory used by each analysis of `compute_stats()` on top of the RSFs,
+# per frame of the RSFs, measured (RSS) on synthetic plans (see
+# `rt_rsf.generate`)
+_ANALYSES_NBYTES_PER_FRAME = {
+    'cpu loads': 8,
+    'concurrency levels': 64,
+    'windowed loads': 184,
+    'windowed loads (low memory)': 72,
+    'task overlaps': 144,
+}
+
+def estimate_memory(paths: Sequence[Path], jobs: int = 1,
+                    windows: Sequence[Window] = (), overlaps: bool = False,
+                    low_memory: bool = False) -> int:
+    """Estimate the peak memory in bytes used by `compute_stats()` to compute
+    the stats of the RSF databases at `paths` with the given options, from the
+    numbers of intervals and frames read in their vectors (see
+    `columnar.read_sizes()`), i.e. without decoding them. If `low_memory`, the
+    databases are decoded sequentially whatever `jobs` is, and the windowed
+    loads are computed in low memory mode (see `compute_windowed_loads()`).
+    """
+    sizes = [columnar.read_sizes(path) for path in paths]
+    models = [nb_intervals * columnar.INTERVAL_NBYTES
+              + nb_frames * columnar.FRAME_NBYTES
+              for nb_intervals, nb_frames in sizes]
+    nb_frames = sum(nb_frames for _, nb_frames in sizes)
+
+    analyses = ['cpu loads', 'concurrency levels']
+    if any(unit == 'qtt' for _, unit in windows):
+        analyses.append('windowed loads (low memory)' if low_memory
+                        else 'windowed loads')
+    if overlaps:
+        analyses.append('task overlaps')
+    estimate = (_PROCESS_NBYTES + sum(models) + nb_frames * max(
+        _ANALYSES_NBYTES_PER_FRAME[analysis] for analysis in analyses))
+
+    # each worker process decodes a database, then sends a copy of it
+    jobs = 1 if low_memory else jobs or os.cpu_count() or 1
+    if jobs > 1 and len(paths) > 1:
+        estimate += min(jobs, len(paths)) * (_PROCESS_NBYTES
+                                             + 2 * max(models))
+    return estimate
+
+
+def compute_stats(paths: Sequence[Path], jobs: int = 1,
+                  cache: Optional[Cache] = None,
+                  windows: Sequence[Window] = (),
+                  overlaps: bool = False,
+                  frequencies: Optional[Dict[CoreId, Fraction]] = None,
+                  max_memory: Optional[int] = None,
+                  streaming: bool = False, validate: str = 'fast') -> Stats:
+    """Compute the stats of the Application whose RSF databases are at
+    `paths`, or get them from `cache` if they have already been computed. See
+    `load_rsfdbs()` for `jobs`. Windowed CPU loads are computed for each of the
+    `windows`, and the overlaps of the Tasks if `overlaps`. See
+    `compute_timebase()` for `frequencies`.
+
+    If `streaming`, the databases are read sequentially rather than loaded (see
+    `open_rsfdbs()`), so that the memory used does not depend on their size;
+    windowed CPU loads and overlaps cannot be computed then, and the loops of
+    the RSFs must have the same length. If the memory needed, as estimated by
+    `estimate_memory()`, exceeds `max_memory` bytes, the stats are computed in
+    low memory mode, or else in streaming mode, or a `ValueError` is raised if
+    neither is possible.
+
+    The databases are checked at the `validate` level of `validate_rsfs()`
+    (`validate_streams()` in streaming mode) before being analyzed, unless it
+    is `'off'`; the level is part of the options the stats are cached with,
+    except for `'fast'`.
+    """
+    if streaming and (windows or overlaps):
+        raise ValueError('windowed CPU loads and overlaps cannot be computed'
+                         ' in streaming mode')
+    options = ' '.join([
+        *(f'window={width}{unit}' for width, unit in windows),
+        *(['overlaps'] if overlaps else []),
+        *(f'frequency={core}:{frequency}'
+          for core, frequency in sorted((frequencies or {}).items())),
+        *([f'validate={validate}'] if validate != 'fast' else []),
+    ])
+    if cache is not None:
+        for path in paths:
+            # sanity check
+            if not path.exists():
+                raise FileNotFoundError(str(path))
+        with _phase('stats cache lookup'):
+            digests = [cache.digest(path) for path in paths]
+            cached = cache.load_stats(digests, options)
+        if cached is not None:
+            return Stats.from_json(cached)
+
+    low_memory = False
+    if max_memory is not None and not streaming:
+        with _phase('memory estimate'):
+            estimate = estimate_memory(paths, jobs, windows, overlaps)
+            if estimate > max_memory:
+                estimate = estimate_memory(paths, jobs, windows, overlaps,
+                                           low_memory=True)
+                low_memory = True
+        # streaming only needs the memory of the process itself
+        if estimate > max_memory and not windows and not overlaps:
+            estimate = _PROCESS_NBYTES
+            streaming = True
+        if estimate > max_memory:
+            raise ValueError(f'the stats need about {estimate // 2**20} MB'
+                             f' of memory, more than the maximum of'
+                             f' {max_memory // 2**20} MB')
+
+    # each analysis is a phase of the profile, if enabled
+    if streaming:
+        stats = _compute_stream_stats(paths, frequencies, validate)
+    else:
+        with _phase('load'):
+            rsfdbs = load_rsfdbs(paths, jobs=1 if low_memory else jobs,
+                                 cache=cache)
+        with _phase('validation'):
+            validate_rsfs(rsfdbs, paths, validate)
+        with _phase('timebase'):
+            timebase = compute_timebase(rsfdbs, frequencies)
+        with _phase('cpu loads'):
+            cpu_loads = compute_phase_cpu_loads(rsfdbs, timebase)
+        with _phase('concurrency levels'):
+            concurrency_levels = compute_concurrency_levels(rsfdbs, timebase)
+        with _phase('windowed loads'):
+            windowed_loads = tuple(
+                compute_windowed_loads(rsfdbs, width, unit, timebase,
+                                       low_memory)
+                for width, unit in windows)
+        with _phase('transient parallelism ratio'):
+            transient_parallelism_ratio = compute_transient_parallelism_ratio(
+                rsfdbs, timebase)
+        with _phase('task overlaps'):
+            task_overlaps = (compute_task_overlaps(rsfdbs, timebase)
+                             if overlaps else None)
+        stats = Stats(
+            cpu_loads=cpu_loads.steady,
+            parallelism_ratio=concurrency_levels.parallelism_ratio(),
+            windowed_loads=windowed_loads,
+            transient_cpu_loads=cpu_loads.transient,
+            transient_parallelism_ratio=transient_parallelism_ratio,
+            concurrency_levels=concurrency_levels,
+            task_overlaps=task_overlaps,
+            timebase=timebase,
+        )
+    if cache is not None:
+        with _phase('stats cache store'):
+            cache.store_stats(digests, stats.to_json(), options)
+    return stats
+
+
+def _compute_stream_stats(paths: Sequence[Path],
+                          frequencies: Optional[Dict[CoreId, Fraction]],
+                          validate: str) -> Stats:
+    """`compute_stats()` in streaming mode"""
+    streams = open_rsfdbs(paths)
+    try:
+        with _phase('validation'):
+            validate_streams(streams, validate)
+        with _phase('timebase'):
+            timebase = compute_stream_timebase(streams, frequencies)
+        with _phase('cpu loads'):
+            cpu_loads = compute_stream_phase_cpu_loads(streams, timebase)
+        with _phase('concurrency levels'):
+            concurrency_levels = compute_stream_concurrency_levels(streams,
+                                                                   timebase)
+        with _phase('transient parallelism ratio'):
+            transient_parallelism_ratio = \
+                compute_stream_transient_parallelism_ratio(streams, timebase)
+    finally:
+        for stream in streams:
+            stream.close()
+    return Stats(
+        cpu_loads=cpu_loads.steady,
+        parallelism_ratio=concurrency_levels.parallelism_ratio(),
+        windowed_loads=(),
+        transient_cpu_loads=cpu_loads.transient,
+        transient_parallelism_ratio=transient_parallelism_ratio,
+        concurrency_levels=concurrency_levels,
+        task_overlaps=None,
+        timebase=timebase,
+    )
+
+
+def analyze_gendir(gendir: Path, cache: Optional[Cache] = None,
+                   rsfdbs: Optional[List[Path]] = None,
+                   **options) -> dict:
+    """Compute the stats of the Application generated in `gendir`, and return
+    them as a JSON-serializable record. Errors are reported in the record
+    rather than raised. `rsfdbs` are the RSF databases of `gendir` if already
+    known, e.g. from `scan_gendirs()`. `options` are passed to
+    `compute_stats()`.
+    """
+    record = {'gendir': str(gendir)}
+    try:
+        paths = find_rsfdbs(gendir) if rsfdbs is None else rsfdbs
+        if not paths:
+            raise FileNotFoundError(f'{gendir}: no RSF database found')
+        record['rsfdbs'] = [str(path) for path in paths]
+        stats = compute_stats(paths, cache=cache, **options)
+    except (OSError, ValueError, AssertionError) as error:
+        record['error'] = f'{type(error).__name__}: {error}'
+        return record
+
+    record.update(_stats_record(stats))
+    return record
+
+
+def _stats_record(stats: Stats) -> dict:
+    """JSON-serializable record of `stats`, with the normalized ratios"""
+    record = stats.to_json()
+    record['normalized_parallelism_ratio'] = \
+        stats.normalized_parallelism_ratio()
+    record['normalized_transient_parallelism_ratio'] = \
+        stats.normalized_transient_parallelism_ratio()
+    return record
+
+
+################################################################################
+# WATCH MODE
+################################################################################
+
+class IncrementalStats:
+    """Stats of a set of RSF databases kept up to date with `update()` as the
+    databases change, e.g. while the schedule of an Application is tuned: only
+    the databases which changed since the previous update are decoded again,
+    and the CPU loads and the running switches of the RSFs which did not
+    change are reused, so that `stats()` only recomputes the stats of the
+    whole set from them. See `compute_stats()` for the options; windowed CPU
+    loads and overlaps are always recomputed from all the RSFs.
+    """
+
+    def __init__(self, jobs: int = 1, cache: Optional[Cache] = None,
+                 windows: Sequence[Window] = (), overlaps: bool = False,
+                 frequencies: Optional[Dict[CoreId, Fraction]] = None,
+                 validate: str = 'fast'):
+        self.jobs = jobs
+        self.cache = cache
+        self.windows = windows
+        self.overlaps = overlaps
+        self.frequencies = frequencies
+        self.validate = validate
+        self.paths = [] # type: List[Path]
+        self._rsfdbs = {} # type: Dict[Path, Tuple[Tuple[int, int], RSF]]
+        # results of the analyses of each RSF, by analysis, valid as long as
+        # the steady state start and the timebase do not change
+        self._results = {} # type: Dict[Path, dict]
+        self._context = None
+
+    @staticmethod
+    def signature(path: Path) -> Tuple[int, int]:
+        """Modification time and size of the file at `path`, which change when
+        it is written"""
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def update(self, paths: Sequence[Path]) -> List[Path]:
+        """Make the RSF databases at `paths` the set of which the stats are
+        computed, and return those which were (re)loaded, i.e. which were not
+        in the set or changed since the previous update. If they cannot be
+        loaded, or are not valid, an error is raised and the set is left
+        unchanged.
+        """
+        # the signatures are taken before loading, so that a database written
+        # meanwhile is reloaded by the next update
+        signatures = {path: self.signature(path) for path in paths}
+        changed = [path for path in paths
+                   if self._rsfdbs.get(path, (None,))[0] != signatures[path]]
+        with _phase('load'):
+            rsfdbs = load_rsfdbs(changed, jobs=self.jobs, cache=self.cache)
+        with _phase('validation'):
+            validate_rsfs(rsfdbs, changed, self.validate)
+            if self.validate == 'strict':
+                rsfs = {path: rsf for path, (_, rsf) in self._rsfdbs.items()}
+                rsfs.update(zip(changed, rsfdbs))
+                _raise_failures({}, _check_loop_lengths(
+                    columnar.as_columnar(rsfs[path]) for path in paths))
+
+        self._rsfdbs = {path: self._rsfdbs[path] for path in paths
+                        if path in self._rsfdbs}
+        self._results = {path: self._results[path] for path in paths
+                         if path in self._results}
+        for path, rsfdb in zip(changed, rsfdbs):
+            self._rsfdbs[path] = signatures[path], rsfdb
+            self._results[path] = {}
+        self.paths = list(paths)
+        return changed
+
+    def _analysis(self, path: Path, analysis: Callable, *args):
+        """Result of `analysis(rsf, *args)` on the RSF `rsf` at `path`, unless
+        it was already computed"""
+        results = self._results[path]
+        if analysis not in results:
+            results[analysis] = analysis(self._rsfdbs[path][1], *args)
+        return results[analysis]
+
+    def stats(self) -> Stats:
+        """Compute the stats of the RSF databases of the last update"""
+        paths = self.paths
+        if not paths:
+            raise ValueError('no RSF database to analyze')
+        rsfdbs = [self._rsfdbs[path][1] for path in paths]
+        with _phase('timebase'):
+            timebase = compute_timebase(rsfdbs, self.frequencies)
+            steady_start = compute_steady_state_start(rsfdbs)
+        context = steady_start, timebase
+        if context != self._context:
+            self._results = {path: {} for path in paths}
+            self._context = context
+        scales = [timebase.scales[rsfdb.core] for rsfdb in rsfdbs]
+
+        with _phase('cpu loads'):
+            cpu_loads = _merge_phase_cpu_loads({
+                rsfdb.core: self._analysis(path, _rsf_phase_cpu_loads,
+                                           steady_start, scale)
+                for path, rsfdb, scale in zip(paths, rsfdbs, scales)
+            })
+        with _phase('concurrency levels'):
+            concurrency_levels = _loop_concurrency_levels([
+                self._analysis(path, compute_running_switches, steady_start,
+                               scale)
+                for path, scale in zip(paths, scales)
+            ])
+        with _phase('windowed loads'):
+            windowed_loads = tuple(
+                compute_windowed_loads(rsfdbs, width, unit, timebase)
+                for width, unit in self.windows)
+        with _phase('transient parallelism ratio'):
+            transient_parallelism_ratio = 0.
+            if len(rsfdbs) > 1 and steady_start > 0:
+                transient_parallelism_ratio = _transient_parallelism_ratio([
+                    self._analysis(path, compute_transient_running_switches,
+                                   steady_start, scale)
+                    for path, scale in zip(paths, scales)
+                ])
+        with _phase('task overlaps'):
+            task_overlaps = (compute_task_overlaps(rsfdbs, timebase)
+                             if self.overlaps else None)
+        return Stats(
+            cpu_loads=cpu_loads.steady,
+            parallelism_ratio=concurrency_levels.parallelism_ratio(),
+            windowed_loads=windowed_loads,
+            transient_cpu_loads=cpu_loads.transient,
+            transient_parallelism_ratio=transient_parallelism_ratio,
+            concurrency_levels=concurrency_levels,
+            task_overlaps=task_overlaps,
+            timebase=timebase,
+        )
+
+
+WATCH_INTERVAL = .2
+"""Default interval between two polls of `watch()`, in seconds"""
+
+def watch(list_rsfdbs: Callable[[], List[Path]], stats: IncrementalStats,
+          interval: float = WATCH_INTERVAL
+          ) -> Iterator[Tuple[List[Path], Union[Stats, Exception], float]]:
+    """Poll the RSF databases listed by `list_rsfdbs()` every `interval`
+    seconds, forever, and each time they change, update `stats` and yield the
+    databases reloaded, the new stats or the error raised (see
+    `IncrementalStats.update()`), and the time taken in seconds. Databases are
+    only reloaded once they have not changed for a whole interval, so that
+    they are not read while being written; the first stats are yielded after
+    one interval.
+    """
+    polled = attempted = None
+    while True:
+        try:
+            paths = list_rsfdbs()
+            signatures = [(path, stats.signature(path)) for path in paths]
+        except OSError: # e.g. while the generation directory is rewritten
+            signatures = None
+        if signatures and signatures == polled and signatures != attempted:
+            attempted = signatures
+            start = time.perf_counter()
+            try:
+                reloaded = stats.update(paths)
+                result = stats.stats()
+            except (OSError, ValueError, AssertionError) as error:
+                reloaded, result = [], error
+            yield reloaded, result, time.perf_counter() - start
+        polled = signatures
+        time.sleep(interval)
+
+
+################################################################################
+# COMMAND LINE INTERFACE
+################################################################################
+
+def _add_common_arguments(parser: argparse.ArgumentParser,
+                          default_jobs: int) -> None:
+    parser.add_argument('--version', '-v', action='version', version=__version__)
+    parser.add_argument('--jobs', '-j', type=_jobs, default=default_jobs,
+                        metavar='N', help="""Number of processes working
+                        concurrently (default: %(default)s). Use 0 for one
+                        process per CPU.""")
+    parser.add_argument('--no-cache', action='store_true', help="""Do not
+                        read nor write the cache of decoded RSF databases and
+                        computed stats.""")
+    parser.add_argument('--cache-dir', type=Path, metavar='DIR', help="""Cache
+                        directory (default: $XDG_CACHE_HOME/rsfstat or
+                        ~/.cache/rsfstat).""")
+    parser.add_argument('--cache-size', type=int, metavar='MB',
+                        default=Cache.DEFAULT_MAX_SIZE // (1024 * 1024),
+                        help="""Maximum size of the cache in MB, least recently
+                        used entries are evicted first (default:
+                        %(default)s).""")
+    parser.add_argument('--window', '-w', type=int, action='append',
+                        default=[], metavar='QTT', help="""Compute the peak
+                        and lowest CPU loads over a window of QTT quota timer
+                        ticks sliding along the loop. Can be repeated.""")
+    parser.add_argument('--window-intervals', type=int, action='append',
+                        default=[], metavar='N', help="""Compute the peak and
+                        lowest CPU loads of each core over N consecutive
+                        intervals of its loop. Can be repeated.""")
+    parser.add_argument('--overlaps', action='store_true', help="""Compute
+                        the time during which each pair of Tasks mapped on
+                        different cores run simultaneously.""")
+    parser.add_argument('--frequency', '-F', type=_frequency, action='append',
+                        default=[], metavar='CORE=HZ', help="""Frequency of
+                        the quota timer of a core, e.g. 0=100e6. By default,
+                        it is derived from the lengths of the intervals in ns
+                        and in quota timer ticks. Can be repeated.""")
+    parser.add_argument('--max-memory', type=_max_memory, metavar='MB',
+                        help="""Memory budget of the analysis of an
+                        Application, in MB. If the memory needed (estimated
+                        before decoding the RSF databases) exceeds it, the
+                        stats are computed in a slower, lower-memory mode, or
+                        else in streaming mode (see --streaming), or not at
+                        all.""")
+    parser.add_argument('--streaming', action='store_true', help="""Read the
+                        RSF databases sequentially rather than loading them,
+                        so that the memory used does not depend on their
+                        size, at the expense of speed. Windowed CPU loads and
+                        overlaps cannot be computed in this mode.""")
+    parser.add_argument('--validate', choices=VALIDATION_LEVELS,
+                        default='fast', help="""Check the consistency of the
+                        RSF databases before analyzing them: 'fast' checks
+                        the lengths of the intervals and the loop intervals,
+                        'strict' also reads back the indices and distances of
+                        the frames, and requires loops of the same length
+                        (default: %(default)s). Not 'strict' in streaming
+                        mode.""")
+
+
+def _jobs(arg: str) -> int:
+    try:
+        jobs = int(arg)
+        if jobs < 0:
+            raise ValueError
+        return jobs
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'invalid number of processes: {arg}') from None
+
+
+def _max_memory(arg: str) -> int:
+    try:
+        max_memory = int(arg)
+        if max_memory <= 0:
+            raise ValueError
+        return max_memory
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'invalid memory budget: {arg}') from None
+
+
+def _frequency(arg: str) -> Tuple[CoreId, Fraction]:
+    from fractions import Fraction
+
+    try:
+        core, frequency = arg.split('=')
+        frequency = Fraction(frequency)
+        if frequency <= 0:
+            raise ValueError
+        return int(core), frequency
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'invalid quota timer frequency: {arg}') from None
+
+
+def _stats_options(args: argparse.Namespace) -> dict:
+    """Options of `compute_stats()` given on the command line"""
+    return {
+        'windows': ([(width, 'qtt') for width in args.window]
+                    + [(width, 'intervals')
+                       for width in args.window_intervals]),
+        'overlaps': args.overlaps,
+        'frequencies': dict(args.frequency) or None,
+        'max_memory': (None if args.max_memory is None
+                       else args.max_memory * 2**20),
+        'streaming': args.streaming,
+        'validate': args.validate,
+    }
+
+
+def _cache_from_args(args: argparse.Namespace) -> Optional[Cache]:
+    if args.no_cache:
+        return None
+    return Cache(args.cache_dir, max_size=args.cache_size * 1024 * 1024)
+
+
+class _NoColor:
+    """Stand-in for `colorama.Fore` and `colorama.Style` when the output is not
+    colored: every color is an empty string"""
+
+    def __getattr__(self, name: str) -> str:
+        return ''
+
+
 def main():
     """Makes the coffee"""
-    colorama.init()
-
     # parse CLI args
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument('--version', '-v', action='version', version=__version__)
     parser.add_argument('rsfdb', nargs='+', type=Path, help="""Path to a runtime
                         RSF database generated by psyko app. These files are
                         found in the generation directory, under the name
                         `core_<N>_rt_rsf.ks` where <N> is the core
-                        identifier.""")
+                        identifier. Can also be a directory, searched for the
+                        generation directory of a single Application.""")
+    parser.add_argument('--format', '-f', choices=('text', 'json'),
+                        default='text', help="""Output format: human-readable
+                        text, or a single JSON record (default:
+                        %(default)s).""")
+    parser.add_argument('--no-color', action='store_true', help="""Do not color
+                        the text output. Colors are also disabled when the
+                        output is not a terminal, or if the NO_COLOR
+                        environment variable is set.""")
+    parser.add_argument('--profile', action='store_true', help="""Report the
+                        wall and CPU time of each phase of the analyses, and
+                        counters of their hot paths, on the standard error (or
+                        in the JSON record). Cached stats are not recomputed:
+                        use --no-cache to profile the analyses.""")
+    parser.add_argument('--profile-dump', type=Path, metavar='FILE',
+                        help="""Also profile the function calls of the
+                        analyses with cProfile, and write their stats to FILE,
+                        to be read with pstats. Implies --profile.""")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="""Also trace the memory allocated by each phase
+                        of the analyses with tracemalloc, which slows them
+                        down. Implies --profile.""")
+    parser.add_argument('--watch', action='store_true', help="""Poll the RSF
+                        databases (those of the generation directory given,
+                        if any) and print the stats again each time they
+                        change, e.g. after each build of the Application. Only
+                        the RSF databases which changed are reloaded, and the
+                        analyses of the others are reused. Stop with
+                        Ctrl-C.""")
+    parser.add_argument('--watch-interval', type=float, metavar='SECONDS',
+                        default=WATCH_INTERVAL, help="""Interval between two
+                        polls of the RSF databases in watch mode (default:
+                        %(default)s).""")
+    _add_common_arguments(parser, default_jobs=1)
     args = parser.parse_args()
 
-    # load RSF dbs
-    rsfdbs = []
-    for db in args.rsfdb:
-        # sanity check
-        if not db.exists():
-            raise FileNotFoundError(str(db))
-        rsfdbs.append(rsfloader.load_from_file(db))
-
-    # print out some nice stuff: CPU load
+    # find the generation directories in the given directories
+    sources = [] # (path, whether it is a generation directory)
+    for path in args.rsfdb:
+        if not path.is_dir():
+            sources.append((path, False))
+            continue
+        found = list(scan_gendirs([path]))
+        if len(found) != 1:
+            parser.error(f'{path}: found {len(found)} generation directories'
+                         f' instead of 1 (use rsfstat-batch to analyze many'
+                         f' Applications)')
+        sources.append((found[0][0], True))
+
+    def list_rsfdbs() -> List[Path]:
+        return [rsfdb for path, is_gendir in sources
+                for rsfdb in (find_rsfdbs(path) if is_gendir else [path])]
+
+    if args.watch:
+        if args.streaming or args.max_memory is not None or args.profile \
+                or args.profile_dump is not None or args.profile_memory:
+            parser.error('--watch cannot be combined with --streaming,'
+                         ' --max-memory nor the profiling options')
+        return _watch_main(args, list_rsfdbs)
+    rsfdbs = list_rsfdbs()
+
+    # compute the stats, or get them from the cache
+    profile = None
+    if args.profile or args.profile_dump is not None or args.profile_memory:
+        profile = enable_profiling(
+            Profile(cprofile=args.profile_dump is not None,
+                    trace_memory=args.profile_memory))
+    try:
+        stats = compute_stats(rsfdbs, jobs=args.jobs,
+                              cache=_cache_from_args(args),
+                              **_stats_options(args))
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        disable_profiling()
+    if args.profile_dump is not None:
+        profile.dump_stats(args.profile_dump)
+
+    if args.format == 'json':
+        record = _stats_record(stats)
+        if profile is not None:
+            record['profile'] = profile.to_json()
+        print(json.dumps(record))
+        return
+    if profile is not None:
+        print(profile.report(), file=sys.stderr)
+    _print_stats(stats, *_colors(args))
+
+
+def _colors(args: argparse.Namespace) -> tuple:
+    """`colorama.Fore` and `colorama.Style`, or stand-ins if the output is not
+    colored"""
+    # colorama is only imported when actually coloring the output
+    if args.no_color or 'NO_COLOR' in os.environ or not sys.stdout.isatty():
+        return _NoColor(), _NoColor()
+    import colorama
     from colorama import Fore, Style
+    colorama.init()
+    return Fore, Style
+
+
+def _print_stats(stats: Stats, Fore, Style) -> None:
+    """Print `stats` in a human-readable form, colored with `Fore` and `Style`
+    (see `_colors()`)"""
+    loads = stats.cpu_loads
 
-    loads = compute_cpu_loads(rsfdbs)
+    def print_cpu_loads(title: str, loads: CpuLoads) -> None:
+        print(f'{Fore.CYAN}{Style.BRIGHT}{title}:'
+              f' {Fore.WHITE}{loads.overall * 100.:.2f} %{Style.RESET_ALL}')
 
-    print(f'{Fore.CYAN}{Style.BRIGHT}⏳ AVERAGE CPU LOAD:'
-          f' {Fore.WHITE}{loads.overall * 100.:.2f} %{Style.RESET_ALL}')
+        for core_id, load in sorted(loads.by_core.items()):
+            print(f'\n  {Fore.YELLOW}Core {core_id}:{Style.RESET_ALL} '
+                  f'{Style.BRIGHT}{load * 100.:.2f} %{Style.RESET_ALL}')
+            for taskname, taskload in sorted(loads.by_task[core_id].items(),
+                                             key=lambda k:k[0]):
+                print(f'    {taskname:.<32} {taskload * 100.:.2f} %')
 
-    for core_id, load in sorted(loads.by_core.items(), key=lambda k: k[0]):
-        print(f'\n  {Fore.YELLOW}Core {core_id}:{Style.RESET_ALL} '
-              f'{Style.BRIGHT}{load * 100.:.2f} %{Style.RESET_ALL}')
-        for taskname, taskload in sorted(loads.by_task[core_id].items(),
-                                         key=lambda k:k[0]):
-            print(f'    {taskname:.<32} {taskload * 100.:.2f} %')
+    def print_ratio(title: str, ratio: Ratio) -> None:
+        print(f'\n{Fore.CYAN}{Style.BRIGHT}{title}: '
+              f'{Fore.WHITE}{ratio * 100.:.2f} %{Style.RESET_ALL}')
 
+    # durations are in quota timer ticks, unless the frequencies differ
+    timebase = stats.timebase
+    unit = ('qtt' if timebase is None or timebase.is_trivial()
+            else f'units of {float(timebase.unit) * 1e9:g} ns')
+
+    # print out some nice stuff: CPU load
+    print_cpu_loads('⏳ AVERAGE CPU LOAD', loads)
 
     # parallelism ratio
-    norm_ratio = compute_parallelism_ratio(rsfdbs) / loads.overall
-    print(f'\n{Fore.CYAN}{Style.BRIGHT}🚀 PARALLELISM RATIO: '
-          f'{Fore.WHITE}{norm_ratio * 100.:.2f} %{Style.RESET_ALL}')
+    print_ratio('🚀 PARALLELISM RATIO', stats.normalized_parallelism_ratio())
+
+    # time spent with exactly k cores running a Task
+    levels = stats.concurrency_levels
+    if levels is not None:
+        print(f'\n{Fore.CYAN}{Style.BRIGHT}📊 CONCURRENCY LEVELS:'
+              f'{Style.RESET_ALL}')
+        for nb_cores, duration in enumerate(levels.durations):
+            print(f'  {nb_cores} running core{"s" * (nb_cores != 1)}:'
+                  f' {Style.BRIGHT}{duration / levels.length * 100.:.2f} %'
+                  f'{Style.RESET_ALL}', end='')
+            if levels.longest is not None:
+                print(f' (longest stretch: {levels.longest[nb_cores]} {unit})',
+                      end='')
+            print()
+
+    # overlaps of the Tasks, the longest first
+    overlaps = stats.task_overlaps
+    if overlaps is not None:
+        print(f'\n{Fore.CYAN}{Style.BRIGHT}🤝 TASK OVERLAPS:{Style.RESET_ALL}')
+        for (task_a, task_b), overlap in sorted(overlaps.overlaps.items(),
+                                                key=lambda k: -k[1]):
+            (core_a, name_a), (core_b, name_b) = (overlaps.tasks[task_a],
+                                                  overlaps.tasks[task_b])
+            pair = f'{name_a} (core {core_a}) / {name_b} (core {core_b}) '
+            print(f'  {pair:.<56} {overlap / overlaps.length * 100.:.2f} %')
+
+    # same on the transient state, if any
+    if stats.transient_cpu_loads is not None:
+        print()
+        print_cpu_loads('🌱 INITIALIZATION CPU LOAD', stats.transient_cpu_loads)
+        print_ratio('🌱 INITIALIZATION PARALLELISM RATIO',
+                    stats.normalized_transient_parallelism_ratio())
+
+    # windowed CPU loads
+    for windowed in stats.windowed_loads:
+        window_unit = unit if windowed.unit == 'qtt' else windowed.unit
+        print(f'\n{Fore.CYAN}{Style.BRIGHT}📈 CPU LOAD OVER {windowed.width} '
+              f'{window_unit.upper()}:{Style.RESET_ALL}', end='')
+        if windowed.peak is not None:
+            print(f' {Style.BRIGHT}peak {windowed.peak * 100.:.2f} %, lowest '
+                  f'{windowed.lowest * 100.:.2f} %{Style.RESET_ALL}', end='')
+        print()
+        for core_id in sorted(windowed.peak_by_core):
+            print(f'  {Fore.YELLOW}Core {core_id}:{Style.RESET_ALL} peak '
+                  f'{windowed.peak_by_core[core_id] * 100.:.2f} %, lowest '
+                  f'{windowed.lowest_by_core[core_id] * 100.:.2f} %')
+
+
+def _watch_main(args: argparse.Namespace,
+                list_rsfdbs: Callable[[], List[Path]]) -> None:
+    """Watch mode of `main()`: print the stats each time they change, as a
+    new JSON record or over the previous text output"""
+    options = _stats_options(args)
+    del options['max_memory'], options['streaming']
+    stats = IncrementalStats(jobs=args.jobs, cache=_cache_from_args(args),
+                             **options)
+    Fore, Style = _colors(args)
+    clear = args.format == 'text' and sys.stdout.isatty()
+    try:
+        for reloaded, result, duration in watch(list_rsfdbs, stats,
+                                                args.watch_interval):
+            if args.format == 'json':
+                record = {'rsfdbs': [str(path) for path in stats.paths],
+                          'reloaded': [str(path) for path in reloaded]}
+                if isinstance(result, Exception):
+                    record['error'] = f'{type(result).__name__}: {result}'
+                else:
+                    record.update(_stats_record(result))
+                print(json.dumps(record), flush=True)
+                continue
+
+            if clear:
+                print('\033[2J\033[H', end='') # clear the terminal
+            print(f'{Style.DIM}👀 {time.strftime("%H:%M:%S")}', end='')
+            if isinstance(result, Exception):
+                print(f' {Fore.RED}{type(result).__name__}: {result}'
+                      f'{Style.RESET_ALL}', flush=True)
+                continue
+            names = ', '.join(path.name for path in reloaded)
+            print(f' reloaded {names or "no RSF database"} in'
+                  f' {duration * 1000.:.0f} ms{Style.RESET_ALL}\n')
+            _print_stats(result, Fore, Style)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+
+def read_manifest(manifest: Path) -> List[Path]:
+    """Read the generation directories listed in `manifest`: one path per line,
+    relative to the directory of the manifest, empty lines and lines starting
+    with `#` being ignored"""
+    with open(manifest, encoding='utf-8') as stream:
+        lines = (line.strip() for line in stream)
+        return [manifest.parent / line for line in lines
+                if line and not line.startswith('#')]
+
+
+def batch_main():
+    """Compute statistics on the scheduling plans of many ASTERIOS Applications
+    at once, and print them as JSON records, one line per Application, as soon
+    as they are computed"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+
+    parser = argparse.ArgumentParser(description=batch_main.__doc__)
+    parser.add_argument('gendir', nargs='*', type=Path, help="""Generation
+                        directory of an Application, i.e. the directory given
+                        to the `--gendir` option of psyko, or a directory
+                        searched recursively for generation directories.""")
+    parser.add_argument('--manifest', '-m', type=Path, action='append',
+                        default=[], help="""File listing generation
+                        directories (or directories to search), one per line.
+                        Can be repeated.""")
+    _add_common_arguments(parser, default_jobs=0)
+    args = parser.parse_args()
+
+    roots = args.gendir + [gendir for manifest in args.manifest
+                           for gendir in read_manifest(manifest)]
+    if not roots:
+        parser.error('no generation directory given')
+
+    cache = _cache_from_args(args)
+    options = _stats_options(args)
+    nb_errors = 0
+
+    def report(record: dict) -> None:
+        nonlocal nb_errors
+        nb_errors += 'error' in record
+        print(json.dumps(record), flush=True)
+
+    gendirs = {} # future -> generation directory
+
+    def report_future(future) -> None:
+        # anything else than the errors reported by `analyze_gendir()`, e.g.
+        # the crash of a worker process, is only an error of this gendir
+        gendir = gendirs.pop(future)
+        try:
+            record = future.result()
+        except Exception as error: # pylint: disable=broad-except
+            record = {'gendir': str(gendir),
+                      'error': f'{type(error).__name__}: {error}'}
+        report(record)
+
+    with ProcessPoolExecutor(max_workers=args.jobs or None) as executor:
+        # analyze the Applications as soon as they are found, and report
+        # those already analyzed while the scan goes on
+        running = set()
+        found = set()
+        for gendir, rsfdbs in scan_gendirs(roots):
+            found.add(gendir)
+            future = executor.submit(analyze_gendir, gendir, cache, rsfdbs,
+                                     **options)
+            gendirs[future] = gendir
+            running.add(future)
+            done, running = wait(running, timeout=0)
+            for future in done:
+                report_future(future)
+
+        for root in roots:
+            if not any(gendir == root or root in gendir.parents
+                       for gendir in found):
+                report({'gendir': str(root), 'error': 'FileNotFoundError:'
+                        f' {root}: no generation directory found'})
+        for future in as_completed(running):
+            report_future(future)
+    return 1 if nb_errors else 0
 
 
 if __name__ == '__main__':
@@ -0,0 +1,507 @@
+# Copyright 2022 Krono-Safe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Column-oriented, NumPy-backed representation of an RSF.
+
+Instead of one Python object per Interval and per Frame, a `ColumnarRSF` stores
+the few fields needed by the analyses in flat arrays:
+
+    - `frame_length_qt`, `frame_type` and `frame_task` have one item per frame
+      of the RSF, frames being sorted chronologically (i.e. all the frames of
+      interval 0, then all the frames of interval 1, etc.);
+    - `frame_task` holds task ids, i.e. indexes in the `task_names` list (the
+      empty name is used for frames which are not associated to a Task);
+    - `interval_frame_offsets` has one item per interval, plus one: the frames
+      of interval `i` are the ones in `[interval_frame_offsets[i],
+      interval_frame_offsets[i+1])`;
+    - `interval_length_qtt`, `interval_length_st` and `interval_length_ns` have
+      one item per interval (a length of 0 ns means that it is unknown).
+
+A `ColumnarRSF` also exposes the same attribute interface as the models
+returned by `pythonize` (`rsf.intervals[i].frames[j].length_qt`...), with views
+built on access, so that any code written for these models accepts it.
+"""
+
+import array
+import weakref
+
+import numpy as np
+
+from . import Frame, RSF
+from .FrameType import FrameType
+from .pythonize import LazyRSF, LazyVector, map_file
+
+
+class ColumnarFrame:
+    """View on a single frame of a `ColumnarRSF`"""
+    __slots__ = ('rsf', 'position')
+
+    def __init__(self, rsf: 'ColumnarRSF', position: int):
+        self.rsf = rsf
+        self.position = position # index of the frame in the whole RSF
+
+    @property
+    def length_qt(self) -> int:
+        return int(self.rsf.frame_length_qt[self.position])
+
+    @property
+    def type(self) -> int:
+        return int(self.rsf.frame_type[self.position])
+
+    @property
+    def task(self) -> str:
+        return self.rsf.task_names[self.rsf.frame_task[self.position]]
+
+    def __eq__(self, other):
+        if not isinstance(other, ColumnarFrame):
+            return NotImplemented
+        return self.rsf is other.rsf and self.position == other.position
+
+    def __hash__(self):
+        return hash((id(self.rsf), self.position))
+
+    def __repr__(self):
+        return f'ColumnarFrame({self.position})'
+
+
+class ColumnarInterval:
+    """View on a single interval of a `ColumnarRSF`"""
+    __slots__ = ('rsf', 'index')
+
+    def __init__(self, rsf: 'ColumnarRSF', index: int):
+        self.rsf = rsf
+        self.index = index
+
+    @property
+    def frames(self) -> LazyVector:
+        offsets = self.rsf.interval_frame_offsets
+        return LazyVector(lambda pos: ColumnarFrame(self.rsf, pos),
+                          range(offsets[self.index], offsets[self.index + 1]))
+
+    @property
+    def length_qtt(self) -> int:
+        return int(self.rsf.interval_length_qtt[self.index])
+
+    @property
+    def length_st(self) -> int:
+        return int(self.rsf.interval_length_st[self.index])
+
+    @property
+    def length_ns(self) -> int:
+        return int(self.rsf.interval_length_ns[self.index])
+
+    def __eq__(self, other):
+        if not isinstance(other, ColumnarInterval):
+            return NotImplemented
+        return self.rsf is other.rsf and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.rsf), self.index))
+
+    def __repr__(self):
+        return f'ColumnarInterval({self.index})'
+
+
+class ColumnarRSF:
+    """Column-oriented RSF: see the module documentation.
+
+    Do not build it directly, use `load_from_bytes()`, `load_from_file()` or
+    `from_rsf()`.
+    """
+
+    def __init__(self, core: int, loop_interval: int, task_names: list,
+                 frame_length_qt: np.ndarray, frame_type: np.ndarray,
+                 frame_task: np.ndarray, interval_frame_offsets: np.ndarray,
+                 interval_length_qtt: np.ndarray,
+                 interval_length_st: np.ndarray,
+                 interval_length_ns: np.ndarray):
+        self.core = core
+        self.loop_interval = loop_interval
+        self.task_names = task_names
+        self.frame_length_qt = frame_length_qt
+        self.frame_type = frame_type
+        self.frame_task = frame_task
+        self.interval_frame_offsets = interval_frame_offsets
+        self.interval_length_qtt = interval_length_qtt
+        self.interval_length_st = interval_length_st
+        self.interval_length_ns = interval_length_ns
+        self._cache = {} # derived arrays, computed on first use
+
+    def _cached(self, key: str, compute):
+        try:
+            return self._cache[key]
+        except KeyError:
+            return self._cache.setdefault(key, compute())
+
+    @property
+    def intervals(self) -> LazyVector:
+        return LazyVector(lambda idx: ColumnarInterval(self, idx),
+                          range(len(self.interval_length_qtt)))
+
+    @property
+    def nb_frames(self) -> int:
+        return len(self.frame_length_qt)
+
+    def nbytes(self) -> int:
+        """Memory used by the arrays of this RSF, in bytes"""
+        return sum(getattr(self, field).nbytes for field in _ARRAY_FIELDS)
+
+    def loop_frames(self) -> slice:
+        """Slice of the frame arrays corresponding to the loop of the RSF"""
+        return slice(int(self.interval_frame_offsets[self.loop_interval]),
+                     None)
+
+    def interval_sums(self, frame_values: np.ndarray) -> np.ndarray:
+        """Sum `frame_values` (an array with one item per frame) over each
+        interval"""
+        cumsum = np.concatenate(([0], np.cumsum(frame_values)))
+        offsets = self.interval_frame_offsets
+        return cumsum[offsets[1:]] - cumsum[offsets[:-1]]
+
+    def interval_starts_qtt(self) -> np.ndarray:
+        """Start date of each interval in quota timer ticks, plus the end date
+        of the RSF as a last item (cached)"""
+        return self._cached('interval_starts_qtt', lambda: np.concatenate(
+            ([0], np.cumsum(self.interval_length_qtt))))
+
+    def interval_starts_st(self) -> np.ndarray:
+        """Start date of each interval in source ticks, plus the end date of
+        the RSF as a last item (cached)"""
+        return self._cached('interval_starts_st', lambda: np.concatenate(
+            ([0], np.cumsum(self.interval_length_st))))
+
+    def interval_starting_at(self, date_st: int) -> int:
+        """Index of the (first) interval starting at date `date_st`, in source
+        ticks, found by bisection. A `ValueError` is raised if no interval
+        starts at that date.
+        """
+        starts = self.interval_starts_st()
+        interval_idx = int(np.searchsorted(starts, date_st))
+        if interval_idx >= len(self.interval_length_st) \
+                or starts[interval_idx] != date_st:
+            raise ValueError(
+                f"could not find an interval starting at date {date_st}")
+        return interval_idx
+
+    def frame_ends(self) -> np.ndarray:
+        """End date of each frame, in quota timer ticks since the begining of
+        the RSF (cached)"""
+        return self._cached('frame_ends',
+                            lambda: np.cumsum(self.frame_length_qt))
+
+    def frame_starts(self) -> np.ndarray:
+        """Start date of each frame, in quota timer ticks since the begining of
+        the RSF (cached)"""
+        return self._cached('frame_starts',
+                            lambda: self.frame_ends() - self.frame_length_qt)
+
+    def run_end_distances(self, running: np.ndarray = None) -> np.ndarray:
+        """Run-length index of the RSF (cached): for each frame, the distance in
+        quota timer ticks from its start to the end of its "run", i.e. to the
+        start of the next frame whose type is EXEC if this one is not, or the
+        other way around. After the last frame, the RSF wraps to the first
+        frame of its loop.
+
+        If all the frames of the loop are of the same kind, the end of the loop
+        is considered as the end of their run.
+
+        If `running` (one boolean per frame) is given, the runs are those of
+        its values instead of the EXEC frames, and the index is not cached.
+        """
+        if running is not None:
+            return self._compute_run_ends(running)
+        return self._cached('run_end_distances', lambda: self._compute_run_ends(
+            self.frame_type == FrameType.EXEC))
+
+    def _compute_run_ends(self, running: np.ndarray) -> np.ndarray:
+        starts = self.frame_starts()
+        nb_frames = len(running)
+        loop_first = int(self.interval_frame_offsets[self.loop_interval])
+        end_date = int(self.frame_ends()[-1]) if nb_frames else 0
+        run_ends = np.empty(nb_frames, dtype=np.int64)
+
+        # loop: the unrolled position k + nb_loop_frames has the same type as
+        # k, and starts loop_len ticks later
+        loop_running = running[loop_first:]
+        loop_starts = starts[loop_first:]
+        nb_loop_frames = len(loop_running)
+        loop_len = end_date - (int(loop_starts[0]) if nb_loop_frames else 0)
+        toggles = np.flatnonzero(loop_running != np.roll(loop_running, 1))
+        if len(toggles) == 0:
+            run_ends[loop_first:] = end_date
+        else:
+            next_toggle = np.searchsorted(toggles, np.arange(nb_loop_frames),
+                                          side='right')
+            wrapped = next_toggle == len(toggles)
+            run_ends[loop_first:] = np.where(
+                wrapped,
+                loop_starts[toggles[0]] + loop_len,
+                loop_starts[toggles[np.minimum(next_toggle, len(toggles) - 1)]]
+            )
+
+        # transient: the run of a frame ends at the next toggle, or at the end
+        # of the run of the first loop frame if there is none before
+        if loop_first:
+            transient = running[:loop_first + 1] if nb_loop_frames else \
+                np.r_[running[:loop_first], not running[loop_first - 1]]
+            toggles = np.flatnonzero(transient[1:] != transient[:-1]) + 1
+            next_toggle = np.searchsorted(toggles, np.arange(loop_first),
+                                          side='right')
+            wrapped = next_toggle == len(toggles)
+            toggle_dates = np.r_[starts, end_date][toggles] if len(toggles) \
+                else np.zeros(1, dtype=np.int64)
+            loop_run_end = run_ends[loop_first] if nb_loop_frames else end_date
+            run_ends[:loop_first] = np.where(
+                wrapped,
+                loop_run_end,
+                toggle_dates[np.minimum(next_toggle, max(len(toggles) - 1, 0))]
+            )
+
+        return run_ends - starts
+
+    def frame_intervals(self) -> np.ndarray:
+        """Index of the interval of each frame"""
+        return np.repeat(np.arange(len(self.interval_length_qtt)),
+                         np.diff(self.interval_frame_offsets))
+
+    def next_task_frame_distances(self) -> np.ndarray:
+        """For each frame, the distance in source ticks from the start of its
+        interval to the start of the next interval containing a frame of the
+        same Task, wrapping over the loop, as recorded in the
+        `distance_to_next_task_frame` field of the frames of RSF databases. It
+        is 0 for frames without Task, and for frames of a Task which is not
+        in the loop after them.
+        """
+        nb_intervals = len(self.interval_length_qtt)
+        task_frames = np.flatnonzero(
+            np.array([bool(name) for name in self.task_names],
+                     dtype=bool)[self.frame_task]
+            if self.task_names else np.zeros(self.nb_frames, dtype=bool))
+        keys = (self.frame_task[task_frames].astype(np.int64) * nb_intervals
+                + self.frame_intervals()[task_frames])
+
+        # (Task, interval) pairs sorted by Task, then by interval: the next
+        # interval of a Task is in the next pair, or else it is the first one
+        # of the Task in the loop, one loop later
+        pairs, frame_pairs = np.unique(keys, return_inverse=True)
+        tasks, intervals = np.divmod(pairs, nb_intervals)
+        starts = self.interval_starts_st()
+        loop_len = int(starts[-1] - starts[min(self.loop_interval,
+                                               nb_intervals)])
+        next_starts = np.zeros(len(pairs), dtype=np.int64)
+        same_task = np.r_[tasks[1:] == tasks[:-1], False]
+        next_starts[:-1] = starts[intervals[1:]]
+        in_loop = intervals >= self.loop_interval
+        loop_tasks, first_in_loop = np.unique(tasks[in_loop],
+                                              return_index=True)
+        wraps = ~same_task & np.isin(tasks, loop_tasks)
+        next_starts[wraps] = loop_len + starts[intervals[in_loop][
+            first_in_loop[np.searchsorted(loop_tasks, tasks[wraps])]]]
+        pair_distances = np.where(same_task | wraps,
+                                  next_starts - starts[intervals], 0)
+
+        distances = np.zeros(self.nb_frames, dtype=np.int64)
+        distances[task_frames] = pair_distances[frame_pairs]
+        return distances
+
+    def __repr__(self):
+        return (f'ColumnarRSF(core={self.core}, '
+                f'{len(self.interval_length_qtt)} intervals, '
+                f'{self.nb_frames} frames)')
+
+
+class _Builder:
+    """Accumulate frames and intervals in compact arrays, then build a
+    `ColumnarRSF`"""
+
+    def __init__(self):
+        self.task_ids = {}
+        self.frame_length_qt = array.array('q')
+        self.frame_type = array.array('b')
+        self.frame_task = array.array('i')
+        self.interval_frame_offsets = array.array('q', [0])
+        self.interval_length_qtt = array.array('q')
+        self.interval_length_st = array.array('q')
+        self.interval_length_ns = array.array('q')
+
+    def add_frame(self, length_qt: int, frame_type: int, task) -> None:
+        self.frame_length_qt.append(length_qt)
+        self.frame_type.append(frame_type)
+        self.frame_task.append(
+            self.task_ids.setdefault(task, len(self.task_ids)))
+
+    def end_interval(self, length_qtt: int, length_st: int,
+                     length_ns: int) -> None:
+        self.interval_frame_offsets.append(len(self.frame_length_qt))
+        self.interval_length_qtt.append(length_qtt)
+        self.interval_length_st.append(length_st)
+        self.interval_length_ns.append(length_ns)
+
+    def build(self, core: int, loop_interval: int,
+              decode_task=lambda task: task) -> ColumnarRSF:
+        task_names = [None] * len(self.task_ids)
+        for task, task_id in self.task_ids.items():
+            task_names[task_id] = decode_task(task)
+        return ColumnarRSF(
+            core=core,
+            loop_interval=loop_interval,
+            task_names=task_names,
+            frame_length_qt=np.frombuffer(self.frame_length_qt, dtype=np.int64),
+            frame_type=np.frombuffer(self.frame_type, dtype=np.int8),
+            frame_task=np.frombuffer(self.frame_task, dtype=np.int32),
+            interval_frame_offsets=np.frombuffer(self.interval_frame_offsets,
+                                                 dtype=np.int64),
+            interval_length_qtt=np.frombuffer(self.interval_length_qtt,
+                                              dtype=np.int64),
+            interval_length_st=np.frombuffer(self.interval_length_st,
+                                             dtype=np.int64),
+            interval_length_ns=np.frombuffer(self.interval_length_ns,
+                                             dtype=np.int64),
+        )
+
+
+def _decode_task(task) -> str:
+    return '' if task is None else task.decode('utf-8')
+
+
+def load_from_rsf_table(db: RSF.RSF) -> ColumnarRSF:
+    """Build a `ColumnarRSF` in one pass over the flatbuffer table `db`. Task
+    names are decoded only once per distinct Task.
+    """
+    builder = _Builder()
+    for interval_idx in range(db.IntervalsLength()):
+        interval = db.Intervals(interval_idx)
+        for frame_idx in range(interval.FramesLength()):
+            frame = interval.Frames(frame_idx)
+            builder.add_frame(frame.LengthQt(), frame.Type(), frame.Task())
+        builder.end_interval(interval.LengthQtt(), interval.LengthSt(),
+                             interval.LengthNs())
+    return builder.build(db.Core(), db.LoopInterval(), _decode_task)
+
+
+def load_from_bytes(data) -> ColumnarRSF:
+    assert data[4:8] == b'KRSF', 'Invalid magic'
+    return load_from_rsf_table(RSF.RSF.GetRootAsRSF(data, 0))
+
+
+def load_from_file(db_at_path, use_mmap=False) -> ColumnarRSF:
+    """Load the RSF database at `db_at_path`. If `use_mmap` is `True`, the file
+    is memory-mapped rather than read, and unmapped once the arrays are built.
+    """
+    if not use_mmap:
+        with open(db_at_path, 'rb') as stream:
+            return load_from_bytes(stream.read())
+    with map_file(db_at_path) as data:
+        return load_from_bytes(data)
+
+
+# memory used by the arrays of a `ColumnarRSF` per frame and per interval,
+# including the over-allocation of `_Builder`, in bytes
+FRAME_NBYTES = 14
+INTERVAL_NBYTES = 40
+
+def read_sizes(db_at_path) -> tuple:
+    """Read the number of intervals and of frames of the RSF database at
+    `db_at_path` from the lengths of its vectors only, without decoding any
+    frame. A `ColumnarRSF` of that size uses about `FRAME_NBYTES` per frame
+    and `INTERVAL_NBYTES` per interval.
+    """
+    with map_file(db_at_path) as data:
+        assert data[4:8] == b'KRSF', 'Invalid magic'
+        db = RSF.RSF.GetRootAsRSF(data, 0)
+        nb_intervals = db.IntervalsLength()
+        nb_frames = sum(db.Intervals(interval_idx).FramesLength()
+                        for interval_idx in range(nb_intervals))
+    return nb_intervals, nb_frames
+
+
+def read_frame_fields(db_at_path, fields) -> dict:
+    """Read the `fields` of all the frames of the RSF database at
+    `db_at_path` which are not kept in a `ColumnarRSF` (e.g.
+    `'index_in_interval'`), in one array per field, frames being sorted
+    chronologically as in a `ColumnarRSF`"""
+    accessors = [getattr(Frame.Frame, ''.join(
+        word.capitalize() for word in field.split('_'))) for field in fields]
+    values = [array.array('Q') for _ in fields]
+    with map_file(db_at_path) as data:
+        assert data[4:8] == b'KRSF', 'Invalid magic'
+        db = RSF.RSF.GetRootAsRSF(data, 0)
+        for interval_idx in range(db.IntervalsLength()):
+            interval = db.Intervals(interval_idx)
+            for frame_idx in range(interval.FramesLength()):
+                frame = interval.Frames(frame_idx)
+                for accessor, field_values in zip(accessors, values):
+                    field_values.append(accessor(frame))
+    return {field: np.frombuffer(field_values, dtype=np.uint64)
+            for field, field_values in zip(fields, values)}
+
+
+def from_rsf(rsf) -> ColumnarRSF:
+    """Build a `ColumnarRSF` from any object exposing the attribute interface
+    of the models returned by `pythonize` (`DotDict` tree, `LazyRSF`...)"""
+    builder = _Builder()
+    for interval in rsf.intervals:
+        for frame in interval.frames:
+            builder.add_frame(frame.length_qt, frame.type,
+                              getattr(frame, 'task', ''))
+        # models built by hand may not know the length in ns: 0 means unknown
+        builder.end_interval(interval.length_qtt, interval.length_st,
+                             getattr(interval, 'length_ns', 0))
+    return builder.build(rsf.core, rsf.loop_interval)
+
+
+_ARRAY_FIELDS = ('frame_length_qt', 'frame_type', 'frame_task',
+                 'interval_frame_offsets', 'interval_length_qtt',
+                 'interval_length_st', 'interval_length_ns')
+
+def save(rsf: ColumnarRSF, stream) -> None:
+    """Save `rsf` in the binary stream `stream`, in NumPy's `.npz` format"""
+    np.savez(stream,
+             core=rsf.core,
+             loop_interval=rsf.loop_interval,
+             task_names=np.array(rsf.task_names, dtype=str),
+             **{field: getattr(rsf, field) for field in _ARRAY_FIELDS})
+
+def load(stream) -> ColumnarRSF:
+    """Load a `ColumnarRSF` saved with `save()` from the binary stream
+    `stream`"""
+    with np.load(stream, allow_pickle=False) as npz:
+        return ColumnarRSF(
+            core=int(npz['core']),
+            loop_interval=int(npz['loop_interval']),
+            task_names=npz['task_names'].tolist(),
+            **{field: npz[field] for field in _ARRAY_FIELDS})
+
+
+_from_rsf_cache = {} # id of the source LazyRSF -> ColumnarRSF
+
+def as_columnar(rsf) -> ColumnarRSF:
+    """Return `rsf` if it is already a `ColumnarRSF`, or its conversion with
+    `from_rsf()` otherwise. Only the conversions of the read-only `LazyRSF`
+    views are cached, as long as they are alive: other models may be mutated,
+    and are converted again by each call, so convert them once before
+    analyzing them several times.
+    """
+    if isinstance(rsf, ColumnarRSF):
+        return rsf
+    if not isinstance(rsf, LazyRSF):
+        return from_rsf(rsf)
+
+    key = id(rsf)
+    converted = _from_rsf_cache.get(key)
+    if converted is None:
+        converted = from_rsf(rsf)
+        weakref.finalize(rsf, _from_rsf_cache.pop, key, None)
+        _from_rsf_cache[key] = converted
+    return converted
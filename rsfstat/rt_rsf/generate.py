@@ -0,0 +1,244 @@
+# Copyright 2022 Krono-Safe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generation of synthetic RSF databases, written with the flatbuffer builders
+of `RSF`, `Interval` and `Frame`, e.g. to benchmark the analyses on scheduling
+plans of any size. Any RSF model can also be written back to the flatbuffer
+format with `serialize_rsf()`.
+
+A synthetic RSF is made of intervals of the same length, the first
+`loop_interval` ones forming its transient state, and the others its loop. Each
+interval alternates idle and exec frames of random lengths, the exec frames
+running random Tasks for a given share of the interval. All the RSFs of a plan
+share the same intervals, so that their loops start at the same date.
+"""
+
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import flatbuffers
+import numpy as np
+
+from . import Frame, Interval, RSF, columnar
+from .FrameType import FrameType
+
+FILE_IDENTIFIER = b'KRSF'
+
+# (type, task name, length in quota timer ticks, distance in source ticks to
+# the next interval of the same Task)
+FrameFields = Tuple[int, str, int, int]
+# (length in source ticks, in quota timer ticks and in ns, frames)
+IntervalFields = Tuple[int, int, int, Iterable[FrameFields]]
+
+
+def _build(core: int, loop_interval: int, intervals: Iterable[IntervalFields],
+           size_hint: int = 1024) -> bytearray:
+    """Build an RSF database from the fields of its `intervals`. Only the
+    fields read by the analyses and checked by their validation are written,
+    so that millions of frames can be built in minutes. The distance to the
+    start of the next frame is written in quota timer ticks, i.e. as if the
+    quota timer period divided the source one.
+    """
+    builder = flatbuffers.Builder(size_hint)
+    strings = {} # shared by all the frames of the same Task
+
+    def string(value: str) -> int:
+        offset = strings.get(value)
+        if offset is None:
+            offset = strings[value] = builder.CreateString(value)
+        return offset
+
+    # objects cannot be nested: the strings and the tables referenced by a
+    # table are built before it
+    source = string('synthetic')
+    timer_name = string('synthetic_timer')
+    interval_offsets = []
+    nb_frames = 0
+    looping_frame_index = 0
+    for interval_idx, (length_st, length_qtt, length_ns, frames) \
+            in enumerate(intervals):
+        if interval_idx == loop_interval:
+            looping_frame_index = nb_frames
+        frame_offsets = []
+        for frame_idx, (frame_type, task, length_qt, task_distance) \
+                in enumerate(frames):
+            task = string(task) if task else None
+            Frame.FrameStart(builder)
+            Frame.FrameAddIndexInInterval(builder, frame_idx)
+            Frame.FrameAddIndexInRsf(builder, nb_frames + frame_idx)
+            Frame.FrameAddDistanceToNextTaskFrame(builder, task_distance)
+            Frame.FrameAddDistanceToNextFrameStart(builder, length_qt)
+            Frame.FrameAddType(builder, frame_type)
+            if task is not None:
+                Frame.FrameAddTask(builder, task)
+            Frame.FrameAddLengthQt(builder, length_qt)
+            frame_offsets.append(Frame.FrameEnd(builder))
+        nb_frames += len(frame_offsets)
+
+        Interval.IntervalStartFramesVector(builder, len(frame_offsets))
+        for frame_offset in reversed(frame_offsets):
+            builder.PrependUOffsetTRelative(frame_offset)
+        frames = builder.EndVector()
+
+        Interval.IntervalStart(builder)
+        Interval.IntervalAddFrames(builder, frames)
+        Interval.IntervalAddIndex(builder, interval_idx)
+        Interval.IntervalAddLengthNs(builder, length_ns)
+        Interval.IntervalAddLengthSt(builder, length_st)
+        Interval.IntervalAddLengthQtt(builder, length_qtt)
+        interval_offsets.append(Interval.IntervalEnd(builder))
+
+    RSF.RSFStartIntervalsVector(builder, len(interval_offsets))
+    for interval_offset in reversed(interval_offsets):
+        builder.PrependUOffsetTRelative(interval_offset)
+    intervals = builder.EndVector()
+
+    RSF.RSFStart(builder)
+    RSF.RSFAddSource(builder, source)
+    RSF.RSFAddCore(builder, core)
+    RSF.RSFAddIntervals(builder, intervals)
+    RSF.RSFAddLoopingFrameIndex(builder, looping_frame_index)
+    RSF.RSFAddNbFrames(builder, nb_frames)
+    RSF.RSFAddLoopInterval(builder, loop_interval)
+    RSF.RSFAddQuotaTimerName(builder, timer_name)
+    RSF.RSFAddSourceTimerName(builder, timer_name)
+    RSF.RSFAddHasSourceTimerName(builder, True)
+    builder.Finish(RSF.RSFEnd(builder), file_identifier=FILE_IDENTIFIER)
+    return builder.Output()
+
+
+def serialize_rsf(rsf) -> bytearray:
+    """Write the RSF model `rsf` (any object with the attributes of the models
+    returned by `pythonize`, e.g. a `columnar.ColumnarRSF`) to an RSF database,
+    keeping only the fields read by the analyses (see `_build()`)"""
+    task_distances = iter(
+        columnar.as_columnar(rsf).next_task_frame_distances().tolist())
+    return _build(rsf.core, rsf.loop_interval, (
+        (interval.length_st, interval.length_qtt,
+         getattr(interval, 'length_ns', 0),
+         ((frame.type, getattr(frame, 'task', ''), frame.length_qt,
+           next(task_distances))
+          for frame in interval.frames))
+        for interval in rsf.intervals
+    ))
+
+
+def _random_parts(rng: np.random.Generator, totals: np.ndarray,
+                  nb_parts: int) -> np.ndarray:
+    """Split each of the `totals` in `nb_parts` random positive integers summing
+    to it, returned as a (len(totals), nb_parts) array"""
+    if nb_parts == 0:
+        return np.zeros((len(totals), 0), dtype=np.int64)
+    free = totals - nb_parts
+    cuts = np.sort(np.floor(rng.random((len(totals), nb_parts - 1))
+                            * (free[:, None] + 1)).astype(np.int64), axis=1)
+    bounds = np.c_[np.zeros(len(totals), dtype=np.int64), cuts, free]
+    return np.diff(bounds, axis=1) + 1
+
+
+def build_rsf(core: int, nb_intervals: int, frames_per_interval: int,
+              nb_tasks: int, load: float, loop_interval: int = 1,
+              interval_length_st: int = 1000, qtt_per_st: int = 1000,
+              seed: Optional[int] = None) -> bytearray:
+    """Build a synthetic RSF database (see the module documentation) for core
+    `core`, made of `nb_intervals` intervals of `interval_length_st` source
+    ticks, each one lasting `qtt_per_st` quota timer ticks per source tick (and
+    as many nanoseconds, as with a 1 GHz quota timer). Each interval is made of
+    `frames_per_interval` frames; every other one runs one of `nb_tasks` Tasks,
+    for a `load` share (between 0 and 1) of the interval. The same `seed`
+    yields the same RSF.
+    """
+    if not 0 <= loop_interval < nb_intervals:
+        raise ValueError(f'invalid loop interval: {loop_interval}')
+    if not 0. <= load <= 1. or nb_tasks < 1 or frames_per_interval < 1:
+        raise ValueError('invalid load, number of Tasks or number of frames')
+    length_qtt = interval_length_st * qtt_per_st
+    if length_qtt < frames_per_interval or length_qtt >= 2**32:
+        raise ValueError(f'invalid interval length: {length_qtt} qtt')
+
+    # frames alternate idle and exec, without any exec frame when the load is
+    # 0, or any idle frame when it is 1
+    if load == 0. or frames_per_interval == 1 and load < 1.:
+        frame_types = np.full(frames_per_interval, FrameType.IDLE)
+    elif load == 1.:
+        frame_types = np.full(frames_per_interval, FrameType.EXEC)
+    else:
+        frame_types = np.where(np.arange(frames_per_interval) % 2,
+                               FrameType.EXEC, FrameType.IDLE)
+    exec_frames = frame_types == FrameType.EXEC
+    nb_exec = int(exec_frames.sum())
+    exec_qtt = round(length_qtt * load) if nb_exec else 0
+    exec_qtt = min(max(exec_qtt, nb_exec),
+                   length_qtt - (frames_per_interval - nb_exec))
+
+    rng = np.random.default_rng(seed)
+    frame_lengths = np.empty((nb_intervals, frames_per_interval),
+                             dtype=np.int64)
+    frame_lengths[:, exec_frames] = _random_parts(
+        rng, np.full(nb_intervals, exec_qtt), nb_exec)
+    frame_lengths[:, ~exec_frames] = _random_parts(
+        rng, np.full(nb_intervals, length_qtt - exec_qtt),
+        frames_per_interval - nb_exec)
+    frame_tasks = rng.integers(0, nb_tasks, size=frame_lengths.shape)
+
+    # the distances to the next interval of each Task are derived from the
+    # columnar representation of the RSF, where Task 0 is the empty one
+    interval_lengths = np.full(nb_intervals, length_qtt, dtype=np.int64)
+    task_distances = columnar.ColumnarRSF(
+        core=core,
+        loop_interval=loop_interval,
+        task_names=['', *(f'task_{task}' for task in range(nb_tasks))],
+        frame_length_qt=frame_lengths.ravel(),
+        frame_type=np.tile(frame_types, nb_intervals).astype(np.int8),
+        frame_task=np.where(exec_frames, frame_tasks + 1, 0).astype(
+            np.int32).ravel(),
+        interval_frame_offsets=np.arange(nb_intervals + 1, dtype=np.int64)
+        * frames_per_interval,
+        interval_length_qtt=interval_lengths,
+        interval_length_st=np.full(nb_intervals, interval_length_st,
+                                   dtype=np.int64),
+        interval_length_ns=interval_lengths,
+    ).next_task_frame_distances().reshape(frame_lengths.shape)
+
+    frame_types = frame_types.tolist()
+    task_names = [f'task_{task}' for task in range(nb_tasks)]
+    return _build(core, loop_interval, (
+        (interval_length_st, length_qtt, length_qtt,
+         zip(frame_types, (task_names[task] if frame_type == FrameType.EXEC
+                           else '' for frame_type, task
+                           in zip(frame_types, tasks)), lengths, distances))
+        for lengths, tasks, distances in zip(frame_lengths.tolist(),
+                                             frame_tasks.tolist(),
+                                             task_distances.tolist())
+    ), size_hint=64 + nb_intervals * (64 + frames_per_interval * 48))
+
+
+def write_rsfdbs(directory: Path, nb_cores: int, nb_intervals: int,
+                 frames_per_interval: int, nb_tasks: int, load: float,
+                 seed: int = 0, **options) -> List[Path]:
+    """Write the synthetic RSF databases of a plan of `nb_cores` cores in
+    `directory` (created if needed), under the names `core_<N>_rt_rsf.ks`, and
+    return their paths. See `build_rsf()` for the other parameters, the RSF of
+    core N being built with the seed `seed + N`.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for core in range(nb_cores):
+        path = directory / f'core_{core}_rt_rsf.ks'
+        path.write_bytes(build_rsf(core, nb_intervals, frames_per_interval,
+                                   nb_tasks, load, seed=seed + core,
+                                   **options))
+        paths.append(path)
+    return paths
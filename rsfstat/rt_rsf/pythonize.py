@@ -14,9 +14,12 @@
 
 # This file has been generated by Kmodel
 
+import mmap
+
 from collections import UserDict, OrderedDict
+from collections.abc import Sequence
 import flatbuffers
-from . import RSF
+from . import RSF, Interval, Frame, Tuple
 
 class DotDict(UserDict):
     """Key-value data accessor with dot access
@@ -35,6 +38,172 @@ class DotDict(UserDict):
             return self.data == other.__dict__
 
 
+################################################################################
+# LAZY VIEWS
+################################################################################
+
+def _decode_string(accessor):
+    """Wrap the flatbuffer string accessor `accessor` so that it returns a
+    `str`, like the eager loaders do"""
+    def decode(data):
+        value = accessor(data)
+        return '' if value is None else value.decode('utf-8')
+    return decode
+
+
+class LazyVector(Sequence):
+    """Read-only sequence over a flatbuffer vector of tables. Elements are
+    wrapped in a lazy view each time they are accessed, and slicing returns
+    another `LazyVector` without reading anything from the buffer.
+    """
+    __slots__ = ('_getter', '_range')
+
+    def __init__(self, getter, indexes: range):
+        self._getter = getter
+        self._range = indexes
+
+    def __len__(self):
+        return len(self._range)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return LazyVector(self._getter, self._range[idx])
+        return self._getter(self._range[idx])
+
+    def __iter__(self):
+        getter = self._getter
+        return (getter(idx) for idx in self._range)
+
+    def __repr__(self):
+        return f'LazyVector({len(self)} items)'
+
+
+class _LazyTable:
+    """Base class of the lazy views: each attribute listed in `_FIELDS` is read
+    from the underlying flatbuffer table only when it is accessed, and nothing
+    is cached.
+
+    Two views are equal iff they point to the same table of the same buffer.
+    """
+    __slots__ = ('_data', '__weakref__')
+
+    _FIELDS = {} # attribute name -> function reading it from the table
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, key):
+        try:
+            loader = self._FIELDS[key]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' has no element '{key}'") from None
+        return loader(self._data)
+
+    def __eq__(self, other):
+        if not isinstance(other, _LazyTable):
+            return NotImplemented
+        # pylint: disable=protected-access
+        return (type(self) is type(other)
+                and self._data._tab.Bytes is other._data._tab.Bytes
+                and self._data._tab.Pos == other._data._tab.Pos)
+
+    def __hash__(self):
+        return hash((type(self), id(self._data._tab.Bytes),
+                     self._data._tab.Pos))
+
+    def __dir__(self):
+        return list(self._FIELDS)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(pos={self._data._tab.Pos})'
+
+
+class LazyTuple(_LazyTable):
+    """Lazy view on a `Tuple` table"""
+    __slots__ = ()
+
+    _FIELDS = {
+        'index': Tuple.Tuple.Index,
+        'first_value': Tuple.Tuple.FirstValue,
+        'reload_value': Tuple.Tuple.ReloadValue,
+        'nb_reload': Tuple.Tuple.NbReload,
+    }
+
+
+class LazyFrame(_LazyTable):
+    """Lazy view on a `Frame` table"""
+    __slots__ = ()
+
+    _FIELDS = {
+        'index_in_interval': Frame.Frame.IndexInInterval,
+        'index_in_rsf': Frame.Frame.IndexInRsf,
+        'index_in_frames_table': Frame.Frame.IndexInFramesTable,
+        'distance_to_next_task_frame': Frame.Frame.DistanceToNextTaskFrame,
+        'distance_to_next_frame_start': Frame.Frame.DistanceToNextFrameStart,
+        'type': Frame.Frame.Type,
+        'task': _decode_string(Frame.Frame.Task),
+        'task_core_local_index': Frame.Frame.TaskCoreLocalIndex,
+        'index_in_quota_timer_tuples': Frame.Frame.IndexInQuotaTimerTuples,
+        'has_waitfor_date': Frame.Frame.HasWaitforDate,
+        'waitfor_date': Frame.Frame.WaitforDate,
+        'has_releasein_date': Frame.Frame.HasReleaseinDate,
+        'releasein_date': Frame.Frame.ReleaseinDate,
+        'length_qt': Frame.Frame.LengthQt,
+    }
+
+
+class LazyInterval(_LazyTable):
+    """Lazy view on an `Interval` table"""
+    __slots__ = ()
+
+    _FIELDS = {
+        'frames': lambda data: LazyVector(
+            lambda idx: LazyFrame(data.Frames(idx)),
+            range(data.FramesLength())),
+        'nb_frames_to_dump': Interval.Interval.NbFramesToDump,
+        'length_ns': Interval.Interval.LengthNs,
+        'length_st': Interval.Interval.LengthSt,
+        'index': Interval.Interval.Index,
+        'tuple_index': Interval.Interval.TupleIndex,
+        'length_qtt': Interval.Interval.LengthQtt,
+    }
+
+
+class LazyRSF(_LazyTable):
+    """Lazy view on the root `RSF` table. It exposes the same attributes as
+    the `DotDict` returned by `load_from_bytes()`, but no Interval or Frame is
+    decoded before it is actually accessed.
+    """
+    __slots__ = ()
+
+    _FIELDS = {
+        'source': _decode_string(RSF.RSF.Source),
+        'core': RSF.RSF.Core,
+        'intervals': lambda data: LazyVector(
+            lambda idx: LazyInterval(data.Intervals(idx)),
+            range(data.IntervalsLength())),
+        'loop_frame': RSF.RSF.LoopFrame,
+        'looping_frame_index': RSF.RSF.LoopingFrameIndex,
+        'nb_frames': RSF.RSF.NbFrames,
+        'ending_frame_index': RSF.RSF.EndingFrameIndex,
+        'loop_interval': RSF.RSF.LoopInterval,
+        'stop_date': RSF.RSF.StopDate,
+        'source_tuples': lambda data: LazyVector(
+            lambda idx: LazyTuple(data.SourceTuples(idx)),
+            range(data.SourceTuplesLength())),
+        'quota_tuples': lambda data: LazyVector(
+            lambda idx: LazyTuple(data.QuotaTuples(idx)),
+            range(data.QuotaTuplesLength())),
+        'quota_allow_intermediate_tick': RSF.RSF.QuotaAllowIntermediateTick,
+        'quota_timer_name': _decode_string(RSF.RSF.QuotaTimerName),
+        'source_timer_name': _decode_string(RSF.RSF.SourceTimerName),
+        'has_source_timer_name': RSF.RSF.HasSourceTimerName,
+    }
+
+################################################################################
+
+
 def _load_rt_rsf_RSF(obj, data):
     if data is None:
         return None
@@ -119,13 +288,39 @@ def _load_rt_rsf_Tuple(obj, data):
     return obj
 
 
-def load_from_bytes(data):
+def load_from_bytes(data, lazy=False):
+    """Load an RSF database from the buffer `data`. If `lazy` is `True`, a
+    `LazyRSF` view reading `data` on demand is returned (so `data` must not be
+    modified afterwards), otherwise the whole database is decoded in a tree of
+    `DotDict` objects.
+    """
     assert data[4:8] == b'KRSF', 'Invalid magic'
     db = RSF.RSF.GetRootAsRSF(data, 0)
+    if lazy:
+        return LazyRSF(db)
     return _load_rt_rsf_RSF(DotDict(), db)
 
-def load_from_file(db_at_path):
+def map_file(db_at_path) -> mmap.mmap:
+    """Map the file at `db_at_path` read-only in memory. The returned buffer
+    can be given to `load_from_bytes()` without any copy: pages are loaded from
+    the OS page cache only when they are read.
+    """
     with open(db_at_path, 'rb') as stream:
-        data = bytearray(stream.read())
+        return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+def load_from_file(db_at_path, lazy=False, use_mmap=False):
+    """Load the RSF database at `db_at_path`, see `load_from_bytes()`. If
+    `use_mmap` is `True`, the file is memory-mapped instead of read: a lazy
+    model then keeps the mapping alive as long as it is referenced, while the
+    mapping is closed as soon as an eager model has been decoded.
+    """
+    if not use_mmap:
+        with open(db_at_path, 'rb') as stream:
+            return load_from_bytes(stream.read(), lazy=lazy)
+
+    data = map_file(db_at_path)
+    if lazy:
+        return load_from_bytes(data, lazy=True)
+    with data:
         return load_from_bytes(data)
 
@@ -0,0 +1,94 @@
+# Copyright 2022 Krono-Safe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Sequential reads of the intervals and frames of an RSF database, straight
+from its flatbuffer (with `RSF.Intervals(j)` and `Interval.Frames(k)`).
+
+Unlike the models of `pythonize` and `columnar`, an `RSFStream` never holds the
+intervals or the frames of the database: they are read from the memory-mapped
+file each time they are iterated over, and dropped right after, so that the
+memory used stays bounded whatever the size of the database (the pages of the
+file are only cached by the OS, which can evict them at will).
+"""
+
+from typing import Iterator, Optional, Tuple
+
+from . import RSF
+from .FrameType import FrameType
+from .pythonize import map_file
+
+
+class RSFStream:
+    """RSF database opened for sequential reads, see the module documentation.
+    Close it with `close()`, or use it as a context manager.
+    """
+
+    def __init__(self, db_at_path):
+        self._data = map_file(db_at_path)
+        assert self._data[4:8] == b'KRSF', 'Invalid magic'
+        self._db = RSF.RSF.GetRootAsRSF(self._data, 0)
+        self.core = self._db.Core()
+        self.loop_interval = self._db.LoopInterval()
+        self.nb_intervals = self._db.IntervalsLength()
+        self._task_names = {} # encoded name -> name
+
+    def close(self) -> None:
+        self._db = None
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def interval_lengths(self, start: int = 0, stop: Optional[int] = None
+                         ) -> Iterator[Tuple[int, int, int]]:
+        """Iterate over the lengths in source ticks, in quota timer ticks and
+        in ns (0 if unknown) of the intervals `start` to `stop` (excluded, the
+        last interval if `None`), without reading their frames"""
+        db = self._db
+        for interval_idx in range(start, self.nb_intervals if stop is None
+                                  else stop):
+            interval = db.Intervals(interval_idx)
+            yield interval.LengthSt(), interval.LengthQtt(), interval.LengthNs()
+
+    def frames(self, start: int = 0, stop: Optional[int] = None,
+               tasks: bool = True) -> Iterator[Tuple[int, int, int, str]]:
+        """Iterate over the frames of the intervals `start` to `stop` (see
+        `interval_lengths()`) in chronological order, as tuples of the index of
+        their interval, their type, their length in quota timer ticks and the
+        name of their Task. Names are only read if `tasks`, and for exec frames
+        (the empty name is returned otherwise).
+        """
+        db = self._db
+        task_names = self._task_names
+        for interval_idx in range(start, self.nb_intervals if stop is None
+                                  else stop):
+            interval = db.Intervals(interval_idx)
+            for frame_idx in range(interval.FramesLength()):
+                frame = interval.Frames(frame_idx)
+                frame_type = frame.Type()
+                task = ''
+                if tasks and frame_type == FrameType.EXEC:
+                    encoded = frame.Task()
+                    task = task_names.get(encoded)
+                    if task is None:
+                        task = task_names[encoded] = (
+                            '' if encoded is None else encoded.decode('utf-8'))
+                yield interval_idx, frame_type, frame.LengthQt(), task
+
+    def __repr__(self):
+        return (f'RSFStream(core={self.core}, '
+                f'{self.nb_intervals} intervals)')
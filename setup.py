@@ -56,6 +56,7 @@ setup(
     install_requires=[
         'flatbuffers==2.0',
         'colorama==0.4.4',
+        'numpy>=1.17',
     ],
 
     extras_require={
@@ -65,6 +66,7 @@ setup(
     entry_points={
         'console_scripts': [
             'rsfstat=rsfstat:main',
+            'rsfstat-batch=rsfstat:batch_main',
         ],
     },
 )
@@ -14,14 +14,26 @@
 
 """Minimal test suite"""
 
+import copy
 import itertools
+import json
 import math
+import os
+import pstats
+import random
+import subprocess
+import sys
+import tempfile
+import tracemalloc
 
 from collections.abc import Iterable
+from fractions import Fraction
+from pathlib import Path
 
 import pytest
 
 import rsfstat as r
+from rt_rsf import columnar, generate, pythonize
 from rt_rsf.FrameType import FrameType
 
 ################################################################################
@@ -48,6 +60,12 @@ class DictObj:
 # TEST DATASETS
 ################################################################################
 
+EXAMPLE_RSFDBS = [
+    Path(__file__).parent.parent / 'doc' / 'examples' / 'gendir' / 'app_gendir'
+    / 'psylink' / 'db' / 'rsfs' / f'core_{core}_rt_rsf.ks'
+    for core in range(3)
+]
+
 rsf0 = DictObj({
     'core': 0,
     'intervals': [
@@ -210,8 +228,9 @@ EXPECTED_TASKS_LOAD = {
 
 ################################################################################
 
-def test_compute_cpu_loads():
-    load = r.compute_cpu_loads((rsf0, rsf1))
+@pytest.mark.parametrize('engine', r.CPU_LOADS_ENGINES)
+def test_compute_cpu_loads(engine):
+    load = r.compute_cpu_loads((rsf0, rsf1), engine=engine)
 
     assert math.isclose(load.by_core[0], EXPECTED_RSF0_LOAD)
     assert math.isclose(load.by_core[1], EXPECTED_RSF1_LOAD)
@@ -223,6 +242,47 @@ def test_compute_cpu_loads():
     assert math.isclose(load.overall, EXPECTED_OVERALL_CPU_LOAD)
 
 
+def test_compute_phase_cpu_loads():
+    loads = r.compute_phase_cpu_loads((rsf0, rsf1))
+    assert loads.steady == r.compute_cpu_loads((rsf0, rsf1))
+
+    # both transient states span 4311 source ticks, i.e. 43110 qtt
+    transient_len = 43110
+    assert loads.transient.by_core == {0: 3100 / transient_len, 1: 0.}
+    assert loads.transient.by_task == {
+        0: {'T0': 100 / transient_len, 'T1': 1000 / transient_len,
+            'T2': 2000 / transient_len},
+        1: {},
+    }
+    assert loads.transient.overall == 3100 / (2 * transient_len)
+    assert r.compute_transient_parallelism_ratio((rsf0, rsf1)) == 0.
+
+    # the steady state of core 2 starts after those of the other cores
+    rsfs = r.load_rsfdbs(EXAMPLE_RSFDBS)
+    loads = r.compute_phase_cpu_loads(rsfs)
+    assert loads.transient.by_core == {0: 0.375125, 1: 0.3125, 2: 0.000375}
+    assert r.compute_transient_parallelism_ratio(rsfs) == 0.15625
+
+
+def test_cpu_loads_unaligned_steady_state():
+    # core 0 loops after a first interval of 10 ticks, while no interval of
+    # core 1 starts at that date
+    rsf0 = copy.deepcopy(_loop_rsf(0, [('A', 5), (None, 15)]))
+    rsf0.intervals.insert(0, copy.deepcopy(rsf0.intervals[0]))
+    rsf0.intervals[0].frames = [DictObj({'type': FrameType.EXEC, 'task': 'A',
+                                         'length_qt': 10})]
+    rsf0.intervals[0].length_qtt = rsf0.intervals[0].length_st = 10
+    rsf0.loop_interval = 1
+    rsf1 = _loop_rsf(1, [('B', 3), (None, 7), ('B', 2), (None, 8)])
+    assert r.compute_steady_state_start((rsf0, rsf1)) == 10
+
+    loads = r.compute_cpu_loads((rsf0, rsf1))
+    assert loads == r.compute_cpu_loads((rsf0, rsf1), engine='iterative')
+    assert loads.by_core == {0: 5 / 20, 1: 5 / 20}
+    with pytest.raises(ValueError):
+        r.compute_phase_cpu_loads((rsf0, rsf1))
+
+
 def test_compute_steady_state_start():
     assert r.compute_steady_state_start((rsf0, rsf1)) == EXPECTED_STEADY_START
     return
@@ -259,6 +319,23 @@ class TestRSFWalker:
         assert walker1.remaining_intervals_to_finish == 1
 
 
+    def test_seek(self, walker0):
+        walker0.seek(20000 + 23110 + 10012 + 10000 + 5)
+        assert walker0.current_interval() == rsf0.intervals[3]
+        assert walker0.current_frame() == rsf0.intervals[3].frames[1]
+        assert walker0.date_in_current_frame == 5
+        assert walker0.remaining_intervals_to_finish == 3
+
+        # wrap over the loop
+        walker0.seek(20000 + _RSF_LEN + 100)
+        assert walker0.current_interval() == rsf0.intervals[1]
+        assert walker0.current_frame() == rsf0.intervals[1].frames[1]
+        assert walker0.date_in_current_frame == 0
+
+        with pytest.raises(ValueError):
+            r.RSFWalker(rsf0, 2001)
+
+
     def test_compute_next_interval_idx(self, walker0, walker1):
         assert walker0.compute_next_interval_idx(0) == 1
         assert walker0.compute_next_interval_idx(1) == 2
@@ -352,10 +429,1152 @@ class TestRSFWalker:
         walker0.advance(12 + 8)
         assert walker0.next_running_switch() == 60000 - 8
 
+        # the run of interval 3 continues after wrapping to interval 1
+        walker0.advance(60000 - 8 + 13)
+        assert walker0.current_interval() == rsf0.intervals[1]
+        assert walker0.next_running_switch() == 100
+
+
+    def test_is_frame_exec_override(self):
+        class AlwaysRunning(r.RSFWalker):
+            @staticmethod
+            def is_frame_exec(frame) -> bool:
+                return True
 
+        # the run lasts until the end of the RSF
+        walker = AlwaysRunning(rsf0, EXPECTED_STEADY_START)
+        assert walker.is_running()
+        assert walker.next_running_switch() == 10012 + 60013
 
-def test_compute_parallelism_ratio():
+        # the running state toggles at each switch of the predicate
+        class PaddingRunning(r.RSFWalker):
+            @staticmethod
+            def is_frame_exec(frame) -> bool:
+                return frame.type in (FrameType.EXEC, FrameType.PADDING)
+
+        walker = PaddingRunning(rsf0, EXPECTED_STEADY_START)
+        while not walker.finished():
+            running = walker.is_running()
+            walker.advance(walker.next_running_switch())
+            assert walker.is_running() != running or walker.finished()
+
+
+    def test_advance_over_loops(self, walker0):
+        walker0.advance(2 * _RSF_LEN + 10005)
+        assert walker0.current_interval() == rsf0.intervals[2]
+        assert walker0.current_frame() == rsf0.intervals[2].frames[1]
+        assert walker0.date_in_current_frame == 5
+        assert walker0.remaining_intervals_to_finish == 3 - 2 * 3
+        assert walker0.finished()
+
+
+
+@pytest.mark.parametrize('engine', r.PARALLELISM_RATIO_ENGINES)
+def test_compute_parallelism_ratio(engine):
     assert math.isclose(
-        r.compute_parallelism_ratio((rsf0, rsf1)),
+        r.compute_parallelism_ratio((rsf0, rsf1), engine=engine),
         (10000 + 50000 - 12)/93135
     )
+
+
+def test_compute_running_switches():
+    switches = r.compute_running_switches(rsf0, EXPECTED_STEADY_START)
+    assert switches.running_at_start
+    assert list(switches.dates) == [10000, 10012, 70012, 70025, 70125, 70135,
+                                    73135]
+    assert switches.length == _RSF_LEN
+
+
+def _running_timeline(rsf, start: int = EXPECTED_STEADY_START) -> list:
+    """Running state of `rsf` at each tick of its loop, from the date `start`,
+    by default the steady state start of rsf0 and rsf1"""
+    switches = r.compute_running_switches(rsf, start)
+    bounds = [0, *switches.dates, switches.length]
+    timeline = []
+    for idx, (begin, end) in enumerate(zip(bounds, bounds[1:])):
+        running = (idx % 2 == 0) == switches.running_at_start
+        timeline += [running] * (end - begin)
+    return timeline
+
+
+@pytest.mark.parametrize('width', [1, 13, 20000, 30000, _RSF_LEN, 2*_RSF_LEN+7])
+def test_compute_windowed_loads(width):
+    loads = r.compute_windowed_loads((rsf0, rsf1), width)
+    assert (loads.width, loads.unit) == (width, 'qtt')
+
+    # brute force: slide the window tick by tick
+    timelines = [_running_timeline(rsf) for rsf in (rsf0, rsf1)]
+    def window_exec(timeline):
+        cumsum = [0, *itertools.accumulate(
+            timeline * (width // _RSF_LEN + 2))]
+        return [cumsum[start + width] - cumsum[start]
+                for start in range(_RSF_LEN)]
+    for rsf, timeline in zip((rsf0, rsf1), timelines):
+        exec_qtt = window_exec(timeline)
+        assert loads.peak_by_core[rsf.core] == max(exec_qtt) / width
+        assert loads.lowest_by_core[rsf.core] == min(exec_qtt) / width
+    exec_qtt = window_exec([sum(run) for run in zip(*timelines)])
+    assert loads.peak == max(exec_qtt) / (2 * width)
+    assert loads.lowest == min(exec_qtt) / (2 * width)
+
+
+def test_compute_concurrency_levels():
+    levels = r.compute_concurrency_levels((rsf0, rsf1))
+    assert levels.length == _RSF_LEN
+    assert levels.parallelism_ratio() == \
+        r.compute_parallelism_ratio((rsf0, rsf1))
+
+    # brute force: count running RSFs tick by tick, over two loops so that
+    # stretches wrap
+    running = [sum(run) for run in zip(*map(_running_timeline, (rsf0, rsf1)))]
+    assert levels.durations == tuple(running.count(k) for k in range(3))
+    longest = [0] * 3
+    for level, stretch in itertools.groupby(running * 2):
+        longest[level] = max(longest[level], min(len(list(stretch)), _RSF_LEN))
+    assert levels.longest == tuple(longest)
+
+    levels = r.compute_concurrency_levels((rsf0,))
+    assert levels.durations == (_RSF_LEN - 73100, 73100)
+    assert levels.longest == (20000, 60000)
+    assert levels.parallelism_ratio() == 0.
+
+
+def test_compute_task_overlaps():
+    overlaps = r.compute_task_overlaps((rsf0, rsf1))
+    assert overlaps.length == _RSF_LEN
+    assert overlaps.tasks == ((0, 'T0'), (0, 'T1'), (0, 'T2'),
+                              (1, 'Ipsum'), (1, 'Lorem'), (1, 'dolor'))
+    assert overlaps.overlaps == {(0, 3): 9988, (0, 4): 10000, (0, 5): 10012,
+                                 (1, 5): 19988, (2, 3): 10000}
+    assert overlaps.overlap((1, 'dolor'), (0, 'T1')) == 19988
+    assert overlaps.overlap((0, 'T1'), (1, 'Lorem')) == 0
+    assert overlaps.overlap((0, 'T0'), (0, 'T1')) == 0
+    assert r.TaskOverlaps.from_json(
+        json.loads(json.dumps(overlaps.to_json()))) == overlaps
+
+    # each moment when k cores run a Task counts for k.(k-1)/2 pairs
+    rsfs = r.load_rsfdbs(EXAMPLE_RSFDBS)
+    levels = r.compute_concurrency_levels(rsfs)
+    assert sum(r.compute_task_overlaps(rsfs).overlaps.values()) == \
+        sum(k * (k - 1) // 2 * duration
+            for k, duration in enumerate(levels.durations))
+    assert r.compute_task_overlaps(rsfs[:1]).overlaps == {}
+
+    # the pairs of Tasks are encoded beyond 32 bits
+    rsfs = [_loop_rsf(core, [(f'T{i}', 1) for i in range(40_000)])
+            for core in (0, 1)]
+    overlaps = r.compute_task_overlaps(rsfs)
+    assert len(overlaps.overlaps) == 40_000
+    assert all(overlaps.tasks[a][1] == overlaps.tasks[b][1]
+               for a, b in overlaps.overlaps)
+
+
+def _loop_rsf(core: int, frames: list):
+    """Mock RSF made of a single interval, looping from the begining, whose
+    frames are (task name, length) pairs, the task name being `None` for idle
+    frames"""
+    loop_length = sum(length for _, length in frames)
+    return DictObj({
+        'core': core,
+        'intervals': [{
+            'frames': [
+                {'type': FrameType.EXEC, 'task': task, 'length_qt': length}
+                if task else {'type': FrameType.IDLE, 'length_qt': length}
+                for task, length in frames
+            ],
+            'length_qtt': loop_length,
+            'length_st': loop_length,
+        }],
+        'loop_interval': 0,
+    })
+
+
+@pytest.mark.parametrize('loop_lengths', [(20, 30), (40, 60, 90), (7, 12, 35),
+                                          (12, 12, 8)])
+def test_hyperperiod_concurrency_levels(loop_lengths):
+    rng = random.Random(sum(loop_lengths))
+    rsfs = []
+    for core, length in enumerate(loop_lengths):
+        cuts = sorted(rng.sample(range(1, length), min(length - 1, 6)))
+        bounds = [0, *cuts, length]
+        rsfs.append(_loop_rsf(core, [
+            (rng.choice([None, 'A', 'B']), end - begin)
+            for begin, end in zip(bounds, bounds[1:])
+        ]))
+
+    # brute force: unroll every loop over the hyperperiod
+    hyperperiod = r._lcm(loop_lengths)
+    running = [sum(run) for run in zip(*(
+        _running_timeline(rsf, 0) * (hyperperiod // length)
+        for rsf, length in zip(rsfs, loop_lengths)))]
+    levels = r.compute_concurrency_levels(rsfs)
+    assert levels.length == hyperperiod
+    assert levels.durations == tuple(running.count(k)
+                                     for k in range(len(rsfs) + 1))
+    assert levels.longest is None
+    assert r.ConcurrencyLevels.from_json(
+        json.loads(json.dumps(levels.to_json()))) == levels
+    assert math.isclose(
+        r.compute_parallelism_ratio(rsfs),
+        sum(max(0, k - 1) for k in running)
+        / (hyperperiod * (len(rsfs) - 1)))
+
+    loads = r.compute_cpu_loads(rsfs)
+    assert math.isclose(loads.overall, sum(running) / (hyperperiod * len(rsfs)))
+    assert loads == r.compute_cpu_loads(rsfs, engine='iterative')
+    assert r.compute_windowed_loads(rsfs, 5).peak is None
+    with pytest.raises(ValueError):
+        r.compute_task_overlaps(rsfs)
+
+
+def _scaled(rsf, factor: int, frequency: int = 0):
+    """Copy of the mock `rsf` whose quota timer runs `factor` times faster, the
+    lengths in ns being those at `frequency` Hz if not 0"""
+    rsf = copy.deepcopy(rsf)
+    for interval in rsf.intervals:
+        interval.length_qtt *= factor
+        if frequency:
+            interval.length_ns = interval.length_qtt * 10**9 // frequency
+        for frame in interval.frames:
+            frame.length_qt *= factor
+    return rsf
+
+
+def test_compute_timebase():
+    assert r.compute_timebase(r.load_rsfdbs(EXAMPLE_RSFDBS)) == \
+        r.Timebase(unit=Fraction(1, 10**9), scales={0: 1, 1: 1, 2: 1})
+    # lengths in ns are unknown
+    assert r.compute_timebase((rsf0, rsf1)) == \
+        r.Timebase(unit=None, scales={0: 1, 1: 1})
+
+    fast1 = _scaled(rsf1, 2, frequency=200_000_000)
+    assert r.compute_quota_timer_frequency(fast1) == 200_000_000
+    timebase = r.compute_timebase((_scaled(rsf0, 1, frequency=100_000_000),
+                                   fast1))
+    assert timebase == r.Timebase(unit=Fraction(1, 200_000_000),
+                                  scales={0: 2, 1: 1})
+    assert r.Timebase.from_json(
+        json.loads(json.dumps(timebase.to_json()))) == timebase
+    assert r.compute_timebase((rsf0, fast1), {0: 100_000_000}) == timebase
+    assert r.compute_timebase((rsf0, rsf1), {0: 3, 1: Fraction(9, 2)}) == \
+        r.Timebase(unit=Fraction(1, 9), scales={0: 3, 1: 2})
+
+
+def test_multi_frequency_stats():
+    # same schedule, with the quota timer of core 1 running twice as fast
+    rsfs = (rsf0, _scaled(rsf1, 2))
+    timebase = r.compute_timebase(rsfs, {0: 100_000_000, 1: 200_000_000})
+    levels = r.compute_concurrency_levels(rsfs, timebase)
+    expected = r.compute_concurrency_levels((rsf0, rsf1))
+    assert levels.length == 2 * expected.length
+    assert levels.durations == tuple(2 * d for d in expected.durations)
+    assert levels.parallelism_ratio() == expected.parallelism_ratio()
+    assert r.compute_parallelism_ratio(rsfs, timebase=timebase) == \
+        r.compute_parallelism_ratio((rsf0, rsf1))
+    assert r.compute_phase_cpu_loads(rsfs, timebase) == \
+        r.compute_phase_cpu_loads((rsf0, rsf1))
+    overlaps = r.compute_task_overlaps(rsfs, timebase)
+    assert overlaps.overlaps == {
+        pair: 2 * overlap for pair, overlap in
+        r.compute_task_overlaps((rsf0, rsf1)).overlaps.items()}
+
+    # durations which no longer fit in 64-bit integers are rejected
+    huge = r.Timebase(unit=None, scales={0: 2**62, 1: 2**62})
+    with pytest.raises(ValueError, match='--frequency'):
+        r.compute_concurrency_levels((rsf0, rsf1), huge)
+
+
+def _rounded_rsf(core: int, frames: list, nb_intervals: int,
+                 frequency: int):
+    """Mock RSF looping over `nb_intervals` intervals made of `frames` (see
+    `_loop_rsf()`), whose quota timer runs at `frequency` Hz, the lengths in
+    nanoseconds being rounded"""
+    rsf = _loop_rsf(core, frames)
+    interval = rsf.intervals[0]
+    interval.length_ns = round(interval.length_qtt * 10**9 / frequency)
+    rsf.intervals = [copy.deepcopy(interval) for _ in range(nb_intervals)]
+    return rsf
+
+
+def test_rounded_frequencies(tmp_path):
+    # both quota timers run at 300 MHz, with intervals of 3333 and 6667 ns
+    rsfs = (_rounded_rsf(0, [('A', 400), (None, 600)], 6, 300_000_000),
+            _rounded_rsf(1, [('B', 1000), (None, 1000)], 3, 300_000_000))
+    assert [rsf.intervals[0].length_ns for rsf in rsfs] == [3333, 6667]
+    assert [r.compute_quota_timer_frequency(rsf) for rsf in rsfs] == \
+        [300_000_000, 300_000_000]
+    timebase = r.compute_timebase(rsfs)
+    assert timebase == r.Timebase(unit=Fraction(1, 300_000_000),
+                                  scales={0: 1, 1: 1})
+    assert r.compute_parallelism_ratio(rsfs, timebase=timebase) == \
+        r.compute_parallelism_ratio(rsfs, engine='walker')
+    assert r.compute_concurrency_levels(rsfs, timebase).length == 6000
+
+    # the streaming mode derives the same frequencies
+    paths = [tmp_path / f'core_{rsf.core}_rt_rsf.ks' for rsf in rsfs]
+    for path, rsf in zip(paths, rsfs):
+        path.write_bytes(generate.serialize_rsf(rsf))
+    streams = r.open_rsfdbs(paths)
+    try:
+        assert r.compute_stream_timebase(streams) == timebase
+    finally:
+        for stream in streams:
+            stream.close()
+
+    # a non-round frequency is the same on cores with different intervals
+    rsfs = (_rounded_rsf(0, [('A', 400), (None, 600)], 2, 33_333_333),
+            _rounded_rsf(1, [('B', 4), (None, 6)], 200, 33_333_333))
+    assert [rsf.intervals[0].length_ns for rsf in rsfs] == [30000, 300]
+    assert r.compute_quota_timer_frequency(rsfs[1]) == 33_300_000
+    timebase = r.compute_timebase(rsfs)
+    assert timebase == r.Timebase(unit=Fraction(1, 33_333_000),
+                                  scales={0: 1, 1: 1})
+    assert r.compute_concurrency_levels(rsfs, timebase).length == 2000
+
+    # frequencies which are not a whole number of Hz are not guessed
+    assert r._roundest_frequency(
+        *r._quota_timer_frequency_bounds(1, 300_001, 1)) is None
+
+
+def test_compute_windowed_loads_intervals():
+    rsfs = r.load_rsfdbs(EXAMPLE_RSFDBS)
+    for width in (1, 2, 5):
+        loads = r.compute_windowed_loads(rsfs, width, unit='intervals')
+        assert loads.peak is None and loads.lowest is None
+        for rsf in rsfs:
+            loop = rsf.intervals[rsf.loop_interval:]
+            window_loads = []
+            for start in range(len(loop)):
+                window = [loop[(start + idx) % len(loop)]
+                          for idx in range(width)]
+                window_loads.append(
+                    sum(frame.length_qt for interval in window
+                        for frame in interval.frames
+                        if frame.type == FrameType.EXEC)
+                    / sum(interval.length_qtt for interval in window))
+            assert math.isclose(loads.peak_by_core[rsf.core],
+                                max(window_loads))
+            assert math.isclose(loads.lowest_by_core[rsf.core],
+                                min(window_loads))
+
+    with pytest.raises(ValueError):
+        r.compute_windowed_loads(rsfs, 0)
+
+
+def test_parallelism_ratio_engines_match():
+    rsfs = [pythonize.load_from_file(db) for db in EXAMPLE_RSFDBS]
+    assert r.compute_parallelism_ratio(rsfs, engine='sweep') == \
+        r.compute_parallelism_ratio(rsfs, engine='walker')
+    assert r.compute_parallelism_ratio(rsfs[:2], engine='sweep') == \
+        r.compute_parallelism_ratio(rsfs[:2], engine='walker')
+
+
+def test_lazy_loader():
+    eager = [pythonize.load_from_file(db) for db in EXAMPLE_RSFDBS]
+    lazy = [pythonize.load_from_file(db, lazy=True) for db in EXAMPLE_RSFDBS]
+
+    for eager_rsf, lazy_rsf in zip(eager, lazy):
+        assert lazy_rsf.core == eager_rsf.core
+        assert lazy_rsf.loop_interval == eager_rsf.loop_interval
+        assert len(lazy_rsf.intervals) == len(eager_rsf.intervals)
+        for eager_interval, lazy_interval in zip(eager_rsf.intervals,
+                                                 lazy_rsf.intervals):
+            assert lazy_interval.length_qtt == eager_interval.length_qtt
+            assert [f.task for f in lazy_interval.frames] == \
+                [f.task for f in eager_interval.frames]
+
+    assert lazy[0].intervals[2] == lazy[0].intervals[1:][1]
+    assert lazy[0].intervals[2] != lazy[0].intervals[3]
+    assert r.compute_cpu_loads(lazy) == r.compute_cpu_loads(eager)
+    assert math.isclose(r.compute_parallelism_ratio(lazy),
+                        r.compute_parallelism_ratio(eager))
+
+
+def test_columnar_model():
+    rsf = columnar.from_rsf(rsf0)
+    assert rsf.core == 0
+    assert rsf.loop_interval == 1
+    assert list(rsf.interval_frame_offsets) == [0, 1, 6, 8, 12]
+    assert list(rsf.interval_length_qtt) == [20000, 23110, 10012, 60013]
+    assert rsf.task_names[rsf.frame_task[1]] == 'T0'
+    assert rsf.intervals[3].frames[1].task == 'T0'
+    assert rsf.intervals[3].frames[1].length_qt == 20000
+
+    rsfs = (rsf, columnar.from_rsf(rsf1))
+    assert r.compute_cpu_loads(rsfs) == r.compute_cpu_loads((rsf0, rsf1))
+    assert r.compute_steady_state_start(rsfs) == EXPECTED_STEADY_START
+    assert math.isclose(r.compute_parallelism_ratio(rsfs),
+                        r.compute_parallelism_ratio((rsf0, rsf1)))
+
+    loaded = [columnar.load_from_file(db) for db in EXAMPLE_RSFDBS]
+    eager = [pythonize.load_from_file(db) for db in EXAMPLE_RSFDBS]
+    assert r.compute_cpu_loads(loaded) == r.compute_cpu_loads(eager)
+    assert math.isclose(r.compute_parallelism_ratio(loaded),
+                        r.compute_parallelism_ratio(eager))
+
+    # the conversions of the read-only lazy models only are cached
+    lazy = pythonize.load_from_file(EXAMPLE_RSFDBS[0], lazy=True)
+    assert columnar.as_columnar(lazy) is columnar.as_columnar(lazy)
+    mutable = copy.deepcopy(rsf0)
+    assert r.compute_cpu_loads([mutable]).by_core[0] > 0.
+    for interval in mutable.intervals:
+        for frame in interval.frames:
+            frame.type = FrameType.IDLE
+    assert r.compute_cpu_loads([mutable]).by_core[0] == 0.
+
+
+def test_mmap_loader():
+    expected = r.compute_cpu_loads(
+        [pythonize.load_from_file(db) for db in EXAMPLE_RSFDBS])
+
+    for load in (lambda db: pythonize.load_from_file(db, use_mmap=True),
+                 lambda db: pythonize.load_from_file(db, lazy=True,
+                                                     use_mmap=True),
+                 lambda db: columnar.load_from_file(db, use_mmap=True)):
+        assert r.compute_cpu_loads([load(db) for db in EXAMPLE_RSFDBS]) == \
+            expected
+
+
+def test_cpu_loads_engines_match():
+    for rsfs in ((rsf0, rsf1),
+                 [pythonize.load_from_file(db) for db in EXAMPLE_RSFDBS]):
+        assert r.compute_cpu_loads(rsfs, engine='vectorized') == \
+            r.compute_cpu_loads(rsfs, engine='iterative')
+
+
+def test_load_rsfdbs():
+    sequential = r.load_rsfdbs(EXAMPLE_RSFDBS)
+    concurrent = r.load_rsfdbs(EXAMPLE_RSFDBS, jobs=2)
+    assert [rsf.core for rsf in concurrent] == [0, 1, 2]
+    assert r.compute_cpu_loads(concurrent) == r.compute_cpu_loads(sequential)
+
+    with pytest.raises(FileNotFoundError):
+        r.load_rsfdbs([Path('does_not_exist.ks')])
+
+
+def test_generate(tmp_path):
+    paths = generate.write_rsfdbs(tmp_path, nb_cores=3, nb_intervals=5,
+                                  frames_per_interval=4, nb_tasks=2, load=.25,
+                                  interval_length_st=10, qtt_per_st=100)
+    assert paths == [tmp_path / f'core_{core}_rt_rsf.ks' for core in range(3)]
+
+    rsfs = r.load_rsfdbs(paths)
+    eager = [pythonize.load_from_file(path) for path in paths]
+    assert [rsf.nb_frames for rsf in rsfs] == [20] * 3
+    assert {task for rsf in rsfs for task in rsf.task_names} == \
+        {'', 'task_0', 'task_1'}
+    assert r.compute_steady_state_start(rsfs) == 10
+    assert r.compute_timebase(rsfs).scales == {0: 1, 1: 1, 2: 1}
+    loads = r.compute_cpu_loads(rsfs)
+    assert loads == r.compute_cpu_loads(eager)
+    assert loads.by_core == {0: .25, 1: .25, 2: .25}
+    assert math.isclose(r.compute_parallelism_ratio(rsfs),
+                        r.compute_parallelism_ratio(eager, engine='walker'))
+
+    # the same seed yields the same RSF
+    assert generate.build_rsf(0, 5, 4, 2, .25, interval_length_st=10,
+                              qtt_per_st=100, seed=0) == paths[0].read_bytes()
+    with pytest.raises(ValueError):
+        generate.build_rsf(0, 5, 4, 2, 1.5)
+
+
+def test_cache(tmp_path):
+    cache = r.Cache(tmp_path)
+    digests = [cache.digest(db) for db in EXAMPLE_RSFDBS]
+    assert len(set(digests)) == 3
+    assert cache.load_model(digests[0]) is None
+
+    rsfdbs = r.load_rsfdbs(EXAMPLE_RSFDBS, cache=cache)
+    cached = [cache.load_model(digest) for digest in digests]
+    assert [rsf.task_names for rsf in cached] == \
+        [rsf.task_names for rsf in rsfdbs]
+    assert r.compute_cpu_loads(cached) == r.compute_cpu_loads(rsfdbs)
+
+    loads = r.compute_cpu_loads(rsfdbs)
+    cache.store_stats(digests, {'cpu_loads': r.cpu_loads_to_json(loads)})
+    stats = cache.load_stats(reversed(digests))
+    assert r.cpu_loads_from_json(stats['cpu_loads']) == loads
+
+    # nothing fits in a 1-byte cache, except the entries being written
+    writing = tmp_path / 'models' / 'entry.1234.tmp'
+    writing.write_bytes(b'partial')
+    small_cache = r.Cache(tmp_path, max_size=1)
+    small_cache.evict()
+    assert list(tmp_path.glob('*/*')) == [writing]
+
+
+def test_cache_eviction_scans(tmp_path, monkeypatch):
+    scans = []
+    glob = Path.glob
+    monkeypatch.setattr(Path, 'glob', lambda path, pattern: scans.append(
+        pattern) or glob(path, pattern))
+
+    # the directory is scanned once, then the writes track its size
+    cache = r.Cache(tmp_path)
+    r.load_rsfdbs(EXAMPLE_RSFDBS, cache=cache)
+    assert scans == ['*/*']
+
+    # until it is too big
+    scans.clear()
+    cache.max_size = 1
+    cache.store_stats([cache.digest(EXAMPLE_RSFDBS[0])], {})
+    assert scans == ['*/*']
+    assert not list(glob(tmp_path, '*/*'))
+
+
+def test_cache_errors(tmp_path, capsys):
+    # corrupted entries are misses
+    cache = r.Cache(tmp_path)
+    digests = [cache.digest(db) for db in EXAMPLE_RSFDBS]
+    expected = r.compute_stats(EXAMPLE_RSFDBS)
+    assert r.compute_stats(EXAMPLE_RSFDBS, cache=cache) == expected
+    for entry in tmp_path.glob('*/*'):
+        entry.write_bytes(b'corrupted')
+    assert cache.load_stats(digests) is None
+    assert r.compute_stats(EXAMPLE_RSFDBS, cache=cache) == expected
+    assert 'warning' in capsys.readouterr().err
+
+    # so are the entries of a cache which cannot be written
+    blocked = tmp_path / 'blocked'
+    blocked.write_bytes(b'')
+    assert r.compute_stats(EXAMPLE_RSFDBS, cache=r.Cache(blocked)) == expected
+    assert 'warning' in capsys.readouterr().err
+
+    # entries of other versions of the algorithms are not reused
+    cache.SCHEMA_VERSION += 1
+    cache._digests.clear()
+    assert cache.digest(EXAMPLE_RSFDBS[0]) != digests[0]
+
+
+def test_analyze_gendir(tmp_path):
+    gendir = EXAMPLE_RSFDBS[0].parents[4]
+    assert r.find_rsfdbs(gendir) == EXAMPLE_RSFDBS
+
+    record = r.analyze_gendir(gendir)
+    stats = r.Stats.from_json(record)
+    assert stats.cpu_loads == r.compute_cpu_loads(r.load_rsfdbs(EXAMPLE_RSFDBS))
+    assert math.isclose(record['normalized_parallelism_ratio'],
+                        stats.parallelism_ratio / stats.cpu_loads.overall)
+
+    assert 'FileNotFoundError' in r.analyze_gendir(tmp_path)['error']
+
+
+def test_scan_gendirs(tmp_path):
+    def make_gendir(path, core_ids):
+        rsfdbs_dir = path / r.RSFDBS_SUBDIR
+        rsfdbs_dir.mkdir(parents=True)
+        for core_id in core_ids:
+            (rsfdbs_dir / f'core_{core_id}_rt_rsf.ks').touch()
+        return path
+
+    app1 = make_gendir(tmp_path / 'app1', [0, 1])
+    app2 = make_gendir(tmp_path / 'nightly' / 'app2', [10, 2])
+    make_gendir(tmp_path / '.hidden' / 'app3', [0])          # pruned
+    make_gendir(app1 / 'app_gendir' / 'nested', [0])          # pruned
+    (tmp_path / 'nightly' / 'app4' / 'app_gendir').mkdir(parents=True)
+
+    found = dict(r.scan_gendirs([tmp_path], threads=4))
+    assert found == {
+        app1: [app1 / r.RSFDBS_SUBDIR / f'core_{i}_rt_rsf.ks' for i in (0, 1)],
+        app2: [app2 / r.RSFDBS_SUBDIR / f'core_{i}_rt_rsf.ks'
+               for i in (2, 10)],
+    }
+    assert dict(r.scan_gendirs([app2])) == {app2: found[app2]}
+    assert list(r.scan_gendirs([tmp_path / 'missing'])) == []
+
+
+def test_batch_errors(tmp_path, monkeypatch, capsys):
+    # a truncated RSF database raises a `struct.error`, which is only an error
+    # of its own generation directory
+    for name in ('good', 'truncated'):
+        rsfs_dir = tmp_path / name / r.RSFDBS_SUBDIR
+        rsfs_dir.mkdir(parents=True)
+        for rsfdb in EXAMPLE_RSFDBS:
+            (rsfs_dir / rsfdb.name).write_bytes(rsfdb.read_bytes())
+    truncated = (tmp_path / 'truncated' / r.RSFDBS_SUBDIR
+                 / EXAMPLE_RSFDBS[1].name)
+    truncated.write_bytes(truncated.read_bytes()[:100])
+
+    monkeypatch.setattr(sys, 'argv', ['rsfstat-batch', '--no-cache', '-j', '1',
+                                      str(tmp_path)])
+    assert r.batch_main() == 1
+    records = {Path(record['gendir']).name: record for record in map(
+        json.loads, capsys.readouterr().out.splitlines())}
+    assert 'error' not in records['good']
+    assert records['truncated']['error'].startswith('error: unpack_from')
+
+
+def test_lazy_imports():
+    # importing rsfstat must not import the heavy dependencies
+    code = ('import sys, rsfstat; print(sorted({"numpy", "colorama",'
+            ' "flatbuffers", "rt_rsf.RSF"} & set(sys.modules)))')
+    result = subprocess.run([sys.executable, '-c', code], check=True,
+                            cwd=Path(r.__file__).parent,
+                            stdout=subprocess.PIPE, universal_newlines=True)
+    assert result.stdout.strip() == '[]'
+
+
+def test_main_output(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['rsfstat', '--no-cache', '--format',
+                                      'json', '-w', '1000',
+                                      *map(str, EXAMPLE_RSFDBS)])
+    r.main()
+    record = json.loads(capsys.readouterr().out)
+    stats = r.Stats.from_json(record)
+    rsfdbs = r.load_rsfdbs(EXAMPLE_RSFDBS)
+    assert stats.cpu_loads == r.compute_cpu_loads(rsfdbs)
+    assert stats.windowed_loads == (r.compute_windowed_loads(rsfdbs, 1000),)
+
+    monkeypatch.setattr(sys, 'argv', ['rsfstat', '--no-cache', '--no-color',
+                                      *map(str, EXAMPLE_RSFDBS)])
+    r.main()
+    output = capsys.readouterr().out
+    assert '\x1b' not in output
+    assert f'{stats.cpu_loads.overall * 100.:.2f} %' in output
+
+    monkeypatch.setattr(sys, 'argv', ['rsfstat', '--jobs', '-1',
+                                      *map(str, EXAMPLE_RSFDBS)])
+    with pytest.raises(SystemExit):
+        r.main()
+    assert 'invalid number of processes' in capsys.readouterr().err
+    monkeypatch.setattr(sys, 'argv', ['rsfstat', '--max-memory', '0',
+                                      *map(str, EXAMPLE_RSFDBS)])
+    with pytest.raises(SystemExit):
+        r.main()
+    assert 'invalid memory budget' in capsys.readouterr().err
+
+
+def test_profile(tmp_path, monkeypatch, capsys):
+    rsfdbs = r.load_rsfdbs(EXAMPLE_RSFDBS)
+    profile = r.enable_profiling()
+    try:
+        r.compute_stats(EXAMPLE_RSFDBS)
+        r.compute_parallelism_ratio(rsfdbs, engine='walker')
+        walker = r.RSFWalker(rsfdbs[0],
+                             r.compute_steady_state_start(rsfdbs))
+        list(itertools.islice(walker.frames_generator(), 5))
+    finally:
+        assert r.disable_profiling() is profile
+    assert list(profile.phases) == [
+        'load', 'decode', 'validation', 'timebase', 'cpu loads',
+        'concurrency levels', 'windowed loads', 'transient parallelism ratio',
+        'task overlaps']
+    assert all(phase['calls'] == 1 and phase['traced_peak'] is None
+               for phase in profile.phases.values())
+    counters = profile.counters
+    assert counters['RSF databases decoded'] == len(EXAMPLE_RSFDBS)
+    assert counters['frames decoded'] == sum(rsf.nb_frames for rsf in rsfdbs)
+    assert counters['sweep iterations'] > 0
+    assert counters['advance() calls'] == counters[
+        'next_running_switch() calls'] > 0
+    assert counters['frames_generator() frames'] == 5
+
+    # nothing is recorded once disabled
+    r.compute_parallelism_ratio(rsfdbs, engine='walker')
+    assert profile.counters == counters
+
+    dump = tmp_path / 'rsfstat.pstats'
+    monkeypatch.setattr(sys, 'argv', ['rsfstat', '--no-cache', '--format',
+                                      'json', '--profile-dump', str(dump),
+                                      *map(str, EXAMPLE_RSFDBS)])
+    r.main()
+    record = json.loads(capsys.readouterr().out)
+    assert record['profile']['counters']['frames decoded'] == \
+        counters['frames decoded']
+    assert pstats.Stats(str(dump)).total_calls > 0
+
+    monkeypatch.setattr(sys, 'argv', ['rsfstat', '--no-cache', '--profile',
+                                      *map(str, EXAMPLE_RSFDBS)])
+    r.main()
+    assert 'concurrency levels' in capsys.readouterr().err
+
+
+def test_memory_budget(monkeypatch):
+    windows = [(1000, 'qtt')]
+    estimate = r.estimate_memory(EXAMPLE_RSFDBS, windows=windows,
+                                 overlaps=True)
+    low_estimate = r.estimate_memory(EXAMPLE_RSFDBS, windows=windows,
+                                     overlaps=True, low_memory=True)
+    assert estimate > low_estimate > r.estimate_memory(EXAMPLE_RSFDBS)
+    sizes = [columnar.read_sizes(path) for path in EXAMPLE_RSFDBS]
+    rsfdbs = r.load_rsfdbs(EXAMPLE_RSFDBS)
+    assert sizes == [(len(rsf.intervals), rsf.nb_frames) for rsf in rsfdbs]
+
+    # the low memory mode computes the same stats
+    expected = r.compute_stats(EXAMPLE_RSFDBS, windows=windows, overlaps=True)
+    profile = r.enable_profiling(r.Profile(trace_memory=True))
+    try:
+        for max_memory in (estimate, low_estimate):
+            assert r.compute_stats(EXAMPLE_RSFDBS, windows=windows,
+                                   overlaps=True,
+                                   max_memory=max_memory) == expected
+    finally:
+        r.disable_profiling()
+    assert profile.phases['load']['traced_peak'] >= \
+        profile.phases['decode']['traced_peak'] > 0
+    if r._current_rss() is not None: # not on Windows nor macOS
+        assert profile.phases['load']['rss'] > 0
+        assert profile.phases['load']['rss_growth'] is not None
+    with pytest.raises(ValueError, match='memory'):
+        r.compute_stats(EXAMPLE_RSFDBS, windows=windows, overlaps=True,
+                        max_memory=low_estimate - 1)
+
+    # duplicate windows, evaluated by several chunks
+    rsfdbs = rsfdbs * 3
+    timebase = r.compute_timebase(rsfdbs)
+    monkeypatch.setattr(r, '_WINDOWS_CHUNK_SIZE', 7)
+    for width in (1, 1000, 10**6):
+        assert r.compute_windowed_loads(
+            rsfdbs, width, timebase=timebase, low_memory=True) == \
+            r.compute_windowed_loads(rsfdbs, width, timebase=timebase)
+
+
+def test_streaming(tmp_path):
+    expected = r.compute_stats(EXAMPLE_RSFDBS)
+    assert r.compute_stats(EXAMPLE_RSFDBS, streaming=True) == expected
+    # streamed when loading the RSFs would exceed the budget
+    assert r.compute_stats(EXAMPLE_RSFDBS,
+                           max_memory=r._PROCESS_NBYTES) == expected
+    with pytest.raises(ValueError, match='streaming'):
+        r.compute_stats(EXAMPLE_RSFDBS, overlaps=True, streaming=True)
+
+    # the memory used does not depend on the size of the RSFs
+    paths = generate.write_rsfdbs(tmp_path, 3, 100, 20, 4, .5,
+                                  loop_interval=3)
+    nbytes = sum(rsf.nbytes() for rsf in r.load_rsfdbs(paths))
+    tracemalloc.start()
+    try:
+        stats = r.compute_stats(paths, streaming=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < nbytes / 4
+    assert stats == r.compute_stats(paths)
+
+    # the hyperperiod of loops of different lengths is not streamed
+    path = tmp_path / 'core_3_rt_rsf.ks'
+    path.write_bytes(generate.build_rsf(3, 10, 20, 4, .5, loop_interval=2,
+                                        interval_length_st=1500))
+    with pytest.raises(ValueError, match='hyperperiod'):
+        r.compute_stats([*paths, path], streaming=True)
+
+
+def test_validation(tmp_path):
+    rsfdbs = r.load_rsfdbs(EXAMPLE_RSFDBS)
+    r.validate_rsfs(rsfdbs, EXAMPLE_RSFDBS, 'strict')
+    assert r.compute_stats(EXAMPLE_RSFDBS, validate='strict') == \
+        r.compute_stats(EXAMPLE_RSFDBS, validate='off')
+    paths = generate.write_rsfdbs(tmp_path / 'plan', 2, 10, 6, 3, .5,
+                                  loop_interval=4)
+    plan = r.load_rsfdbs(paths)
+    r.validate_rsfs(plan, paths, 'strict')
+
+    # an interval lasting longer than its frames
+    broken = copy.deepcopy(rsf0)
+    broken.intervals[2].length_qtt += 1
+    path = tmp_path / 'core_0_rt_rsf.ks'
+    path.write_bytes(generate.serialize_rsf(broken))
+    for options in ({}, {'streaming': True}):
+        with pytest.raises(ValueError, match='1 intervals .first: 2.'):
+            r.compute_stats([path], **options)
+        r.compute_stats([path], validate='off', **options)
+    with pytest.raises(ValueError, match='streaming'):
+        r.compute_stats([path], validate='strict', streaming=True)
+    broken = copy.deepcopy(rsf0)
+    broken.loop_interval = 4
+    with pytest.raises(ValueError, match='loop interval 4'):
+        r.validate_rsfs([broken])
+
+    # frame fields which do not match the frames of the model (those of the
+    # RSF of another core), and loops of different lengths
+    with pytest.raises(ValueError, match='distance_to_next_task_frame'):
+        r.validate_rsfs(plan[:1], paths[1:], 'strict')
+    with pytest.raises(ValueError, match='loops of different lengths'):
+        r.validate_rsfs([*rsfdbs, *plan], [*EXAMPLE_RSFDBS, *paths],
+                        'strict')
+
+
+def test_watch(tmp_path, monkeypatch):
+    paths = generate.write_rsfdbs(tmp_path, 3, 10, 6, 3, .5, loop_interval=2)
+    incremental = r.IncrementalStats(overlaps=True)
+    refreshes = r.watch(lambda: paths, incremental, interval=0)
+    reloaded, stats, _ = next(refreshes)
+    assert reloaded == paths
+    assert stats == r.compute_stats(paths, overlaps=True)
+
+    # only the RSF which changed is decoded again
+    paths[1].write_bytes(generate.build_rsf(1, 10, 6, 3, .8, loop_interval=2,
+                                            seed=1))
+    profile = r.enable_profiling()
+    try:
+        reloaded, stats, _ = next(refreshes)
+    finally:
+        r.disable_profiling()
+    assert reloaded == [paths[1]]
+    assert profile.counters['RSF databases decoded'] == 1
+    assert stats == r.compute_stats(paths, overlaps=True)
+
+    # errors are reported until the next build, which may remove a core
+    paths[2].write_bytes(b'')
+    _, error, _ = next(refreshes)
+    assert isinstance(error, ValueError)
+    paths.pop().unlink()
+    reloaded, stats, _ = next(refreshes)
+    assert reloaded == [] and incremental.paths == paths
+    assert stats == r.compute_stats(paths, overlaps=True)
+
+    # a database written while it is loaded is reloaded by the next update
+    load_rsfdbs = r.load_rsfdbs
+    def load_and_rewrite(paths, **options):
+        rsfdbs = load_rsfdbs(paths, **options)
+        paths[0].write_bytes(generate.build_rsf(1, 10, 6, 3, .2,
+                                                loop_interval=2, seed=1))
+        os.utime(paths[0], ns=(0, 0))
+        return rsfdbs
+
+    paths[1].write_bytes(generate.build_rsf(1, 10, 6, 3, .5, loop_interval=2,
+                                            seed=1))
+    monkeypatch.setattr(r, 'load_rsfdbs', load_and_rewrite)
+    assert incremental.update(paths) == [paths[1]]
+    monkeypatch.setattr(r, 'load_rsfdbs', load_rsfdbs)
+    assert incremental.update(paths) == [paths[1]]
+    assert incremental.stats() == r.compute_stats(paths, overlaps=True)
+
+
+################################################################################
+# DIFFERENTIAL TESTS
+################################################################################
+
+# number of random plans on which `test_engines_agree()` runs every engine on
+# every model: raise it for a longer campaign, e.g. with
+# RSFSTAT_DIFFERENTIAL_RUNS=100000 pytest -k engines_agree
+DIFFERENTIAL_RUNS = int(os.environ.get('RSFSTAT_DIFFERENTIAL_RUNS', 100))
+
+
+def _random_lengths(rng: random.Random, total: int, max_parts: int = 3
+                    ) -> list:
+    """Split `total` in a random number of random positive lengths"""
+    if total == 0:
+        return []
+    cuts = sorted(rng.sample(range(1, total),
+                             rng.randint(1, min(total, max_parts)) - 1))
+    return [end - begin for begin, end in zip([0, *cuts], [*cuts, total])]
+
+
+def random_plan(rng: random.Random) -> list:
+    """Random scheduling plan, as a list of RSFs in the form of the dicts the
+    mocks are built from (see `DictObj`): random EXEC/PADDING/IDLE frames, in
+    random intervals, forming loops of random lengths and transient states
+    ending (on an interval boundary of every RSF) when the loop of the first
+    RSF starts. The quota timer of each RSF runs a random number of times
+    faster than the source timer, whose frequency is a round number of Hz, and
+    the lengths of the intervals in nanoseconds are rounded."""
+    source_frequency = rng.choice([3_000_000, 7_000_000])
+    base_loop_st = rng.randint(1, 6)
+    plan = []
+    for core in range(rng.randint(1, 4)):
+        qtt_per_st = rng.choice([1, 2, 5, 10])
+        loop = _random_lengths(rng, base_loop_st * rng.choice([1, 2, 3]))
+        if core == 0:
+            steady_start = rng.randint(0, 2 * sum(loop))
+        boundaries = [0, *itertools.accumulate(loop[:-1])]
+        transient_st = steady_start if core == 0 else rng.choice([
+            steady_start - boundary for boundary in boundaries
+            if boundary <= steady_start])
+        transient = _random_lengths(rng, transient_st)
+
+        intervals = []
+        for length_st in transient + loop:
+            length_qtt = length_st * qtt_per_st
+            frames = []
+            for length_qt in _random_lengths(rng, length_qtt, max_parts=4):
+                frame_type = rng.choice([FrameType.EXEC, FrameType.PADDING,
+                                         FrameType.IDLE])
+                frames.append({
+                    'type': frame_type,
+                    'task': (rng.choice(['A', 'B', 'C'])
+                             if frame_type == FrameType.EXEC else ''),
+                    'length_qt': length_qt,
+                })
+            intervals.append({
+                'frames': frames, 'length_qtt': length_qtt,
+                'length_st': length_st,
+                'length_ns': round(length_st * 10**9 / source_frequency),
+            })
+        plan.append({'core': core, 'intervals': intervals,
+                     'loop_interval': len(transient)})
+    return plan
+
+
+def _loop_lengths_st(plan: list) -> list:
+    """Length of the loop of each RSF of `plan`, in source ticks"""
+    return [sum(interval['length_st']
+                for interval in rsf['intervals'][rsf['loop_interval']:])
+            for rsf in plan]
+
+
+def normalized_plan(plan: list) -> list:
+    """Copy of `plan` whose quota timers all run at the same frequency, and
+    whose loops all last the hyperperiod of the loops of `plan`, by scaling the
+    lengths in quota timer ticks and unrolling the loops: the reference engines
+    assume both, and give on it the results of the other engines on `plan`.
+    The lengths in nanoseconds are dropped."""
+    # the source timers of all the RSFs run at the same frequency, so the
+    # frequency of each quota timer is proportional to its ticks per source tick
+    qtt_per_st = [Fraction(sum(interval['length_qtt']
+                               for interval in rsf['intervals']),
+                           sum(interval['length_st']
+                               for interval in rsf['intervals']))
+                  for rsf in plan]
+    common_qtt_per_st = r._lcm(ratio.numerator for ratio in qtt_per_st)
+    loops_st = _loop_lengths_st(plan)
+    hyperperiod_st = r._lcm(loops_st)
+
+    normalized = []
+    for rsf, ratio, loop_st in zip(plan, qtt_per_st, loops_st):
+        factor = int(common_qtt_per_st / ratio)
+        intervals = copy.deepcopy(rsf['intervals'])
+        for _ in range(hyperperiod_st // loop_st - 1):
+            intervals += copy.deepcopy(rsf['intervals'][rsf['loop_interval']:])
+        for interval in intervals:
+            interval.pop('length_ns', None)
+            interval['length_qtt'] *= factor
+            for frame in interval['frames']:
+                frame['length_qt'] *= factor
+        normalized.append(dict(rsf, intervals=intervals))
+    return normalized
+
+
+def _models(plan: list) -> dict:
+    """Every model of `plan`: the mocks, their columnar conversion, and the
+    models loaded from their serialization by every loader"""
+    mocks = [DictObj(rsf) for rsf in plan]
+    databases = [generate.serialize_rsf(rsf) for rsf in mocks]
+    return {
+        'mock': mocks,
+        'columnar.from_rsf': [columnar.from_rsf(rsf) for rsf in mocks],
+        'pythonize': [pythonize.load_from_bytes(db) for db in databases],
+        'pythonize lazy': [pythonize.load_from_bytes(db, lazy=True)
+                           for db in databases],
+        'columnar': [columnar.load_from_bytes(db) for db in databases],
+    }
+
+
+def _result(compute, *args, **kwargs):
+    """Result of `compute(*args, **kwargs)`, or the exception it raised"""
+    try:
+        return compute(*args, **kwargs)
+    except Exception as error: # pylint: disable=broad-except
+        return error
+
+
+def run_references(plan: list) -> dict:
+    """Results of the reference engines on the mocks of `plan` normalized (see
+    `normalized_plan()`), indexed by metric; they fail if `plan` is invalid"""
+    mocks = [DictObj(rsf) for rsf in normalized_plan(plan)]
+    return {
+        'cpu_loads': r.compute_cpu_loads(mocks, engine='iterative'),
+        'parallelism_ratio': r.compute_parallelism_ratio(mocks,
+                                                         engine='walker'),
+    }
+
+
+def run_engines(plan: list) -> dict:
+    """Results of every engine on every model of `plan` normalized (see
+    `normalized_plan()`), of the engines supporting several frequencies and
+    loop lengths on every model of `plan` itself, and of the streaming
+    analyses of its serialization. Results, or the exceptions raised, are
+    indexed by metric, then by model and engine."""
+    results = {'cpu_loads': {}, 'parallelism_ratio': {}}
+    for prefix, models, cpu_loads_engines, parallelism_ratio_engines in (
+            ('', _models(plan), ['vectorized'], ['sweep']),
+            ('normalized ', _models(normalized_plan(plan)),
+             r.CPU_LOADS_ENGINES, r.PARALLELISM_RATIO_ENGINES)):
+        for model, rsfs in models.items():
+            for engine in cpu_loads_engines:
+                results['cpu_loads'][prefix + model, engine] = _result(
+                    r.compute_cpu_loads, rsfs, engine=engine)
+            for engine in parallelism_ratio_engines:
+                results['parallelism_ratio'][prefix + model, engine] = \
+                    _result(r.compute_parallelism_ratio, rsfs, engine=engine)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [Path(directory) / f'core_{idx}_rt_rsf.ks'
+                 for idx in range(len(plan))]
+        for path, rsf in zip(paths, plan):
+            path.write_bytes(generate.serialize_rsf(DictObj(rsf)))
+        streams = r.open_rsfdbs(paths)
+        try:
+            timebase = r.compute_stream_timebase(streams)
+            results['cpu_loads']['stream', 'streaming'] = _result(
+                lambda: r.compute_stream_phase_cpu_loads(streams,
+                                                         timebase).steady)
+            # the hyperperiod of loops of different lengths is not streamed
+            if len(set(_loop_lengths_st(plan))) == 1:
+                results['parallelism_ratio']['stream', 'streaming'] = \
+                    _result(lambda: r.compute_stream_concurrency_levels(
+                        streams, timebase).parallelism_ratio())
+        finally:
+            for stream in streams:
+                stream.close()
+    return results
+
+
+def find_mismatch(plan: list, run=run_engines):
+    """Describe the first result of `run(plan)` (see `run_engines()`) which
+    does not match the reference (see `run_references()`), or is an exception,
+    or return `None` if all of them match, or if the reference itself fails
+    (i.e. `plan` is invalid)"""
+    try:
+        references = run_references(plan)
+    except Exception: # pylint: disable=broad-except
+        return None
+
+    try:
+        all_results = run(plan)
+    except Exception as error: # pylint: disable=broad-except
+        return f'{run.__name__} raised {error!r}'
+    for metric, results in all_results.items():
+        reference = references[metric]
+        for name, result in results.items():
+            if isinstance(result, Exception):
+                return f'{metric}: {name} raised {result!r}'
+            if not (math.isclose(result, reference)
+                    if isinstance(reference, float) else result == reference):
+                return (f'{metric}: {name} returned {result} instead of'
+                        f' {reference} (reference)')
+    return None
+
+
+def _simplifications(plan: list):
+    """Yield simpler variants of `plan`, possibly invalid"""
+    # fewer RSFs
+    for core_idx in range(len(plan)):
+        if len(plan) > 1:
+            yield plan[:core_idx] + plan[core_idx + 1:]
+
+    for core_idx, rsf in enumerate(plan):
+        def variant(**changes):
+            simpler = copy.deepcopy(plan)
+            simpler[core_idx].update(changes)
+            return simpler
+
+        intervals = rsf['intervals']
+        # a shorter transient state
+        if rsf['loop_interval'] > 0:
+            yield variant(intervals=copy.deepcopy(intervals[1:]),
+                          loop_interval=rsf['loop_interval'] - 1)
+
+        # fewer intervals, by merging consecutive intervals of the same state
+        for idx in range(1, len(intervals)):
+            if idx != rsf['loop_interval']:
+                merged = copy.deepcopy(intervals)
+                previous = merged[idx - 1]
+                previous['frames'] += merged[idx]['frames']
+                previous['length_qtt'] += merged[idx]['length_qtt']
+                previous['length_st'] += merged[idx]['length_st']
+                previous['length_ns'] += merged[idx]['length_ns']
+                del merged[idx]
+                yield variant(intervals=merged,
+                              loop_interval=(rsf['loop_interval']
+                                             - (idx < rsf['loop_interval'])))
+
+        for interval_idx, interval in enumerate(intervals):
+            for frame_idx, frame in enumerate(interval['frames']):
+                def frame_variant(merge_into: int = 0, **changes):
+                    simpler = copy.deepcopy(plan)
+                    frames = simpler[core_idx]['intervals'][interval_idx][
+                        'frames']
+                    frames[frame_idx].update(changes)
+                    if merge_into: # merge this frame into a neighbour
+                        length_qt = frames.pop(frame_idx)['length_qt']
+                        frames[frame_idx + min(merge_into, 0)][
+                            'length_qt'] += length_qt
+                    return simpler
+
+                # fewer frames, simpler frames
+                if frame_idx > 0:
+                    yield frame_variant(merge_into=-1)
+                if frame_idx + 1 < len(interval['frames']):
+                    yield frame_variant(merge_into=1)
+                if frame['type'] != FrameType.IDLE:
+                    yield frame_variant(type=FrameType.IDLE, task='')
+                if frame['type'] == FrameType.EXEC and frame['task'] != 'A':
+                    yield frame_variant(task='A')
+
+    # shorter frames
+    lengths = [length for rsf in plan for interval in rsf['intervals']
+               for length in (interval['length_qtt'],
+                              *(frame['length_qt']
+                                for frame in interval['frames']))]
+    if all(length % 2 == 0 for length in lengths):
+        simpler = copy.deepcopy(plan)
+        for rsf in simpler:
+            for interval in rsf['intervals']:
+                interval['length_qtt'] //= 2
+                for frame in interval['frames']:
+                    frame['length_qt'] //= 2
+        yield simpler
+
+
+def shrink(plan: list, fails) -> list:
+    """Simplify `plan` as long as `fails(plan)`, down to a minimal
+    counterexample"""
+    progress = True
+    while progress:
+        progress = False
+        for simpler in _simplifications(plan):
+            if fails(simpler):
+                plan = simpler
+                progress = True
+                break
+    return plan
+
+
+def test_engines_agree():
+    for seed in range(DIFFERENTIAL_RUNS):
+        plan = random_plan(random.Random(seed))
+        # the reference engines accept the plan
+        run_references(plan)
+        if find_mismatch(plan) is not None:
+            plan = shrink(plan, lambda plan: find_mismatch(plan) is not None)
+            pytest.fail(f'random plan {seed}: {find_mismatch(plan)}\n'
+                        f'minimal counterexample: {plan}')
+
+
+def test_shrink():
+    # an engine mistaking padding for exec time is caught, and the plan shrunk
+    # down to a single padding frame
+    def run_buggy(plan):
+        results = run_engines(plan)
+        buggy = copy.deepcopy(plan)
+        for rsf in buggy:
+            for interval in rsf['intervals']:
+                for frame in interval['frames']:
+                    if frame['type'] == FrameType.PADDING:
+                        frame.update(type=FrameType.EXEC, task='padding')
+        results['cpu_loads']['mock', 'buggy'] = r.compute_cpu_loads(
+            [DictObj(rsf) for rsf in buggy])
+        return results
+
+    plans = (random_plan(random.Random(seed)) for seed in itertools.count())
+    plan = next(plan for plan in plans
+                if find_mismatch(plan, run_buggy) is not None)
+    plan = shrink(plan, lambda plan: find_mismatch(plan, run_buggy) is not None)
+    assert len(plan) == 1
+    assert plan[0]['loop_interval'] == 0
+    assert len(plan[0]['intervals']) == 1
+    assert [frame['type'] for frame in plan[0]['intervals'][0]['frames']] == \
+        [FrameType.PADDING]
+
+    # an engine failing on a valid plan is a mismatch too
+    def run_failing(plan):
+        results = run_engines(plan)
+        results['cpu_loads']['mock', 'failing'] = _result(
+            r.compute_cpu_loads, [DictObj(rsf) for rsf in plan],
+            engine='failing')
+        return results
+
+    assert find_mismatch(random_plan(random.Random(0)), run_failing) == \
+        ("cpu_loads: ('mock', 'failing') raised"
+         " ValueError('unknown CPU loads engine: failing')")